@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Client asincrono delle operazioni descritte in `openapi.yaml`.
+
+Le operazioni si compilano dalla specifica per `operationId`: path, parametri di
+path e di query e schema della risposta vengono letti una volta sola, così gli
+strumenti client (poller delle metriche, tailer dei log...) seguono la specifica
+invece di ripetere gli URL a mano. Le richieste passano dal pool di connessioni
+keep-alive di `spec_fetch`.
+
+L'URL base è `API_URL` se impostata, altrimenti il primo `servers` della specifica;
+la chiave API va nell'header dichiarato in `components.securitySchemes`.
+"""
+
+import json
+import os
+import re
+from urllib.parse import quote, urlencode
+
+import spec_engine
+
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+API_KEY_ENV = 'WEBROBOT_API_KEY'
+# Stati finali di task ed esecuzioni: chi li osserva smette di interrogare
+TERMINAL_STATUSES = frozenset({'COMPLETED', 'FAILED', 'CANCELLED', 'CANCELED', 'STOPPED', 'ERROR'})
+
+
+class ApiError(Exception):
+    def __init__(self, status, url, body=b''):
+        super().__init__(f'HTTP {status} da {url}')
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+def resolve(data, value):
+    """Segue i `$ref` locali (anche a catena) fino al valore puntato."""
+    seen = set()
+    while isinstance(value, dict) and isinstance(value.get('$ref'), str) and value['$ref'].startswith('#/'):
+        ref = value['$ref']
+        if ref in seen:
+            raise ValueError(f'$ref circolare: {ref}')
+        seen.add(ref)
+        value = data
+        for token in ref[2:].split('/'):
+            value = value[token.replace('~1', '/').replace('~0', '~')]
+    return value
+
+
+class Operation:
+    """Operazione della specifica: costruisce gli URL e conosce lo schema della risposta."""
+
+    def __init__(self, data, path, method, operation):
+        self.operation_id = operation.get('operationId')
+        self.method = method.upper()
+        self.path = path
+        path_item = data['paths'][path]
+        parameters = {}
+        # I parametri dell'operazione sovrascrivono quelli a livello di path
+        for parameter in (path_item.get('parameters') or []) + (operation.get('parameters') or []):
+            parameter = resolve(data, parameter)
+            parameters[(parameter['name'], parameter['in'])] = parameter
+        self.parameters = list(parameters.values())
+        self.request_body = resolve(data, operation.get('requestBody') or {})
+        self.path_params = [name for name, location in parameters if location == 'path']
+        self.query_params = [name for name, location in parameters if location == 'query']
+        self.pattern = re.compile(
+            '^' + re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>[^/]+)', re.escape(path)) + '$'
+        )
+        self._data = data
+        self._responses = operation.get('responses') or {}
+
+    def match(self, path):
+        """Parametri di path se `path` corrisponde al template dell'operazione, altrimenti None."""
+        found = self.pattern.match(path)
+        return found.groupdict() if found else None
+
+    def url(self, base_url, **params):
+        """URL completo; i parametri di path sono obbligatori, quelli di query None sono omessi."""
+        missing = [name for name in self.path_params if params.get(name) is None]
+        if missing:
+            raise ValueError(f"{self.operation_id}: parametri di path mancanti: {', '.join(missing)}")
+        path = self.path
+        for name in self.path_params:
+            path = path.replace(f'{{{name}}}', quote(str(params[name]), safe=''))
+        query = {name: params[name] for name in self.query_params if params.get(name) is not None}
+        return base_url.rstrip('/') + path + (f'?{urlencode(query)}' if query else '')
+
+    def response_schema(self, status='200', media_type='application/json'):
+        response = resolve(self._data, self._responses.get(status) or {})
+        schema = ((response.get('content') or {}).get(media_type) or {}).get('schema')
+        return resolve(self._data, schema) if schema is not None else None
+
+    def schema_fields(self, status='200', types=('integer', 'number')):
+        """[(nome puntato, chiavi)] delle proprietà scalari dei tipi indicati (oggetti annidati inclusi)."""
+        fields = []
+
+        def walk(schema, prefix):
+            schema = resolve(self._data, schema)
+            if not isinstance(schema, dict):
+                return
+            for name, child in (schema.get('properties') or {}).items():
+                child = resolve(self._data, child)
+                keys = prefix + (name,)
+                if child.get('type') == 'object' or 'properties' in child:
+                    walk(child, keys)
+                elif child.get('type') in types:
+                    fields.append(('.'.join(keys), keys))
+
+        walk(self.response_schema(status), ())
+        return fields
+
+
+def load_operations(data, operation_ids):
+    """{operationId: Operation} per gli id richiesti; ValueError se qualcuno manca nella specifica."""
+    wanted = set(operation_ids)
+    found = {}
+    for path, path_item in (data.get('paths') or {}).items():
+        for method, operation in path_item.items():
+            if method in HTTP_METHODS and isinstance(operation, dict) and operation.get('operationId') in wanted:
+                found[operation['operationId']] = Operation(data, path, method, operation)
+    missing = sorted(wanted - set(found))
+    if missing:
+        raise ValueError(f"operazioni non presenti nella specifica: {', '.join(missing)}")
+    return found
+
+
+def load_spec_operations(operation_ids, spec_file=None):
+    data = spec_engine.load_spec(spec_file or spec_engine.OPENAPI_FILE)
+    return data, load_operations(data, operation_ids)
+
+
+def base_url(data):
+    env = os.environ.get('API_URL')
+    if env:
+        return env.rstrip('/')
+    servers = data.get('servers') or [{}]
+    return (servers[0].get('url') or '').rstrip('/')
+
+
+def auth_headers(data, api_key=None):
+    """Header di autenticazione dallo schema `apiKey` della specifica (chiave da `WEBROBOT_API_KEY`)."""
+    api_key = api_key or os.environ.get(API_KEY_ENV)
+    if not api_key:
+        return {}
+    for scheme in ((data.get('components') or {}).get('securitySchemes') or {}).values():
+        if scheme.get('type') == 'apiKey' and scheme.get('in') == 'header':
+            return {scheme['name']: api_key}
+    return {'X-API-Key': api_key}
+
+
+async def get_json(pool, url, headers=None, stats=None):
+    """GET di un documento JSON sul pool; ApiError per le risposte non 2xx. `stats` conta i byte ricevuti."""
+    request_headers = {'Accept': 'application/json'}
+    request_headers.update(headers or {})
+    response = await pool.request('GET', url, request_headers)
+    chunks = [chunk async for chunk in response.iter_body()]
+    body = b''.join(chunks)
+    if stats is not None:
+        stats['bytes'] = stats.get('bytes', 0) + len(body)
+    if not 200 <= response.status < 300:
+        raise ApiError(response.status, url, body)
+    return json.loads(body) if body else None
+
+
+def json_response(value, status=200):
+    """Risposta JSON per gli handler di `api_mock.serve`."""
+    return status, {'Content-Type': 'application/json'}, json.dumps(value).encode()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Generatore di carico per l'API (o per `api_mock`) guidato da `openapi.yaml`.
+
+Un mix è una lista pesata di operazioni (`executeQuery=3,getExecutionStatus=10`):
+per ciascuna si prepara una volta sola l'URL, con i parametri di path e di query
+obbligatori presi dagli esempi della specifica (o da `overrides`), e il corpo
+JSON d'esempio della `requestBody`.
+
+Il carico è ad arrivi programmati: la richiesta i-esima parte a `i / rps` secondi
+dall'inizio, indipendentemente da quanto rispondono le precedenti. La latenza si
+misura dall'istante programmato, così un client che non riesce a tenere il ritmo
+(coda sul pool, event loop saturo) si vede nei percentili invece di abbassare
+di nascosto il carico offerto; `lag` è il ritardo con cui le richieste sono
+effettivamente partite.
+"""
+
+import asyncio
+import bisect
+import json
+import random
+import time
+
+import api_client
+import api_mock
+import spec_fetch
+
+DEFAULT_MIX = 'executeQuery=3,getExecutionStatus=10,executeJob_1=1'
+PERCENTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+
+
+def parse_mix(text):
+    """`operationId=peso,...` -> [(operationId, peso)]; il peso è 1 se omesso."""
+    mix = []
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, sep, weight = item.partition('=')
+        try:
+            weight = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f'peso non valido in {item!r}') from None
+        if weight <= 0:
+            raise ValueError(f'peso non positivo in {item!r}')
+        mix.append((name.strip(), weight))
+    if not mix:
+        raise ValueError('mix vuoto')
+    return mix
+
+
+class Request:
+    """Richiesta del mix, preparata una volta sola."""
+
+    __slots__ = ('operation_id', 'method', 'url', 'headers', 'body')
+
+    def __init__(self, operation_id, method, url, headers, body):
+        self.operation_id = operation_id
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+
+def _parameter_example(data, parameter):
+    if 'example' in parameter:
+        return parameter['example']
+    for example in (parameter.get('examples') or {}).values():
+        example = api_client.resolve(data, example)
+        if 'value' in example:
+            return example['value']
+    value = api_mock.example_for(data, parameter.get('schema'))
+    return 'example' if value is None else value
+
+
+def build_requests(data, mix, base_url, headers=None, overrides=None):
+    """[(Request, peso)] per il mix; ValueError per operazioni assenti dalla specifica."""
+    operations = api_client.load_operations(data, [name for name, _ in mix])
+    overrides = overrides or {}
+    requests = []
+    for name, weight in mix:
+        operation = operations[name]
+        params = {
+            parameter['name']: _parameter_example(data, parameter) for parameter in operation.parameters
+            if parameter['in'] == 'path' or (parameter['in'] == 'query' and parameter.get('required'))
+        }
+        params.update({key: value for key, value in overrides.items()
+                       if key in operation.path_params or key in operation.query_params})
+        request_headers = dict(headers or {})
+        body = None
+        content = operation.request_body.get('content') or {}
+        if 'application/json' in content:
+            body = json.dumps(api_mock.media_example(data, content['application/json']) or {}).encode()
+            request_headers['Content-Type'] = 'application/json'
+        elif operation.method in ('POST', 'PUT', 'PATCH'):
+            body = b''
+        requests.append((Request(name, operation.method, operation.url(base_url, **params), request_headers, body),
+                         weight))
+    return requests
+
+
+def percentiles(values):
+    """Percentili nearest-rank in millisecondi, più il massimo."""
+    ordered = sorted(values)
+    result = {
+        name: round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3) if ordered else None
+        for name, p in PERCENTILES
+    }
+    result['max'] = round(ordered[-1] * 1000, 3) if ordered else None
+    return result
+
+
+async def run_load(requests, rps, duration, connections=32, timeout=30.0, seed=None):
+    """
+    Invia `rps * duration` richieste pesate secondo il mix, ad arrivi programmati.
+    Restituisce il resoconto: throughput, percentili di latenza e di ritardo di
+    partenza, stati HTTP ed errori, in totale e per operazione.
+    """
+    if rps <= 0 or duration <= 0:
+        raise ValueError('rps e durata devono essere positivi')
+    rng = random.Random(seed)
+    cumulative = []
+    total = 0.0
+    for _, weight in requests:
+        total += weight
+        cumulative.append(total)
+    count = max(1, int(rps * duration))
+    samples = []
+    pool = spec_fetch.ConnectionPool(max_per_host=connections, timeout=timeout)
+    loop = asyncio.get_running_loop()
+
+    async def one(request, scheduled):
+        started = loop.time()
+        status = error = None
+        size = 0
+        try:
+            response = await pool.request(request.method, request.url, request.headers, request.body)
+            status = response.status
+            async for chunk in response.iter_body():
+                size += len(chunk)
+        except (OSError, asyncio.TimeoutError, spec_fetch.FetchError, ValueError) as e:
+            error = type(e).__name__
+        samples.append((request.operation_id, status, error, loop.time() - scheduled, started - scheduled, size))
+
+    wall = time.perf_counter()
+    start = loop.time() + 0.01
+    tasks = []
+    try:
+        for i in range(count):
+            scheduled = start + i / rps
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            request = requests[bisect.bisect(cumulative, rng.random() * total)][0]
+            tasks.append(asyncio.ensure_future(one(request, scheduled)))
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await pool.close()
+    elapsed = time.perf_counter() - wall
+    return report(samples, rps, elapsed, pool)
+
+
+def _summary(samples, elapsed):
+    ok = [s for s in samples if s[2] is None and s[1] is not None and s[1] < 400]
+    statuses = {}
+    for sample in samples:
+        key = str(sample[1]) if sample[2] is None else sample[2]
+        statuses[key] = statuses.get(key, 0) + 1
+    return {
+        'requests': len(samples),
+        'ok': len(ok),
+        'errors': len(samples) - len(ok),
+        'throughput': round(len(ok) / elapsed, 2) if elapsed else None,
+        'latencyMs': percentiles([s[3] for s in ok]),
+        'lagMs': percentiles([s[4] for s in samples]),
+        'bytes': sum(s[5] for s in samples),
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def report(samples, rps, elapsed, pool=None):
+    by_operation = {}
+    for sample in samples:
+        by_operation.setdefault(sample[0], []).append(sample)
+    result = {
+        'targetRps': rps,
+        'elapsedSeconds': round(elapsed, 3),
+        'total': _summary(samples, elapsed),
+        'operations': {name: _summary(group, elapsed) for name, group in sorted(by_operation.items())},
+    }
+    if pool is not None:
+        result['connections'] = {'opened': pool.opened, 'reused': pool.reused}
+    return result
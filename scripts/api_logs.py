@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Tail incrementale dei log delle esecuzioni (`getExecutionLogs`) fino allo stato
+finale (`getExecutionStatus`).
+
+L'API non espone offset né range: restituisce le ultime `tail` righe come lista
+JSON. Per scaricare solo il nuovo, ogni esecuzione chiede una finestra di coda
+dimensionata sul traffico recente (il doppio delle righe arrivate all'ultimo giro
+più un margine) e la allinea alle ultime righe già emesse (`anchor`): quello che
+segue la sovrapposizione è nuovo. Se la finestra non si sovrappone (sono arrivate
+più righe della finestra) la si raddoppia fino a `max_tail`, poi si scarica il
+log completo; lo stesso vale quando l'allineamento è ambiguo (righe ripetute).
+Con il log intero la posizione assoluta è nota, quindi anche le righe identiche
+vengono contate esattamente.
+
+Le esecuzioni si seguono in parallelo su un solo `spec_fetch.ConnectionPool`;
+`LogTailer.lines()` è un generatore asincrono di (esecuzione, riga) alimentato da
+una coda limitata: se chi consuma rallenta, le esecuzioni smettono di
+interrogare l'API finché la coda non si svuota. A fine esecuzione il generatore
+produce (esecuzione, None).
+"""
+
+import asyncio
+import random
+from collections import deque
+
+import api_client
+import instrumentation
+import spec_fetch
+
+LOGS_OPERATION = 'getExecutionLogs'
+STATUS_OPERATION = 'getExecutionStatus'
+TAIL_PARAM = 'tail'
+POD_TYPE_PARAM = 'podType'
+
+
+class Execution:
+    """Esecuzione seguita dal tailer, con la sua finestra e le ultime righe emesse."""
+
+    def __init__(self, project_id, job_id, execution_id, pod_type=None):
+        self.params = {'projectId': project_id, 'jobId': job_id, 'executionId': execution_id}
+        self.pod_type = pod_type
+        self.key = f'{project_id}/{job_id}/{execution_id}' + (f':{pod_type}' if pod_type else '')
+        self.recent = None
+        # Indice assoluto della prossima riga del log, se noto
+        self.position = None
+        self.window = None
+        self.status = None
+        self.done = False
+        self.error = None
+        self.lines = 0
+        self.requests = 0
+        self.widened = 0
+        self.full_fetches = 0
+        self.errors = 0
+        self.stats = {'bytes': 0}
+
+    @classmethod
+    def parse(cls, text, pod_type=None):
+        """`PROGETTO/JOB/ESECUZIONE`."""
+        parts = text.split('/')
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"esecuzione: atteso PROGETTO/JOB/ESECUZIONE, trovato '{text}'")
+        return cls(*parts, pod_type=pod_type)
+
+    def summary(self):
+        return {
+            'execution': self.key, 'status': self.status, 'lines': self.lines, 'requests': self.requests,
+            'bytes': self.stats['bytes'], 'widened': self.widened, 'fullFetches': self.full_fetches,
+            'errors': self.errors,
+        }
+
+
+def split_new(window, recent, position=None, complete=False):
+    """
+    Righe di `window` successive a quelle già emesse (`recent` sono le ultime).
+
+    `complete` indica che `window` è il log intero: in quel caso `position`, se
+    nota, dà l'allineamento esatto. Restituisce None se la finestra non si
+    sovrappone alle righe note (ne sono arrivate più di quante ne contenga) o se
+    vi si allinea in più punti (righe ripetute): in entrambi i casi serve una
+    finestra più ampia, al limite il log intero.
+    """
+    recent = list(recent)
+    if complete and position is not None and position <= len(window):
+        size = min(len(recent), position)
+        if window[position - size:position] == recent[len(recent) - size:]:
+            return window[position:]
+    if not recent:
+        return list(window) if complete else None
+    last = recent[-1]
+    found = None
+    for overlap in range(len(window), 0, -1):
+        if window[overlap - 1] != last:
+            continue
+        size = min(len(recent), overlap)
+        if window[overlap - size:overlap] == recent[len(recent) - size:]:
+            if found is None:
+                found = overlap
+                if complete:
+                    # Log intero: vale la sovrapposizione più lunga
+                    break
+            else:
+                # Più allineamenti possibili (righe ripetute): serve una finestra più ampia
+                return None
+    if found is not None:
+        return window[found:]
+    # Log intero senza righe note: è stato sostituito, si riparte da capo
+    return list(window) if complete else None
+
+
+class LogTailer:
+    """
+    Segue i log di più esecuzioni in parallelo (al più `concurrency` richieste in
+    volo) e li espone come flusso di righe con `lines()`.
+    """
+
+    def __init__(self, data, pool=None, concurrency=8, min_interval=1.0, max_interval=15.0, buffer=1000,
+                 initial_lines=None, min_tail=100, max_tail=10000, anchor=32, base_url=None, api_key=None, seed=None):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError('intervalli non validi: serve 0 < min <= max')
+        if min_tail < 1 or max_tail < min_tail:
+            raise ValueError('finestre non valide: serve 1 <= min_tail <= max_tail')
+        operations = api_client.load_operations(data, (LOGS_OPERATION, STATUS_OPERATION))
+        self.logs = operations[LOGS_OPERATION]
+        self.status = operations[STATUS_OPERATION]
+        # Senza `tail` nella specifica si può solo riscaricare il log completo
+        self.can_tail = TAIL_PARAM in self.logs.query_params
+        self.base_url = base_url or api_client.base_url(data)
+        self.headers = api_client.auth_headers(data, api_key)
+        self.pool = pool
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.buffer = buffer
+        self.initial_lines = initial_lines
+        self.min_tail = min_tail
+        self.max_tail = max_tail
+        self.anchor = anchor
+        self.executions = {}
+        self._random = random.Random(seed)
+        self._semaphore = None
+        self._deadline = None
+
+    def add(self, execution):
+        if execution.key not in self.executions:
+            execution.recent = deque(maxlen=self.anchor)
+            self.executions[execution.key] = execution
+        return self.executions[execution.key]
+
+    async def _get(self, execution, url):
+        async with self._semaphore:
+            document = await api_client.get_json(self.pool, url, self.headers, execution.stats)
+        execution.requests += 1
+        return document or {}
+
+    async def _fetch(self, execution, tail):
+        params = dict(execution.params)
+        if execution.pod_type and POD_TYPE_PARAM in self.logs.query_params:
+            params[POD_TYPE_PARAM] = execution.pod_type
+        if tail is not None and self.can_tail:
+            params[TAIL_PARAM] = tail
+        else:
+            execution.full_fetches += 1
+        document = await self._get(execution, self.logs.url(self.base_url, **params))
+        instrumentation.count('logRequests')
+        return [str(line) for line in document.get('logs') or []]
+
+    async def _read_status(self, execution):
+        document = await self._get(execution, self.status.url(self.base_url, **execution.params))
+        execution.status = document.get('status')
+        return str(execution.status).upper() in api_client.TERMINAL_STATUSES
+
+    async def _read_new(self, execution):
+        tail = execution.window if self.can_tail else None
+        while True:
+            window = await self._fetch(execution, tail)
+            complete = tail is None or len(window) < tail
+            new = split_new(window, execution.recent, execution.position, complete)
+            if new is not None:
+                break
+            if tail >= self.max_tail:
+                tail = None
+            else:
+                tail = min(self.max_tail, tail * 2)
+                execution.widened += 1
+        if complete:
+            execution.position = len(window)
+        elif execution.position is not None:
+            execution.position += len(new)
+        execution.window = min(self.max_tail, max(self.min_tail, 2 * len(new) + self.anchor))
+        return new
+
+    async def _emit(self, execution, lines, queue):
+        execution.recent.extend(lines[-self.anchor:])
+        execution.lines += len(lines)
+        instrumentation.count('recordsProcessed', len(lines))
+        for line in lines:
+            # Coda piena: il consumatore è indietro e l'esecuzione resta in attesa
+            await queue.put((execution, line))
+
+    async def _track(self, execution, queue):
+        loop = asyncio.get_running_loop()
+        finished = await self._read_status(execution)
+        tail = self.initial_lines if self.can_tail else None
+        window = await self._fetch(execution, tail)
+        if tail is None or len(window) < tail:
+            execution.position = len(window)
+        execution.window = self.min_tail
+        await self._emit(execution, window, queue)
+
+        interval = self.min_interval
+        while not finished and loop.time() < self._deadline:
+            await asyncio.sleep(min(interval * self._random.uniform(0.9, 1.1), max(0.0, self._deadline - loop.time())))
+            try:
+                new = await self._read_new(execution)
+                await self._emit(execution, new, queue)
+                if new:
+                    interval = self.min_interval
+                    continue
+                interval = min(self.max_interval, interval * 1.5)
+                # Log fermo: l'esecuzione potrebbe essere finita
+                if await self._read_status(execution):
+                    # Ultima lettura per le righe scritte prima della chiusura
+                    await self._emit(execution, await self._read_new(execution), queue)
+                    finished = True
+            except api_client.ApiError as e:
+                execution.errors += 1
+                if e.status in (401, 403, 404):
+                    execution.status = f'HTTP {e.status}'
+                    break
+                interval = min(self.max_interval, interval * 2)
+            except (OSError, asyncio.TimeoutError, spec_fetch.FetchError, ValueError):
+                execution.errors += 1
+                interval = min(self.max_interval, interval * 2)
+
+    async def _follow(self, execution, queue):
+        try:
+            await self._track(execution, queue)
+        except asyncio.CancelledError:
+            raise
+        except api_client.ApiError as e:
+            execution.errors += 1
+            execution.status = f'HTTP {e.status}'
+        except (OSError, asyncio.TimeoutError, spec_fetch.FetchError, ValueError) as e:
+            execution.errors += 1
+            execution.status = f'errore: {e}'
+        except Exception as e:
+            # Riportato al consumatore con la fine dell'esecuzione, il flusso non resta appeso
+            execution.error = e
+        execution.done = True
+        await queue.put((execution, None))
+
+    async def lines(self, duration=None):
+        """
+        Generatore asincrono di (esecuzione, riga); (esecuzione, None) quando
+        un'esecuzione termina. Finisce quando tutte sono terminate o dopo `duration`
+        secondi.
+        """
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.time() + duration if duration is not None else float('inf')
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        own_pool = self.pool is None
+        if own_pool:
+            self.pool = spec_fetch.ConnectionPool(max_per_host=self.concurrency)
+        queue = asyncio.Queue(self.buffer)
+        tasks = [asyncio.ensure_future(self._follow(execution, queue)) for execution in self.executions.values()]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                execution, line = await queue.get()
+                if line is None:
+                    remaining -= 1
+                    if execution.error is not None:
+                        raise execution.error
+                yield execution, line
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._semaphore = None
+            if own_pool:
+                await self.pool.close()
+                self.pool = None
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Poller concorrente delle metriche di progetti, job e task, con uno store di serie
+temporali a buffer circolari.
+
+Le operazioni `getProjectMetrics`, `getJobMetrics` e `getTaskMetrics` sono compilate
+da `openapi.yaml` (vedi `api_client`): URL e campi numerici campionati seguono lo
+schema della risposta 200, quindi un campo aggiunto alla specifica viene raccolto
+senza modificare il poller.
+
+Ogni target ha il proprio intervallo adattivo: si dimezza quando i valori cambiano,
+cresce di 1,5 volte quando restano fermi e raddoppia dopo un errore, sempre entro
+[min, max] e con un po' di jitter per non sincronizzare le richieste. Un task in
+stato finale non viene più interrogato; job e progetti senza esecuzioni in corso
+(`runningCount` a 0) passano all'intervallo massimo.
+
+Ogni serie è una `RingSeries`: array `array('d')` preallocati per il dato grezzo e
+per i livelli di downsampling (medie per bucket di tempo), così la memoria resta
+costante qualunque sia la durata del monitoraggio.
+"""
+
+import asyncio
+import random
+import time
+from array import array
+
+import api_client
+import instrumentation
+import spec_fetch
+
+OPERATIONS = {
+    'project': 'getProjectMetrics',
+    'job': 'getJobMetrics',
+    'task': 'getTaskMetrics',
+}
+# (ampiezza del bucket in secondi, capacità): 0 è il dato grezzo.
+# Circa 1 ora di campioni, 12 ore al minuto, 10 giorni al quarto d'ora.
+DEFAULT_LEVELS = ((0, 360), (60, 720), (900, 960))
+STATUS_FIELD = 'status'
+RUNNING_FIELD = 'aggregated.runningCount'
+
+
+def level_name(width):
+    return 'raw' if not width else f'{width:g}s'
+
+
+class _Ring:
+    __slots__ = ('times', 'values', 'capacity', 'start', 'size')
+
+    def __init__(self, capacity):
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    def push(self, t, value):
+        if self.size < self.capacity:
+            index = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            # Pieno: si sovrascrive il campione più vecchio
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[index] = t
+        self.values[index] = value
+
+    def points(self):
+        return [
+            (self.times[(self.start + i) % self.capacity], self.values[(self.start + i) % self.capacity])
+            for i in range(self.size)
+        ]
+
+    def nbytes(self):
+        return (len(self.times) + len(self.values)) * self.times.itemsize
+
+
+class RingSeries:
+    """Serie temporale a memoria fissa: dato grezzo più livelli di medie per bucket."""
+
+    __slots__ = ('levels', '_rings', '_buckets')
+
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.levels = tuple(levels)
+        self._rings = [_Ring(capacity) for _, capacity in self.levels]
+        # Bucket aperto per ogni livello: [inizio, somma, campioni]
+        self._buckets = [[None, 0.0, 0] for _ in self.levels]
+
+    def append(self, t, value):
+        for (width, _), ring, bucket in zip(self.levels, self._rings, self._buckets):
+            if not width:
+                ring.push(t, value)
+                continue
+            start = t - t % width
+            if bucket[0] != start:
+                if bucket[2]:
+                    ring.push(bucket[0], bucket[1] / bucket[2])
+                bucket[0], bucket[1], bucket[2] = start, 0.0, 0
+            bucket[1] += value
+            bucket[2] += 1
+
+    def points(self, level=0):
+        """[(t, valore)] in ordine di tempo; per i livelli aggregati include il bucket aperto."""
+        points = self._rings[level].points()
+        start, total, count = self._buckets[level]
+        if self.levels[level][0] and count:
+            points.append((start, total / count))
+        return points
+
+    def latest(self):
+        ring = self._rings[0]
+        if not ring.size:
+            return None
+        index = (ring.start + ring.size - 1) % ring.capacity
+        return ring.times[index], ring.values[index]
+
+    def nbytes(self):
+        return sum(ring.nbytes() for ring in self._rings)
+
+
+class MetricStore:
+    """Serie per (target, campo), create al primo campione."""
+
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.levels = tuple(levels)
+        self._series = {}
+
+    def record(self, target, t, values):
+        for field, value in values.items():
+            series = self._series.get((target, field))
+            if series is None:
+                series = self._series[(target, field)] = RingSeries(self.levels)
+            series.append(t, value)
+
+    def series(self, target, field):
+        return self._series.get((target, field))
+
+    def targets(self):
+        return sorted({target for target, _ in self._series})
+
+    def nbytes(self):
+        return sum(series.nbytes() for series in self._series.values())
+
+    def snapshot(self):
+        """{target: {campo: {livello: [[t, valore], ...]}}}, serializzabile in JSON."""
+        result = {}
+        for (target, field), series in sorted(self._series.items()):
+            result.setdefault(target, {})[field] = {
+                level_name(width): [list(point) for point in series.points(i)]
+                for i, (width, _) in enumerate(self.levels)
+            }
+        return result
+
+
+class Target:
+    """Progetto, job o task da interrogare, con lo stato del suo intervallo adattivo."""
+
+    def __init__(self, kind, project_id, job_id=None, task_id=None):
+        if kind not in OPERATIONS:
+            raise ValueError(f'tipo di target sconosciuto: {kind}')
+        self.kind = kind
+        self.params = {'projectId': project_id}
+        if job_id is not None:
+            self.params['jobId'] = job_id
+        if task_id is not None:
+            self.params['taskId'] = task_id
+        self.key = '/'.join([kind] + [str(v) for v in self.params.values()])
+        self.interval = None
+        self.polls = 0
+        self.errors = 0
+        self.changes = 0
+        self.status = None
+        self.done = False
+        self.last = None
+
+    @classmethod
+    def parse(cls, kind, text):
+        """`P`, `P/J` o `P/J/T` secondo il tipo."""
+        parts = text.split('/')
+        expected = {'project': 1, 'job': 2, 'task': 3}[kind]
+        if len(parts) != expected or not all(parts):
+            raise ValueError(f"{kind}: atteso {'/'.join(['ID'] * expected)}, trovato '{text}'")
+        return cls(kind, *parts)
+
+    def summary(self):
+        return {
+            'target': self.key, 'polls': self.polls, 'changes': self.changes, 'errors': self.errors,
+            'interval': round(self.interval, 3) if self.interval is not None else None,
+            'status': self.status, 'done': self.done,
+        }
+
+
+def _numeric_values(document, fields):
+    values = {}
+    for name, keys in fields:
+        value = document
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        # bool è un int per Python ma non è una metrica
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = float(value)
+    return values
+
+
+class MetricsPoller:
+    """
+    Interroga i target in parallelo (al più `concurrency` richieste in volo) su un
+    `spec_fetch.ConnectionPool` condiviso e registra i campioni in `store`.
+    """
+
+    def __init__(self, data, store=None, pool=None, concurrency=16, min_interval=5.0, max_interval=300.0,
+                 base_url=None, api_key=None, discover=False, seed=None):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError('intervalli non validi: serve 0 < min <= max')
+        self.operations = api_client.load_operations(data, OPERATIONS.values())
+        self.fields = {kind: self.operations[op].schema_fields() for kind, op in OPERATIONS.items()}
+        self.base_url = base_url or api_client.base_url(data)
+        self.headers = api_client.auth_headers(data, api_key)
+        self.store = store if store is not None else MetricStore()
+        self.pool = pool
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.discover = discover
+        self.targets = {}
+        self._random = random.Random(seed)
+        self._semaphore = None
+        self._tasks = []
+        self._deadline = None
+
+    def url(self, target):
+        return self.operations[OPERATIONS[target.kind]].url(self.base_url, **target.params)
+
+    def add(self, target):
+        """Aggiunge un target (ignorato se già presente); durante `run` parte subito."""
+        if target.key in self.targets:
+            return self.targets[target.key]
+        self.targets[target.key] = target
+        if self._semaphore is not None:
+            self._tasks.append(asyncio.ensure_future(self._loop(target)))
+        return target
+
+    def _jitter(self, interval):
+        return interval * self._random.uniform(0.9, 1.1)
+
+    def _next_interval(self, target, changed, error):
+        interval = target.interval or self.min_interval
+        if error:
+            interval *= 2
+        elif changed:
+            interval /= 2
+        else:
+            interval *= 1.5
+        if not error and target.kind != 'task' and target.last and target.last.get(RUNNING_FIELD) == 0:
+            # Nessuna esecuzione in corso: basta un controllo ogni tanto
+            interval = self.max_interval
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    async def poll(self, target):
+        """Una lettura del target; restituisce True se i valori sono cambiati."""
+        async with self._semaphore:
+            document = await api_client.get_json(self.pool, self.url(target), self.headers)
+        values = _numeric_values(document or {}, self.fields[target.kind])
+        target.polls += 1
+        instrumentation.count('pollsCompleted')
+        self.store.record(target.key, time.time(), values)
+        changed = target.last is not None and values != target.last
+        if changed:
+            target.changes += 1
+        target.last = values
+
+        if target.kind == 'task':
+            target.status = (document or {}).get(STATUS_FIELD)
+            if str(target.status).upper() in api_client.TERMINAL_STATUSES:
+                target.done = True
+        if self.discover and target.kind == 'project':
+            for job in (document or {}).get('jobs') or []:
+                if isinstance(job, dict) and job.get('jobId') is not None:
+                    self.add(Target('job', target.params['projectId'], str(job['jobId'])))
+        return changed
+
+    async def _loop(self, target):
+        loop = asyncio.get_running_loop()
+        # Partenze sfalsate: centinaia di target non devono colpire l'API nello stesso istante
+        await asyncio.sleep(self._random.uniform(0, self.min_interval))
+        while not target.done and loop.time() < self._deadline:
+            changed = error = False
+            try:
+                changed = await self.poll(target)
+            except api_client.ApiError as e:
+                error = True
+                target.errors += 1
+                instrumentation.count('pollsFailed')
+                if e.status in (401, 403, 404):
+                    # Target inesistente o non autorizzato: riprovare non serve
+                    target.status = f'HTTP {e.status}'
+                    target.done = True
+            except (OSError, asyncio.TimeoutError, spec_fetch.FetchError, ValueError):
+                error = True
+                target.errors += 1
+                instrumentation.count('pollsFailed')
+            if target.done:
+                break
+            target.interval = self._next_interval(target, changed, error)
+            await asyncio.sleep(min(self._jitter(target.interval), max(0.0, self._deadline - loop.time())))
+
+    async def run(self, duration=None):
+        """
+        Interroga i target per `duration` secondi (None: senza limite; termina prima
+        se tutti i target sono conclusi). Restituisce il riepilogo per target.
+        """
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.time() + duration if duration is not None else float('inf')
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        own_pool = self.pool is None
+        if own_pool:
+            self.pool = spec_fetch.ConnectionPool(max_per_host=self.concurrency)
+        self._tasks = [asyncio.ensure_future(self._loop(target)) for target in self.targets.values()]
+        try:
+            # I target scoperti durante il giro si aggiungono a `_tasks`
+            while self._tasks:
+                tasks, self._tasks = self._tasks, []
+                await asyncio.gather(*tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self._semaphore = None
+            if own_pool:
+                await self.pool.close()
+                self.pool = None
+        return [target.summary() for target in self.targets.values()]
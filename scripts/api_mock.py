@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Mock locale dell'API costruito da `openapi.yaml`.
+
+All'avvio ogni operazione viene compilata in una `Route` con la risposta già
+serializzata: la prima risposta 2xx (o `default`) con l'esempio della specifica
+(`example`/`examples` del media type) o, in mancanza, un valore generato dallo
+schema con `example_for`. Le route finiscono in un trie per segmenti di path
+(`RouteTable`): i path statici si risolvono con un solo accesso a dizionario,
+quelli con parametri scendendo il trie preferendo i segmenti letterali, come fa
+il routing dell'API. A richiesta servita non resta da fare altro che scrivere i
+byte pronti.
+
+`serve` è il server HTTP/1.1 keep-alive minimale su cui gira il mock (e, nei
+test, ogni altro handler che imita l'API).
+
+`conforms` controlla un valore contro uno schema (tipi, `required`, `enum`,
+`allOf`/`oneOf`/`anyOf`, `nullable`): lo usano i test per verificare che
+le risposte del mock rispettino la specifica.
+"""
+
+import asyncio
+import inspect
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import api_client
+
+MAX_DEPTH = 8
+STRING_FORMATS = {
+    'date-time': '2025-01-01T00:00:00Z',
+    'date': '2025-01-01',
+    'time': '00:00:00',
+    'uuid': '00000000-0000-4000-8000-000000000000',
+    'email': 'user@example.com',
+    'uri': 'https://example.com',
+    'url': 'https://example.com',
+    'hostname': 'example.com',
+    'ipv4': '127.0.0.1',
+    'byte': 'ZXhhbXBsZQ==',
+    'binary': '',
+    'password': 'secret',
+}
+JSON_TYPES = {
+    'object': dict, 'array': list, 'string': str, 'boolean': bool,
+    'integer': int, 'number': (int, float),
+}
+
+
+def _schema_type(schema):
+    kind = schema.get('type')
+    if isinstance(kind, list):
+        # OpenAPI 3.1: ["string", "null"]
+        kind = next((k for k in kind if k != 'null'), None)
+    if kind is None and 'properties' in schema:
+        kind = 'object'
+    return kind
+
+
+def example_for(data, schema, depth=0, refs=frozenset()):
+    """Valore d'esempio conforme a `schema`; None se lo schema è vuoto o ricorsivo oltre `MAX_DEPTH`."""
+    if not isinstance(schema, dict) or depth > MAX_DEPTH:
+        return None
+    ref = schema.get('$ref')
+    if isinstance(ref, str):
+        if ref in refs:
+            return None
+        return example_for(data, api_client.resolve(data, schema), depth, refs | {ref})
+    for key in ('example', 'default', 'const'):
+        if key in schema:
+            return schema[key]
+    if schema.get('enum'):
+        return schema['enum'][0]
+    if schema.get('allOf'):
+        merged = {}
+        for part in schema['allOf']:
+            value = example_for(data, part, depth + 1, refs)
+            if isinstance(value, dict):
+                merged.update(value)
+            elif value is not None:
+                return value
+        return merged
+    for key in ('oneOf', 'anyOf'):
+        if schema.get(key):
+            return example_for(data, schema[key][0], depth + 1, refs)
+
+    kind = _schema_type(schema)
+    if kind == 'object':
+        result = {}
+        for name, child in (schema.get('properties') or {}).items():
+            value = example_for(data, child, depth + 1, refs)
+            if value is not None or api_client.resolve(data, child).get('nullable'):
+                result[name] = value
+        return result
+    if kind == 'array':
+        item = example_for(data, schema.get('items'), depth + 1, refs)
+        return [] if item is None else [item] * max(1, schema.get('minItems') or 1)
+    if kind == 'string':
+        value = STRING_FORMATS.get(schema.get('format'), 'string')
+        return value.ljust(schema.get('minLength') or 0, 'x')
+    if kind in ('integer', 'number'):
+        value = schema.get('minimum', 1)
+        if 'maximum' in schema:
+            value = min(value, schema['maximum'])
+        return int(value) if kind == 'integer' else float(value)
+    if kind == 'boolean':
+        return True
+    return None
+
+
+def conforms(data, schema, value, path='$'):
+    """Lista delle violazioni di `value` rispetto a `schema` (vuota se conforme)."""
+    if not isinstance(schema, dict):
+        return []
+    schema = api_client.resolve(data, schema)
+    if value is None:
+        return [] if schema.get('nullable') or 'null' in (schema.get('type') or []) or not schema else [
+            f'{path}: null non ammesso']
+    errors = []
+    if 'enum' in schema and value not in schema['enum']:
+        errors.append(f'{path}: {value!r} non è tra {schema["enum"]}')
+    for part in schema.get('allOf') or []:
+        errors += conforms(data, part, value, path)
+    for key in ('oneOf', 'anyOf'):
+        if schema.get(key) and all(conforms(data, part, value, path) for part in schema[key]):
+            errors.append(f'{path}: nessuna alternativa di {key} è soddisfatta')
+    kind = _schema_type(schema)
+    expected = JSON_TYPES.get(kind)
+    if expected is None:
+        return errors
+    # bool è un int per Python ma non per JSON Schema
+    if not isinstance(value, expected) or (kind in ('integer', 'number') and isinstance(value, bool)):
+        return errors + [f'{path}: atteso {kind}, trovato {type(value).__name__}']
+    if kind == 'object':
+        for name in schema.get('required') or []:
+            if name not in value:
+                errors.append(f'{path}.{name}: obbligatorio')
+        properties = schema.get('properties') or {}
+        for name, child in value.items():
+            if name in properties:
+                errors += conforms(data, properties[name], child, f'{path}.{name}')
+    elif kind == 'array':
+        for index, item in enumerate(value):
+            errors += conforms(data, schema.get('items'), item, f'{path}[{index}]')
+    return errors
+
+
+def media_example(data, media):
+    """Esempio di un media type: `example`, il primo di `examples` o uno generato dallo schema."""
+    media = media or {}
+    if 'example' in media:
+        return media['example']
+    for example in (media.get('examples') or {}).values():
+        example = api_client.resolve(data, example)
+        if 'value' in example:
+            return example['value']
+    return example_for(data, media.get('schema'))
+
+
+class Route:
+    """Operazione compilata: parametri di path e risposta già serializzata."""
+
+    __slots__ = ('method', 'template', 'operation_id', 'param_names', 'status', 'headers', 'body', 'schema')
+
+    def __init__(self, data, method, template, operation):
+        self.method = method.upper()
+        self.template = template
+        self.operation_id = operation.get('operationId') or f'{self.method} {template}'
+        self.param_names = tuple(segment[1:-1] for segment in _segments(template) if _is_param(segment))
+        # Le chiavi YAML non quotate (200:) arrivano come interi
+        responses = {str(code): response for code, response in (operation.get('responses') or {}).items()}
+        codes = sorted(code for code in responses if code.startswith('2'))
+        code = codes[0] if codes else 'default'
+        self.status = int(code) if code.isdigit() else 200
+        response = api_client.resolve(data, responses.get(code) or {})
+        content = response.get('content') or {}
+        self.headers = {}
+        self.body = b''
+        self.schema = None
+        if content and self.status != 204:
+            media_type = 'application/json' if 'application/json' in content else next(iter(content))
+            value = media_example(data, content[media_type])
+            self.schema = (content[media_type] or {}).get('schema')
+            self.headers['Content-Type'] = media_type
+            if media_type.endswith('json'):
+                self.body = json.dumps(value, ensure_ascii=False).encode()
+            elif value is not None:
+                self.body = str(value).encode()
+
+
+def _segments(path):
+    return [segment for segment in path.split('/') if segment]
+
+
+def _is_param(segment):
+    return segment.startswith('{') and segment.endswith('}') and segment.count('{') == 1
+
+
+class _Node:
+    __slots__ = ('literals', 'param', 'routes')
+
+    def __init__(self):
+        self.literals = {}
+        self.param = None
+        self.routes = {}
+
+
+class RouteTable:
+    """
+    Trie dei path della specifica: segmenti letterali in un dizionario per nodo,
+    un solo figlio per i parametri; i path senza parametri stanno anche in una
+    tabella diretta (metodo, path).
+    """
+
+    def __init__(self, routes):
+        self.root = _Node()
+        self.static = {}
+        self.size = 0
+        for route in routes:
+            node = self.root
+            for segment in _segments(route.template):
+                if _is_param(segment):
+                    node.param = node.param or _Node()
+                    node = node.param
+                else:
+                    node = node.literals.setdefault(segment, _Node())
+            node.routes[route.method] = route
+            if not route.param_names:
+                self.static[(route.method, '/' + '/'.join(_segments(route.template)))] = route
+            self.size += 1
+
+    def _find(self, node, segments, index, values):
+        if index == len(segments):
+            return node if node.routes else None
+        child = node.literals.get(segments[index])
+        if child is not None:
+            found = self._find(child, segments, index + 1, values)
+            if found is not None:
+                return found
+        if node.param is not None:
+            values.append(segments[index])
+            found = self._find(node.param, segments, index + 1, values)
+            if found is not None:
+                return found
+            values.pop()
+        return None
+
+    def lookup(self, method, path):
+        """
+        (route, parametri) per la richiesta; (None, metodi ammessi) se il path
+        esiste con altri metodi, (None, None) se non esiste.
+        """
+        method = 'GET' if method == 'HEAD' else method
+        route = self.static.get((method, path.rstrip('/') or '/'))
+        if route is not None:
+            return route, {}
+        values = []
+        node = self._find(self.root, _segments(path), 0, values)
+        if node is None:
+            return None, None
+        route = node.routes.get(method)
+        if route is None:
+            return None, sorted(node.routes)
+        return route, dict(zip(route.param_names, values))
+
+
+def compile_routes(data):
+    routes = []
+    for template, path_item in (data.get('paths') or {}).items():
+        for method, operation in path_item.items():
+            if method in api_client.HTTP_METHODS and isinstance(operation, dict):
+                routes.append(Route(data, method, template, operation))
+    return routes
+
+
+class MockApi:
+    """
+    Handler per `serve` che risponde con gli esempi della specifica.
+
+    I path si accettano con o senza il prefisso del primo `servers` (es. `/api`).
+    `delay` (secondi) simula la latenza del backend; con `require_api_key` le
+    richieste senza l'header della chiave ricevono 401.
+    """
+
+    def __init__(self, data, delay=0.0, require_api_key=False):
+        self.data = data
+        self.routes = compile_routes(data)
+        self.table = RouteTable(self.routes)
+        servers = data.get('servers') or [{}]
+        self.base_path = urlsplit(servers[0].get('url') or '').path.rstrip('/')
+        self.delay = delay
+        header = next(iter(api_client.auth_headers(data, 'x')), 'X-API-Key')
+        self.api_key_header = header.lower() if require_api_key else None
+        self.hits = {}
+
+    def respond(self, request):
+        path = request.path
+        if self.base_path and (path == self.base_path or path.startswith(self.base_path + '/')):
+            path = path[len(self.base_path):] or '/'
+        route, params = self.table.lookup(request.method, path)
+        if route is None:
+            if params:
+                status, headers, body = api_client.json_response(
+                    {'code': 405, 'message': f'Method {request.method} not allowed'}, 405,
+                )
+                headers['Allow'] = ', '.join(params)
+                return status, headers, body
+            return api_client.json_response({'code': 404, 'message': f'No route for {request.path}'}, 404)
+        if self.api_key_header and not request.headers.get(self.api_key_header):
+            return api_client.json_response({'code': 401, 'message': 'Missing API key'}, 401)
+        self.hits[route.operation_id] = self.hits.get(route.operation_id, 0) + 1
+        return route.status, route.headers, route.body
+
+    async def handle(self, request):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.respond(request)
+
+    def handler(self):
+        """La funzione da passare a `serve`: sincrona se non c'è latenza simulata."""
+        return self.handle if self.delay else self.respond
+
+
+# --- Server locale -------------------------------------------------------------
+
+class Request:
+    """Richiesta ricevuta dal server locale."""
+
+    __slots__ = ('method', 'path', 'query', 'headers', 'body')
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+async def serve(handler, host='127.0.0.1', port=0, chunk_size=None):
+    """
+    Server HTTP/1.1 keep-alive minimale: esegue il mock e gli handler dei test.
+
+    `handler(request)` (funzione o coroutine) restituisce (status, {header: valore}, corpo
+    in byte). Con `chunk_size` i corpi sono inviati in `Transfer-Encoding: chunked`.
+    Restituisce (server, porta, stats) con i contatori di richieste e connessioni.
+    """
+    stats = {'requests': 0, 'connections': 0}
+
+    async def handle(reader, writer):
+        stats['connections'] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+                path, _, query = target.partition('?')
+                stats['requests'] += 1
+
+                result = handler(Request(method, unquote(path), dict(parse_qsl(query)), headers, body))
+                if inspect.isawaitable(result):
+                    result = await result
+                status, response_headers, payload = result
+                try:
+                    reason = HTTPStatus(status).phrase
+                except ValueError:
+                    reason = 'Unknown'
+                head = [f'HTTP/1.1 {status} {reason}'] + [f'{k}: {v}' for k, v in response_headers.items()]
+                if status == 304 or status == 204 or method == 'HEAD':
+                    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                elif chunk_size:
+                    head.append('Transfer-Encoding: chunked')
+                    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                    for i in range(0, len(payload), chunk_size):
+                        piece = payload[i:i + chunk_size]
+                        writer.write(f'{len(piece):x}\r\n'.encode() + piece + b'\r\n')
+                    writer.write(b'0\r\n\r\n')
+                else:
+                    head.append(f'Content-Length: {len(payload)}')
+                    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    return server, server.sockets[0].getsockname()[1], stats
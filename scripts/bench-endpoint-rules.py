@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark della classificazione degli endpoint: catene di `in` vs tabella di regole.
+
+Genera path sintetici nello stile delle route `/webrobot/api/...` di `openapi.yaml`,
+li classifica con le catene di if/elif usate dagli script (`endpoint_info`,
+`generic_tags`) e con la valutazione della tabella (`RuleSet`), verifica che i
+risultati coincidano e stampa i tempi. Le catene sono il percorso veloce: la tabella
+resta il riferimento dichiarativo delle regole.
+
+Uso:
+    python3 scripts/bench-endpoint-rules.py
+    python3 scripts/bench-endpoint-rules.py --paths 1000000 --seed 7
+"""
+
+import argparse
+import random
+import time
+
+from endpoint_rules import DEFAULT_RULES, DESCRIPTION_RULES, endpoint_info, generic_tags
+
+RESOURCES = [
+    ('projects', 'projectId'), ('jobs', 'jobId'), ('tasks', 'taskId'), ('agents', 'agentId'),
+    ('datasets', 'datasetId'), ('categories', 'categoryId'), ('cloud-credentials', 'credentialId'),
+    ('executions', 'executionId'), ('python-extensions', 'extensionId'), ('plugins', 'pluginId'),
+]
+PREFIXES = [
+    '/webrobot/api', '/webrobot/api/admin', '/webrobot/api/package', '/webrobot/cloud',
+    '/webrobot/api/ai-providers/providers/{provider}', '/webrobot/api/ean-image-sourcing/{country}',
+]
+ACTIONS = [
+    'execute', 'status', 'logs', 'info', 'health', 'upload', 'schedule', 'metrics',
+    'all', 'query', 'download', 'images', 'models', 'cost-estimate', 'bootstrap/status',
+]
+METHODS = ['get', 'get', 'get', 'post', 'post', 'put', 'delete', 'patch']
+
+
+def synthetic_paths(count, seed):
+    """Genera `count` coppie (path, metodo) nello stile delle route esistenti."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        parts = [rng.choice(PREFIXES)]
+        for resource, param in rng.sample(RESOURCES, rng.randint(1, 3)):
+            parts.append(resource)
+            style = rng.random()
+            if style < 0.4:
+                parts.append(f'id/{{{param}}}')
+            elif style < 0.6:
+                parts.append(f'{{{param}}}')
+            elif style < 0.7:
+                parts.append(rng.choice(['{id}', '{name}']))
+        if rng.random() < 0.6:
+            parts.append(rng.choice(ACTIONS))
+        result.append(('/'.join(parts), rng.choice(METHODS)))
+    return result
+
+
+def _time(label, func, items):
+    start = time.perf_counter()
+    for path, method in items:
+        func(path, method)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<36}{elapsed * 1000:10.1f} ms  {len(items) / elapsed:12,.0f} path/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark della classificazione degli endpoint')
+    parser.add_argument('--paths', type=int, default=100_000, help='Numero di path sintetici')
+    parser.add_argument('--seed', type=int, default=42, help='Seed del generatore')
+    args = parser.parse_args()
+
+    items = synthetic_paths(args.paths, args.seed)
+    print(f"🔍 Generati {len(items)} path sintetici (seed {args.seed})...")
+
+    mismatches = 0
+    for path, method in items:
+        if endpoint_info(path, method) != DEFAULT_RULES.classify(path, method):
+            mismatches += 1
+        if generic_tags(path) != DESCRIPTION_RULES.tags(path):
+            mismatches += 1
+    if mismatches:
+        print(f"❌ Errore: {mismatches} classificazioni diverse dalla tabella di regole")
+        return 1
+    print("✅ Classificazioni identiche alla tabella di regole")
+
+    print("⏱  endpoint_info (tags + summary + description):")
+    chain = _time('catena if/elif (usata dagli script)', endpoint_info, items)
+    table = _time('tabella di regole', DEFAULT_RULES.classify, items)
+    print(f"   la catena è {table / chain:.2f}x più veloce della tabella")
+
+    print("⏱  tags generici (enrich-endpoints):")
+    chain = _time('catena if (usata dagli script)', lambda p, m: generic_tags(p), items)
+    table = _time('tabella di regole', lambda p, m: DESCRIPTION_RULES.tags(p), items)
+    print(f"   la catena è {table / chain:.2f}x più veloce della tabella")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Benchmark a scala crescente degli strumenti Python di `scripts/`.
+
+Genera specifiche sintetiche da `openapi.yaml` (1x, 10x, 100x... copie delle
+operazioni e dei componenti, con `$ref` e `operationId` rinominati; nelle copie
+dispari mancano summary, description e tag, così le passate di arricchimento hanno
+lavoro da fare) e insiemi di pipeline sintetiche modellati su `examples/pipelines/`.
+Poi misura load, dump e il `main()` di ogni script di specifica, `validate_file`
+e il `main()` degli strumenti sulle pipeline.
+
+Ogni caso gira in un processo separato (cache dei documenti disattivata), così il
+picco di memoria (RSS, e con `--tracemalloc` anche il picco di allocazioni Python)
+è quello del solo caso. Il tempo riportato è il minimo su `--repeat` esecuzioni.
+
+I risultati si salvano come baseline JSON (`--save`); le esecuzioni successive
+vengono confrontate con la baseline ed escono con stato 2 se un caso supera la
+soglia di regressione (`--threshold`, `--memory-threshold`). Il tempo conta solo per
+i casi che nella baseline durano almeno 100 ms, e servono almeno 3 esecuzioni per caso.
+
+I dati generati restano in `.cache/bench/` e si rigenerano solo se cambia la
+sorgente. La scala 1000x (circa 220 MB di YAML) va richiesta esplicitamente.
+
+Uso:
+    python3 scripts/bench-tooling.py --save
+    python3 scripts/bench-tooling.py --scales 1,10 --threshold 0.25
+    python3 scripts/bench-tooling.py --scales 1000 --only spec.load,validate_file --tracemalloc
+    python3 scripts/bench-tooling.py --list
+"""
+
+import argparse
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import spec_engine
+
+ROOT_DIR = spec_engine.OPENAPI_FILE.parent
+PIPELINES_DIR = ROOT_DIR / 'examples' / 'pipelines'
+DATA_DIR = ROOT_DIR / '.cache' / 'bench'
+DEFAULT_BASELINE = ROOT_DIR / '.cache' / 'bench-baseline.json'
+DEFAULT_SCALES = (1, 10, 100)
+BASELINE_VERSION = 1
+# Da incrementare se cambia il modo in cui si generano i dati sintetici
+DATA_VERSION = 1
+# Sotto questa differenza assoluta una variazione di tempo è rumore, qualunque sia la soglia
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_MB = 2.0
+# I casi più brevi di così variano di decine di punti percentuali tra un'esecuzione e
+# l'altra: il loro tempo si riporta ma non fa scattare la soglia di regressione
+MIN_GATED_SECONDS = 0.1
+# Esecuzioni minime per caso: il minimo di meno esecuzioni è troppo rumoroso per il confronto
+MIN_REPEAT = 3
+
+COMPONENT_PREFIX = '#/components/'
+
+
+# --- Dati sintetici ------------------------------------------------------------
+
+def _rename(value, suffix):
+    """Copia profonda con i `$ref` ai componenti (esclusi gli schemi di sicurezza) rinominati."""
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            if key == '$ref' and isinstance(child, str) and child.startswith(COMPONENT_PREFIX) \
+                    and not child.startswith(f'{COMPONENT_PREFIX}securitySchemes/'):
+                result[key] = child + suffix
+            else:
+                result[key] = _rename(child, suffix)
+        return result
+    if isinstance(value, list):
+        return [_rename(child, suffix) for child in value]
+    return value
+
+
+def synthetic_spec(data, scale):
+    """Documento con `scale` copie di path e componenti; la copia 0 è l'originale."""
+    paths = {}
+    components = {kind: {} for kind in data.get('components') or {}}
+    for i in range(scale):
+        suffix = f'_s{i}' if i else ''
+        for path, item in data['paths'].items():
+            if i:
+                path = path.replace('/webrobot/', f'/webrobot/s{i}/', 1) if path.startswith('/webrobot/') \
+                    else f'/s{i}{path}'
+            item = _rename(item, suffix)
+            for method in spec_engine.HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                if i and 'operationId' in operation:
+                    operation['operationId'] += suffix
+                if i % 2:
+                    for key in ('summary', 'description', 'tags'):
+                        operation.pop(key, None)
+            paths[path] = item
+        for kind, entries in (data.get('components') or {}).items():
+            if kind == 'securitySchemes':
+                components[kind] = entries
+                continue
+            for name, value in entries.items():
+                components[kind][name + suffix] = _rename(value, suffix)
+    result = dict(data)
+    result['paths'] = paths
+    if components:
+        result['components'] = components
+    return result
+
+
+def changed_spec(data):
+    """Variante con poche modifiche (summary, un path rimosso, uno schema nuovo) per il diff."""
+    result = dict(data)
+    paths = dict(data['paths'])
+    step = max(1, len(paths) // 50)
+    for path in list(paths)[::step]:
+        item = dict(paths[path])
+        for method in spec_engine.HTTP_METHODS:
+            if isinstance(item.get(method), dict):
+                item[method] = dict(item[method], summary=f"{item[method].get('summary', '')} (v2)")
+                break
+        paths[path] = item
+    paths.pop(next(reversed(paths)))
+    result['paths'] = paths
+    components = dict(data.get('components') or {})
+    components['schemas'] = dict(components.get('schemas') or {}, BenchAdded={'type': 'object'})
+    result['components'] = components
+    return result
+
+
+def _source_digest():
+    digest = hashlib.sha256()
+    digest.update(spec_engine.OPENAPI_FILE.read_bytes())
+    for path in sorted(PIPELINES_DIR.glob('*.yaml')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(f'data-v{DATA_VERSION}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def prepare_data(data_dir, scales):
+    """Genera (se mancano) specifiche e pipeline sintetiche per ogni scala; restituisce la cartella."""
+    directory = Path(data_dir) / _source_digest()
+    source = None
+    for scale in scales:
+        spec = directory / f'spec-{scale}x.yaml'
+        if not spec.exists():
+            if source is None:
+                source = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+            print(f"🧪 Generazione specifica {scale}x...", file=sys.stderr)
+            directory.mkdir(parents=True, exist_ok=True)
+            data = synthetic_spec(source, scale)
+            spec_engine.dump_spec(changed_spec(data), directory / f'spec-{scale}x.changed.yaml')
+            spec_engine.dump_spec(data, directory / f'spec-{scale}x.tmp')
+            os.replace(directory / f'spec-{scale}x.tmp', spec)
+        pipelines = directory / f'pipelines-{scale}x'
+        if not pipelines.exists():
+            print(f"🧪 Generazione pipeline {scale}x...", file=sys.stderr)
+            tmp = directory / f'pipelines-{scale}x.tmp'
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            examples = [(p.name, p.read_text(encoding='utf-8')) for p in sorted(PIPELINES_DIR.glob('*.yaml'))]
+            for i in range(scale):
+                for name, text in examples:
+                    # Contenuti distinti per copia: niente scorciatoie basate sull'hash
+                    (tmp / f'{i:04d}-{name}').write_text(f'{text}\n# copia {i}\n', encoding='utf-8')
+            os.replace(tmp, pipelines)
+    return directory
+
+
+# --- Casi ----------------------------------------------------------------------
+
+def _call_main(script, argv):
+    module = spec_engine.load_script(script)
+    saved = sys.argv
+    sys.argv = [script] + argv
+    try:
+        module.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved
+
+
+def _spec_run_main(script, work):
+    """`main()` di uno script che chiama `spec_engine.run()` con la specifica di default."""
+    module = spec_engine.load_script(script)
+    original = spec_engine.run
+
+    def call():
+        spec_engine.run = functools.partial(original, input_file=work, output_file=work)
+        saved = sys.argv
+        sys.argv = [script]
+        try:
+            module.main()
+        finally:
+            spec_engine.run = original
+            sys.argv = saved
+    return call
+
+
+def _copy_spec(data, scale, work):
+    shutil.copyfile(data / f'spec-{scale}x.yaml', work)
+    return work
+
+
+def _case_load(data, scale, work):
+    return lambda: spec_engine.load_spec(data / f'spec-{scale}x.yaml')
+
+
+def _case_dump(data, scale, work):
+    loaded = spec_engine.load_spec(data / f'spec-{scale}x.yaml')
+    return lambda: spec_engine.dump_spec(loaded, work / 'dump.yaml')
+
+
+def _case_spec_main(script):
+    def setup(data, scale, work):
+        return _spec_run_main(script, _copy_spec(data, scale, work / 'openapi.yaml'))
+    return setup
+
+
+def _case_refresh(data, scale, work):
+    spec = _copy_spec(data, scale, work / 'openapi.yaml')
+    return lambda: _call_main('refresh-spec.py', ['--input', str(spec)])
+
+
+def _case_refs(data, scale, work):
+    return lambda: _call_main('spec-refs.py', ['--input', str(data / f'spec-{scale}x.yaml'), '--json'])
+
+
+def _case_diff(data, scale, work):
+    old, new = data / f'spec-{scale}x.yaml', data / f'spec-{scale}x.changed.yaml'
+    return lambda: _call_main('spec-diff.py', [str(old), str(new)])
+
+
+def _case_shards(data, scale, work):
+    spec = data / f'spec-{scale}x.yaml'
+    return lambda: _call_main('spec-shards.py', ['--input', str(spec), '--output-dir', str(work / 'shards'), '--force'])
+
+
+def _case_validate_file(data, scale, work):
+    validate_file = spec_engine.load_script('validate-pipeline-examples.py').validate_file
+    files = sorted(str(p) for p in (data / f'pipelines-{scale}x').glob('*.yaml'))
+
+    def call():
+        for path in files:
+            try:
+                validate_file(path)
+            except ValueError:
+                pass
+    return call
+
+
+def _case_pipeline_main(script):
+    def setup(data, scale, work):
+        main = spec_engine.load_script(script).main
+        return lambda: main([str(data / f'pipelines-{scale}x')])
+    return setup
+
+
+CASES = {
+    'spec.load': _case_load,
+    'spec.dump': _case_dump,
+    'remove-legacy-endpoints.main': _case_spec_main('remove-legacy-endpoints.py'),
+    'enrich-endpoints.main': _case_spec_main('enrich-endpoints.py'),
+    'auto-enrich-endpoints.main': _case_spec_main('auto-enrich-endpoints.py'),
+    'refresh-spec.main': _case_refresh,
+    'spec-refs.main': _case_refs,
+    'spec-diff.main': _case_diff,
+    'spec-shards.main': _case_shards,
+    'validate_file': _case_validate_file,
+    'validate-pipeline-examples.main': _case_pipeline_main('validate-pipeline-examples.py'),
+    'lint-pipelines.main': _case_pipeline_main('lint-pipelines.py'),
+    'estimate-pipeline-cost.main': _case_pipeline_main('estimate-pipeline-cost.py'),
+}
+
+
+def run_case(name, scale, data, repeat, trace):
+    """Esegue un caso nel processo corrente: {wall_s, peak_rss_mb[, peak_alloc_mb]}."""
+    result = {}
+    with contextlib.ExitStack() as stack:
+        work = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='bench-')))
+        sink = io.StringIO()
+        stack.enter_context(contextlib.redirect_stdout(sink))
+        stack.enter_context(contextlib.redirect_stderr(sink))
+        timings = []
+        for _ in range(repeat):
+            call = CASES[name](data, scale, work)
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+            sink.seek(0)
+            sink.truncate()
+        result['wall_s'] = round(min(timings), 6)
+        if trace:
+            # Passata separata: tracemalloc rallenta l'esecuzione e falserebbe i tempi
+            call = CASES[name](data, scale, work)
+            tracemalloc.start()
+            call()
+            result['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+    result['peak_rss_mb'] = round(_peak_rss_kb() / 1024, 2)
+    return result
+
+
+def _peak_rss_kb():
+    # ru_maxrss sopravvive a fork+exec (riporterebbe il picco del processo padre): su Linux
+    # VmHWM è il picco del solo processo corrente
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _spawn(name, scale, data, repeat, trace):
+    command = [sys.executable, __file__, '--case', name, '--scale', str(scale),
+               '--data', str(data), '--repeat', str(repeat)]
+    if trace:
+        command.append('--tracemalloc')
+    env = dict(os.environ, SPEC_CACHE_DISABLE='1')
+    completed = subprocess.run(command, capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{name}@{scale}x: {completed.stderr.strip().splitlines()[-1:]}')
+    return json.loads(completed.stdout)
+
+
+# --- Baseline ------------------------------------------------------------------
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f'{path}: versione della baseline non supportata')
+    return baseline
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """[(chiave, metrica, baseline, attuale)] per i casi oltre soglia."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        checks = [('wall_s', threshold, MIN_DELTA_SECONDS)] if base.get('wall_s', 0) >= MIN_GATED_SECONDS else []
+        if memory_threshold is not None:
+            checks += [('peak_rss_mb', memory_threshold, MIN_DELTA_MB), ('peak_alloc_mb', memory_threshold, MIN_DELTA_MB)]
+        for metric, limit, floor in checks:
+            if metric in base and metric in current:
+                if current[metric] > base[metric] * (1 + limit) and current[metric] - base[metric] > floor:
+                    regressions.append((key, metric, base[metric], current[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a scala crescente degli strumenti Python')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Fattori di scala separati da virgola (es. 1,10,100,1000)')
+    parser.add_argument('--only', help='Casi da eseguire, separati da virgola (default: tutti)')
+    parser.add_argument('--repeat', type=int, default=MIN_REPEAT,
+                        help=f'Esecuzioni per caso, almeno {MIN_REPEAT} (si tiene il minimo)')
+    parser.add_argument('--tracemalloc', action='store_true', help='Misura anche il picco di allocazioni Python')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='File JSON della baseline')
+    parser.add_argument('--save', action='store_true', help='Salva i risultati come nuova baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Regressione tollerata sul tempo (0.2 = +20%%)')
+    parser.add_argument('--memory-threshold', type=float, default=0.3,
+                        help='Regressione tollerata sulla memoria (negativo per non controllarla)')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='Cartella dei dati sintetici')
+    parser.add_argument('--output', type=Path, help='Scrive anche il resoconto JSON in questo file')
+    parser.add_argument('--list', action='store_true', help='Elenca i casi ed esce')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--data', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Processo figlio: un solo caso, risultato JSON su stdout
+        json.dump(run_case(args.case, args.scale, args.data, args.repeat, args.tracemalloc), sys.stdout)
+        return 0
+    if args.list:
+        for name in CASES:
+            print(name)
+        return 0
+
+    try:
+        if args.repeat < MIN_REPEAT:
+            raise ValueError(f'--repeat deve essere almeno {MIN_REPEAT}: il minimo di meno esecuzioni è rumore')
+        scales = [int(s) for s in args.scales.split(',')]
+        names = args.only.split(',') if args.only else list(CASES)
+        unknown = [n for n in names if n not in CASES]
+        if unknown:
+            raise ValueError(f"casi sconosciuti: {', '.join(unknown)} (disponibili: {', '.join(CASES)})")
+        baseline = None if args.save else load_baseline(args.baseline)
+        data = prepare_data(args.data_dir, scales)
+    except (OSError, ValueError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+
+    results = {}
+    print(f"{'caso':<34}{'scala':>7}{'tempo':>12}{'RSS':>11}{'baseline':>12}")
+    for scale in scales:
+        for name in names:
+            key = f'{name}@{scale}x'
+            try:
+                result = _spawn(name, scale, data, args.repeat, args.tracemalloc)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return 1
+            results[key] = result
+            base = (baseline or {}).get('results', {}).get(key)
+            reference = f"{base['wall_s'] * 1000:9.1f} ms" if base else ''
+            print(f"{name:<34}{scale:>6}x{result['wall_s'] * 1000:9.1f} ms{result['peak_rss_mb']:>8.1f} MB{reference:>12}")
+
+    report = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    if args.save:
+        previous = load_baseline(args.baseline) if args.baseline.exists() else None
+        if previous:
+            # I casi non eseguiti restano quelli della baseline precedente
+            report['results'] = {**previous['results'], **results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"💾 Baseline salvata in {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"ℹ️  Nessuna baseline in {args.baseline}: esegui con --save per crearla")
+        return 0
+
+    memory_threshold = args.memory_threshold if args.memory_threshold >= 0 else None
+    regressions = compare(results, baseline, args.threshold, memory_threshold)
+    for key, metric, old, new in regressions:
+        print(f"❌ Regressione {key} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    if not regressions:
+        print("✅ Nessuna regressione rispetto alla baseline")
+    short = [key for key in results if baseline['results'].get(key, {}).get('wall_s', MIN_GATED_SECONDS) < MIN_GATED_SECONDS]
+    if short:
+        print(f"ℹ️  Tempo non confrontato per {len(short)} casi sotto {MIN_GATED_SECONDS * 1000:.0f} ms")
+    return 2 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
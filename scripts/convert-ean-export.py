@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Convert EAN image sourcing result CSVs to the columnar `.eancol` format (see `ean_columnar.py`).
+
+Repeated strings are dictionary-encoded, `images` / `prod_product_image_urls` become
+offset arrays over one interned URL table and numeric columns become typed arrays;
+the file is read back memory-mapped, one column at a time. The conversion is lossless
+(`--verify` compares every value with the CSV text); the fixed header and offsets make
+small exports larger than their CSV.
+
+Usage:
+    python3 scripts/convert-ean-export.py dataset_226_results.csv                  # -> dataset_226_results.eancol
+    python3 scripts/convert-ean-export.py export.csv -o export.eancol --verify
+    python3 scripts/convert-ean-export.py export.csv --bench --columns "ean number,matching_score,images"
+    python3 scripts/convert-ean-export.py --inspect export.eancol
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from csv_fields import allow_large_fields
+from ean_columnar import DEFAULT_LIST_COLUMNS, LIST_SEPARATOR, ColumnarFile, NumericColumn, UrlListColumn, convert_csv
+
+
+def _csv_rows(path: str) -> Any:
+    f = open(path, newline="", encoding="utf-8")
+    reader = csv.reader(f)
+    return f, next(reader, []), reader
+
+
+def verify(csv_path: str, table: ColumnarFile) -> List[str]:
+    """Differences between the CSV and the text of the columnar file (at most 20)."""
+    errors: List[str] = []
+    f, header, reader = _csv_rows(csv_path)
+    with f:
+        columns = [table.column(name) for name in header]
+        rows = 0
+        for i, row in enumerate(reader):
+            rows += 1
+            for col, value in zip(columns, row):
+                text = col.text(i)
+                if text != value and len(errors) < 20:
+                    errors.append(f"row {i} column '{col.name}': {value!r} != {text!r}")
+    if rows != table.rows:
+        errors.append(f"row count {rows} != {table.rows}")
+    return errors
+
+
+def _touch(column: Any) -> int:
+    """Read every value of a column the way a consumer would; returns a checksum-like count."""
+    if isinstance(column, NumericColumn):
+        return len(column.values) + int(sum(column.values))
+    if isinstance(column, UrlListColumn):
+        return len(column.ids)
+    return sum(len(v) for v in column)
+
+
+def bench(csv_path: str, table_path: str, names: List[str], repeat: int) -> Dict[str, Any]:
+    csv_best = columnar_best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f, header, reader = _csv_rows(csv_path)
+        with f:
+            indexes = [header.index(n) for n in names]
+            values: List[List[str]] = [[] for _ in names]
+            for row in reader:
+                for out, i in zip(values, indexes):
+                    out.append(row[i])
+        csv_best = min(csv_best, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ColumnarFile(table_path) as table:
+            for column in table.read(names).values():
+                _touch(column)
+        columnar_best = min(columnar_best, time.perf_counter() - start)
+
+    return {
+        "columns": names,
+        "csv_bytes": os.path.getsize(csv_path),
+        "columnar_bytes": os.path.getsize(table_path),
+        "csv_parse_sec": round(csv_best, 4),
+        "columnar_read_sec": round(columnar_best, 4),
+        "speedup": round(csv_best / columnar_best, 1) if columnar_best else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert EAN result CSVs to the columnar .eancol format.")
+    parser.add_argument("csv", nargs="?", help="Result CSV to convert")
+    parser.add_argument("-o", "--output", help="Output file (default: <csv>.eancol)")
+    parser.add_argument(
+        "--list-columns", default=",".join(DEFAULT_LIST_COLUMNS),
+        help=f"Comma-separated columns holding '{LIST_SEPARATOR}'-separated URL lists",
+    )
+    parser.add_argument("--verify", action="store_true", help="Check the output against the CSV")
+    parser.add_argument("--bench", action="store_true", help="Time CSV parsing vs columnar reads")
+    parser.add_argument("--columns", help="Columns read by --bench (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Benchmark rounds (the best one is reported)")
+    parser.add_argument("--inspect", metavar="EANCOL", help="Describe an existing .eancol file and exit")
+    args = parser.parse_args(argv)
+    allow_large_fields()
+
+    try:
+        if args.inspect:
+            with ColumnarFile(args.inspect) as table:
+                json.dump(table.describe(), sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            return 0
+        if not args.csv:
+            parser.error("a CSV file is required (or --inspect)")
+
+        output = args.output or os.path.splitext(args.csv)[0] + ".eancol"
+        list_columns = [c.strip() for c in args.list_columns.split(",") if c.strip()]
+        report: Dict[str, Any] = convert_csv(args.csv, output, list_columns)
+        report["csv_bytes"] = os.path.getsize(args.csv)
+
+        errors: List[str] = []
+        if args.verify:
+            with ColumnarFile(output) as table:
+                errors = verify(args.csv, table)
+            report["verified"] = not errors
+        if args.bench:
+            with ColumnarFile(output) as table:
+                names = [c.strip() for c in args.columns.split(",")] if args.columns else table.columns
+                missing = [n for n in names if n not in table.columns]
+            if missing:
+                raise ValueError(f"Unknown columns: {', '.join(missing)}")
+            report["bench"] = bench(args.csv, output, names, args.repeat)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    for error in errors:
+        print(f"ERR - {error}", file=sys.stderr)
+    return 2 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
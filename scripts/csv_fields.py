@@ -0,0 +1,15 @@
+"""CSV field size limit shared by the readers of pipeline and EAN exports."""
+
+from __future__ import annotations
+
+import csv
+import sys
+
+# Exports keep whole snippets, descriptions and URL lists in a single field, well past
+# the 128 KiB default of the csv module
+MAX_FIELD_SIZE = min(sys.maxsize, 2 ** 31 - 1)
+
+
+def allow_large_fields() -> None:
+    """Raise the process-wide `csv` field size limit; called by the CLIs' `main()`, not at import."""
+    csv.field_size_limit(MAX_FIELD_SIZE)
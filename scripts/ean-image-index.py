@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Build and query the local EAN -> image index (see `ean_image_index.py`).
+
+Exports (CSV or `.eancol`) are added per country and only new entries are appended,
+so the index grows as new country runs arrive. Queries answer in the shape used by
+`POST /webrobot/api/ean-image-sourcing/{country}/images`, to serve as a local cache
+in front of that endpoint.
+
+Usage:
+    python3 scripts/ean-image-index.py --add italy=dataset_226_results.csv
+    python3 scripts/ean-image-index.py --add france=runs/fr.eancol --add spain=runs/es.csv
+    python3 scripts/ean-image-index.py --country italy --ean 8711000429969 --limit 3
+    echo '{"eans": ["8711000429969"], "limit": 1}' | python3 scripts/ean-image-index.py --country italy --request -
+    python3 scripts/ean-image-index.py --stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from csv_fields import allow_large_fields
+from ean_image_index import DEFAULT_FIELDS, DEFAULT_INDEX_DIR, DEFAULT_LIMIT, ImageIndex
+
+
+def _parse_pairs(items: List[str], what: str) -> List[List[str]]:
+    pairs = []
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key or not value:
+            raise ValueError(f"Invalid {what} '{item}' (expected NAME=VALUE)")
+        pairs.append([key, value])
+    return pairs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query the local EAN -> image index.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_DIR, help="Index directory")
+    parser.add_argument("--add", action="append", default=[], metavar="COUNTRY=FILE",
+                        help="Add an export (CSV or .eancol) for a country")
+    parser.add_argument("--field", action="append", default=[], metavar="NAME=COLUMN",
+                        help=f"Export column for {', '.join(DEFAULT_FIELDS)} (default: "
+                             f"{', '.join(f'{k}={v}' for k, v in DEFAULT_FIELDS.items())})")
+    parser.add_argument("--country", help="Country to query")
+    parser.add_argument("--ean", action="append", default=[], help="EAN to look up (repeatable)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Max images per EAN (default: %(default)s)")
+    parser.add_argument("--request", metavar="JSON_FILE",
+                        help="/images request body ({eans, limit, includeBase64}); '-' reads stdin")
+    parser.add_argument("--metadata", action="store_true",
+                        help="Add image id, rank and export column under indexMetadata (not in the API schema)")
+    parser.add_argument("--stats", action="store_true", help="Print index statistics")
+    args = parser.parse_args(argv)
+    allow_large_fields()
+
+    try:
+        fields = dict(DEFAULT_FIELDS)
+        for key, value in _parse_pairs(args.field, "--field"):
+            if key not in DEFAULT_FIELDS:
+                raise ValueError(f"Unknown field '{key}' (known: {', '.join(DEFAULT_FIELDS)})")
+            fields[key] = value
+        additions = _parse_pairs(args.add, "--add")
+
+        index = ImageIndex(args.index)
+        output: Dict[str, Any] = {}
+        if additions:
+            output["added"] = [index.add_export(country, path, fields) for country, path in additions]
+
+        if args.request or args.ean:
+            if not args.country:
+                raise ValueError("--country is required to query")
+            body: Dict[str, Any] = {"eans": args.ean, "limit": args.limit, "includeBase64": False}
+            if args.request:
+                with (sys.stdin if args.request == "-" else open(args.request, encoding="utf-8")) as f:
+                    body.update(json.load(f))
+            output.update(index.images_response(
+                args.country, body.get("eans") or [], body.get("limit"), bool(body.get("includeBase64")),
+                args.metadata,
+            ))
+
+        if args.stats or not output:
+            output["stats"] = {"index": args.index, **index.stats()}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    json.dump(output, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Compact columnar format for EAN image sourcing result exports (`*.eancol`).
+
+Result CSVs repeat the input EAN / description / brand on every candidate row and
+carry long `|`-separated image URL lists; this format stores each column once,
+in the encoding that fits it:
+
+- dict:     integer code per row + dictionary of distinct strings (repeated values)
+- text:     one string per row (mostly distinct values, e.g. titles and snippets)
+- url_list: offsets per row into an array of URL ids; the URLs of every list column
+            are interned once in a shared URL table
+- int64 / float64: typed arrays, plus a validity byte array if some values are empty
+
+String tables are an offset array (n + 1 entries) over one UTF-8 blob. Codes, ids and
+offsets use the narrowest unsigned type that holds their largest value (uint8 to uint64;
+the typecode of every segment is in the header).
+
+Every encoding is lossless: `Column.text(i)` returns the CSV value unchanged. A column
+is numeric only if every value prints back to the same text (`0.50` or `1e3` keep the
+column as strings), and a list column is stored as `url_list` only if every value is
+its URLs joined by `|` (no blanks around the separators, no empty entries); otherwise
+it is stored as strings.
+
+The header and the per-row offsets cost a few KB, so small exports (tens of rows) can
+be larger than the CSV; the format pays off on exports with repeated values and URLs.
+
+Layout: magic, uint64 header length, JSON header (rows, columns and the
+offset/length/typecode of every segment), then the segments, 8-byte aligned and
+little-endian. `ColumnarFile` memory-maps the file and exposes the segments as
+typed `memoryview`s, so reading a column copies nothing until values are decoded.
+"""
+
+from __future__ import annotations
+
+import abc
+import csv
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"EANCOL1\0"
+VERSION = 1
+DEFAULT_LIST_COLUMNS = ("images", "prod_product_image_urls")
+LIST_SEPARATOR = "|"
+# Columns with more distinct values than this fraction of the rows are stored as text
+DICT_MAX_RATIO = 0.5
+
+if sys.byteorder != "little":  # pragma: no cover
+    raise ImportError("ean_columnar supports little-endian platforms only")
+
+
+# --- Writing -------------------------------------------------------------------
+
+class _Interner:
+    """Distinct strings in first-seen order, with their ids."""
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: str) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+# No leading zeros (and no '-0'): EANs / UPCs like 0012345678905 must stay strings
+_INT_RE = re.compile(r"0|-?[1-9]\d{0,17}")
+_FLOAT_RE = re.compile(r"-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+
+
+def _as_int(value: str) -> Optional[int]:
+    return int(value) if _INT_RE.fullmatch(value) else None
+
+
+def _as_float(value: str) -> Optional[float]:
+    # Plain decimal notation only: 'nan', 'inf' or '1_0' stay strings, and so do values
+    # that would print differently ('0.50', '1e3', '1.')
+    if not _FLOAT_RE.fullmatch(value):
+        return None
+    number = float(value)
+    return number if repr(number) == value else None
+
+
+def _narrow(values: Sequence[int]) -> array:
+    """Unsigned integers in the narrowest array type that holds the largest of them."""
+    top = max(values, default=0)
+    for typecode in ("B", "H", "I"):
+        if top < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, values)
+    return array("Q", values)
+
+
+class _ColumnBuilder:
+    def __init__(self, name: str, is_list: bool) -> None:
+        self.name = name
+        self.is_list = is_list
+        # Scalar columns: dictionary codes; the final encoding is chosen in `encode`
+        self.strings = _Interner()
+        self.codes = array("I")
+        # List columns: URL ids and row offsets into them
+        self.ids = array("I")
+        self.offsets = array("Q", [0])
+
+    def append(self, value: str, urls: _Interner) -> None:
+        if self.is_list:
+            listed = [url for url in value.split(LIST_SEPARATOR) if url.strip() == url and url]
+            if LIST_SEPARATOR.join(listed) == value:
+                self.ids.extend(urls.add(url) for url in listed)
+                self.offsets.append(len(self.ids))
+                return
+            self._to_strings(urls)
+        self.codes.append(self.strings.add(value))
+
+    def _to_strings(self, urls: _Interner) -> None:
+        """Store the column as strings from now on: a value would not survive the URL-list encoding."""
+        self.is_list = False
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            self.codes.append(self.strings.add(LIST_SEPARATOR.join(urls.values[u] for u in self.ids[start:end])))
+        self.ids = array("I")
+        self.offsets = array("Q", [0])
+
+    def encode(self) -> Tuple[str, Dict[str, Any]]:
+        """Encoding kind and segments ({name: array or string list}) of the column."""
+        if self.is_list:
+            return "url_list", {"offsets": _narrow(self.offsets), "ids": _narrow(self.ids)}
+
+        distinct = [v for v in self.strings.values if v != ""]
+        has_empty = len(distinct) != len(self.strings.values)
+        for kind, parse, typecode in (("int64", _as_int, "q"), ("float64", _as_float, "d")):
+            parsed = [parse(v) for v in distinct]
+            if distinct and all(p is not None for p in parsed):
+                by_code = [0 if v == "" else parse(v) for v in self.strings.values]
+                segments: Dict[str, Any] = {"values": array(typecode, (by_code[c] for c in self.codes))}
+                if has_empty:
+                    empty = self.strings.ids[""]
+                    segments["valid"] = array("B", (c != empty for c in self.codes))
+                return kind, segments
+
+        if len(self.strings.values) > DICT_MAX_RATIO * max(1, len(self.codes)):
+            values = self.strings.values
+            return "text", {"strings": [values[c] for c in self.codes]}
+        return "dict", {"codes": _narrow(self.codes), "dictionary": self.strings.values}
+
+
+def _string_table(values: Sequence[str]) -> Tuple[array, bytes]:
+    offsets = [0]
+    parts = []
+    total = 0
+    for value in values:
+        data = value.encode("utf-8")
+        parts.append(data)
+        total += len(data)
+        offsets.append(total)
+    return _narrow(offsets), b"".join(parts)
+
+
+class _SegmentWriter:
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: Any, typecode: str) -> List[Any]:
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        pad = -self.size % 8
+        if pad:
+            self.chunks.append(b"\0" * pad)
+            self.size += pad
+        entry = [self.size, len(raw), typecode]
+        self.chunks.append(raw)
+        self.size += len(raw)
+        return entry
+
+    def add_strings(self, values: Sequence[str]) -> Dict[str, List[Any]]:
+        offsets, blob = _string_table(values)
+        return {"offsets": self.add(offsets, offsets.typecode), "blob": self.add(blob, "B")}
+
+
+def write_columnar(
+    output: str,
+    header: List[str],
+    rows: Iterable[List[str]],
+    list_columns: Iterable[str] = DEFAULT_LIST_COLUMNS,
+) -> None:
+    """Encode CSV rows (lists of strings) into a columnar file."""
+    wanted = {c.lower() for c in list_columns}
+    builders = [_ColumnBuilder(name, name.strip().lower() in wanted) for name in header]
+    urls = _Interner()
+    n = 0
+    width = len(header)
+    for row in rows:
+        if len(row) != width:
+            row = (row + [""] * width)[:width]
+        for builder, value in zip(builders, row):
+            builder.append(value, urls)
+        n += 1
+
+    segments = _SegmentWriter()
+    columns = []
+    for builder in builders:
+        kind, data = builder.encode()
+        entry: Dict[str, Any] = {"name": builder.name, "kind": kind, "segments": {}}
+        for key, value in data.items():
+            if key in ("dictionary", "strings"):
+                entry["segments"].update({f"{key}.{k}": v for k, v in segments.add_strings(value).items()})
+            else:
+                entry["segments"][key] = segments.add(value, value.typecode)
+        if kind == "dict":
+            entry["distinct"] = len(data["dictionary"])
+        columns.append(entry)
+    url_table = segments.add_strings(urls.values)
+
+    header_json = json.dumps({
+        "version": VERSION,
+        "rows": n,
+        "columns": columns,
+        "urls": {"count": len(urls.values), "segments": url_table},
+    }, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(header_json)) + header_json
+    prefix += b"\0" * (-len(prefix) % 8)
+    # Segment offsets in the header are relative to the end of the (padded) prefix
+    with open(output, "wb") as f:
+        f.write(prefix)
+        f.writelines(segments.chunks)
+
+
+def convert_csv(path: str, output: str, list_columns: Iterable[str] = DEFAULT_LIST_COLUMNS) -> Dict[str, Any]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        write_columnar(output, header, reader, list_columns)
+    with ColumnarFile(output) as table:
+        return table.describe()
+
+
+# --- Reading -------------------------------------------------------------------
+
+class StringTable:
+    """Strings stored as offsets over a UTF-8 blob; `raw(i)` is a zero-copy view."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> memoryview:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.raw(i), "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class Column(abc.ABC):
+    def __init__(self, name: str, kind: str, rows: int) -> None:
+        self.name = name
+        self.kind = kind
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self.rows):
+            yield self[i]
+
+    @abc.abstractmethod
+    def __getitem__(self, i: int) -> Any:
+        """Decoded value of row i."""
+
+    def text(self, i: int) -> str:
+        """Value as it was in the CSV."""
+        return str(self[i])
+
+
+class DictColumn(Column):
+    def __init__(self, name: str, rows: int, codes: memoryview, dictionary: StringTable) -> None:
+        super().__init__(name, "dict", rows)
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __getitem__(self, i: int) -> str:
+        return self.dictionary[self.codes[i]]
+
+
+class TextColumn(Column):
+    def __init__(self, name: str, rows: int, strings: StringTable) -> None:
+        super().__init__(name, "text", rows)
+        self.strings = strings
+
+    def __getitem__(self, i: int) -> str:
+        return self.strings[i]
+
+
+class NumericColumn(Column):
+    """`values` is the typed array; rows with `valid[i] == 0` were empty in the CSV (None)."""
+
+    def __init__(self, name: str, kind: str, rows: int, values: memoryview, valid: Optional[memoryview]) -> None:
+        super().__init__(name, kind, rows)
+        self.values = values
+        self.valid = valid
+
+    def __getitem__(self, i: int) -> Optional[float]:
+        if self.valid is not None and not self.valid[i]:
+            return None
+        return self.values[i]
+
+    def text(self, i: int) -> str:
+        # Only values that print back to their CSV text are stored as numbers
+        value = self[i]
+        return "" if value is None else repr(value)
+
+
+class UrlListColumn(Column):
+    """`ids_of(i)` is a zero-copy view of the URL ids of row i; `urls` is the shared URL table."""
+
+    def __init__(self, name: str, rows: int, offsets: memoryview, ids: memoryview, urls: StringTable) -> None:
+        super().__init__(name, "url_list", rows)
+        self.offsets = offsets
+        self.ids = ids
+        self.urls = urls
+
+    def ids_of(self, i: int) -> memoryview:
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> List[str]:
+        return [self.urls[u] for u in self.ids_of(i)]
+
+    def text(self, i: int) -> str:
+        return LIST_SEPARATOR.join(self[i])
+
+
+class ColumnarFile:
+    """Memory-mapped `.eancol` file; columns are decoded lazily, row by row."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            if bytes(self._view[:len(MAGIC)]) != MAGIC:
+                raise ValueError(f"{path} is not an .eancol file")
+            (length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+            start = len(MAGIC) + 8
+            self.header = json.loads(bytes(self._view[start:start + length]))
+            if self.header.get("version") != VERSION:
+                raise ValueError(f"{path}: unsupported version {self.header.get('version')}")
+        except Exception:
+            self.close()
+            raise
+        end = start + length
+        self._base = end + (-end % 8)
+        self.rows: int = self.header["rows"]
+        self.columns: List[str] = [c["name"] for c in self.header["columns"]]
+        self._entries = {c["name"]: c for c in self.header["columns"]}
+        self._urls: Optional[StringTable] = None
+
+    def _segment(self, entry: List[Any]) -> memoryview:
+        offset, length, typecode = entry
+        view = self._view[self._base + offset:self._base + offset + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def _strings(self, segments: Dict[str, Any], prefix: str) -> StringTable:
+        return StringTable(self._segment(segments[f"{prefix}offsets"]), self._segment(segments[f"{prefix}blob"]))
+
+    @property
+    def urls(self) -> StringTable:
+        if self._urls is None:
+            self._urls = self._strings(self.header["urls"]["segments"], "")
+        return self._urls
+
+    def column(self, name: str) -> Column:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"no column '{name}' (columns: {', '.join(self.columns)})")
+        kind, seg = entry["kind"], entry["segments"]
+        if kind == "dict":
+            return DictColumn(name, self.rows, self._segment(seg["codes"]), self._strings(seg, "dictionary."))
+        if kind == "text":
+            return TextColumn(name, self.rows, self._strings(seg, "strings."))
+        if kind == "url_list":
+            return UrlListColumn(name, self.rows, self._segment(seg["offsets"]), self._segment(seg["ids"]), self.urls)
+        valid = self._segment(seg["valid"]) if "valid" in seg else None
+        return NumericColumn(name, kind, self.rows, self._segment(seg["values"]), valid)
+
+    def read(self, names: Optional[Iterable[str]] = None) -> Dict[str, Column]:
+        """The requested columns (all by default), without copying their data."""
+        return {name: self.column(name) for name in (self.columns if names is None else names)}
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "rows": self.rows,
+            "bytes": len(self._mmap),
+            "urls": self.header["urls"]["count"],
+            "columns": [
+                {"name": c["name"], "kind": c["kind"],
+                 "bytes": sum(s[1] for s in c["segments"].values()),
+                 **({"distinct": c["distinct"]} if "distinct" in c else {})}
+                for c in self.header["columns"]
+            ],
+        }
+
+    def close(self) -> None:
+        self._urls = None
+        self._entries = {}
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # Column views are still referenced; the map is released with them
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
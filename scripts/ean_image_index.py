@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+EAN -> image index built from EAN image sourcing exports, for offline serving.
+
+Every image URL is interned once (`urls.txt`, id = line number) and each country
+keeps, per EAN, the images found for it ranked by `matching_score` (the best score
+wins when an image is found by several result rows). Relative image URLs are
+resolved against the row's `result_link`; `data:` URIs are dropped.
+
+The on-disk index is append-only, so new country runs are added incrementally:
+
+    <index>/urls.txt           interned image URLs, one per line
+    <index>/sources.txt        interned result links, one per line
+    <index>/<country>.jsonl    [ean, image_id, score, source_id, field] entries
+    <index>/manifest.json      digests of the ingested exports (re-adding one is a no-op)
+
+Loading replays the logs into dictionaries; a lookup is one dict access plus a
+ranked list that is cached until the EAN receives new images.
+
+`images_response` answers like `POST /webrobot/api/ean-image-sourcing/{country}/images`
+(request fields `eans`, `limit`, `includeBase64`) with the response schema of
+`openapi.yaml`: `results[]` of `{ean, images[]}`, each image `{url, base64, schours,
+source}`, where `schours` is the export's matching score and `source` the result page
+the image was found on. Index details that are not in the schema (image id, rank,
+export column) are only added under `indexMetadata` when asked for.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+# Under the repository root, next to the spec cache (see `spec_cache.py`)
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache",
+                                 "ean-image-index")
+# `limit` of the /images request when it is not set (the spec's default)
+DEFAULT_LIMIT = 5
+DEFAULT_FIELDS: Dict[str, str] = {
+    "ean": "ean number",
+    "score": "matching_score",
+    "source": "result_link",
+}
+IMAGE_FIELDS = ("images", "prod_product_image_urls")
+LIST_SEPARATOR = "|"
+
+
+class Candidate(NamedTuple):
+    ean: str
+    score: float
+    source: str
+    # (field, image URL) pairs, URLs as found in the export
+    images: List[Tuple[str, str]]
+
+
+class _Table:
+    """Append-only interned strings backed by a text file (id = line number)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._pending: List[str] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    self._intern(line.rstrip("\n"))
+
+    def _intern(self, value: str) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+    def add(self, value: str) -> int:
+        n = len(self.values)
+        i = self._intern(value)
+        if i == n:
+            self._pending.append(value)
+        return i
+
+    def flush(self) -> None:
+        if self._pending:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(v + "\n" for v in self._pending)
+            self._pending = []
+
+
+def _clean_url(url: str, base: str) -> Optional[str]:
+    url = url.strip()
+    if not url or url.startswith("data:"):
+        return None
+    if not url.startswith(("http://", "https://")):
+        if not base.startswith(("http://", "https://")):
+            return None
+        url = urljoin(base, url)
+    # One URL per line in urls.txt
+    return url if "\n" not in url and "\r" not in url else None
+
+
+def _score(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# --- Export readers --------------------------------------------------------------
+
+def read_csv(path: str, fields: Dict[str, str] = DEFAULT_FIELDS) -> Iterator[Candidate]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        index = {name: i for i, name in enumerate(header)}
+        if fields["ean"].lower() not in index:
+            raise ValueError(f"{path}: no '{fields['ean']}' column")
+        ean_i = index[fields["ean"].lower()]
+        score_i = index.get(fields["score"].lower())
+        source_i = index.get(fields["source"].lower())
+        image_is = [(name, index[name]) for name in IMAGE_FIELDS if name in index]
+        for row in reader:
+            def cell(i: Optional[int]) -> str:
+                return row[i] if i is not None and i < len(row) else ""
+
+            yield Candidate(
+                cell(ean_i).strip(),
+                _score(cell(score_i)),
+                cell(source_i),
+                [(name, url) for name, i in image_is for url in cell(i).split(LIST_SEPARATOR)],
+            )
+
+
+def read_columnar(path: str, fields: Dict[str, str] = DEFAULT_FIELDS) -> Iterator[Candidate]:
+    """Candidates from a `.eancol` file (see `ean_columnar.py`), reading only the needed columns."""
+    from ean_columnar import ColumnarFile
+
+    with ColumnarFile(path) as table:
+        by_lower = {c.lower(): c for c in table.columns}
+        if fields["ean"].lower() not in by_lower:
+            raise ValueError(f"{path}: no '{fields['ean']}' column")
+        ean = table.column(by_lower[fields["ean"].lower()])
+        score = table.column(by_lower[fields["score"].lower()]) if fields["score"].lower() in by_lower else None
+        source = table.column(by_lower[fields["source"].lower()]) if fields["source"].lower() in by_lower else None
+        images = [(name, table.column(by_lower[name])) for name in IMAGE_FIELDS if name in by_lower]
+        for i in range(table.rows):
+            yield Candidate(
+                ean.text(i).strip(),
+                _score(score[i]) if score is not None else 0.0,
+                source[i] if source is not None else "",
+                [(name, url) for name, column in images for url in column.text(i).split(LIST_SEPARATOR)],
+            )
+        del ean, score, source, images
+
+
+def read_export(path: str, fields: Dict[str, str] = DEFAULT_FIELDS) -> Iterator[Candidate]:
+    return read_columnar(path, fields) if path.endswith(".eancol") else read_csv(path, fields)
+
+
+# --- Index -----------------------------------------------------------------------
+
+class ImageIndex:
+    def __init__(self, directory: str = DEFAULT_INDEX_DIR) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.urls = _Table(os.path.join(directory, "urls.txt"))
+        self.sources = _Table(os.path.join(directory, "sources.txt"))
+        self._manifest_path = os.path.join(directory, "manifest.json")
+        self.manifest: Dict[str, Any] = {"ingested": {}}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        # country -> ean -> image_id -> (score, source_id, field)
+        self._images: Dict[str, Dict[str, Dict[int, Tuple[float, int, str]]]] = {}
+        # country -> ean -> ranked [(image_id, score, source_id, field)]
+        self._ranked: Dict[str, Dict[str, List[Tuple[int, float, int, str]]]] = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".jsonl"):
+                self._replay(name[:-len(".jsonl")])
+
+    def _country_path(self, country: str) -> str:
+        return os.path.join(self.directory, f"{country}.jsonl")
+
+    def _replay(self, country: str) -> None:
+        with open(self._country_path(country), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    ean, image_id, score, source_id, field = json.loads(line)
+                    self._put(country, ean, image_id, score, source_id, field)
+
+    def _put(self, country: str, ean: str, image_id: int, score: float, source_id: int, field: str) -> bool:
+        images = self._images.setdefault(country, {}).setdefault(ean, {})
+        current = images.get(image_id)
+        if current is not None and current[0] >= score:
+            return False
+        images[image_id] = (score, source_id, field)
+        self._ranked.get(country, {}).pop(ean, None)
+        return True
+
+    @property
+    def countries(self) -> List[str]:
+        return sorted(self._images)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "urls": len(self.urls.values),
+            "sources": len(self.sources.values),
+            "eans": {country: len(eans) for country, eans in sorted(self._images.items())},
+            "ingested": len(self.manifest["ingested"]),
+        }
+
+    def add(self, country: str, candidates: Iterable[Candidate]) -> Dict[str, int]:
+        """Index the candidates of one export; returns row / image counts."""
+        if not country or os.sep in country or country.startswith("."):
+            raise ValueError(f"Invalid country '{country}'")
+        stats = {"rows": 0, "images": 0, "new_entries": 0, "skipped_urls": 0}
+        entries: List[str] = []
+        for candidate in candidates:
+            stats["rows"] += 1
+            if not candidate.ean:
+                continue
+            source_id = self.sources.add(candidate.source)
+            for field, raw in candidate.images:
+                url = _clean_url(raw, candidate.source)
+                if url is None:
+                    stats["skipped_urls"] += bool(raw.strip())
+                    continue
+                stats["images"] += 1
+                image_id = self.urls.add(url)
+                if self._put(country, candidate.ean, image_id, candidate.score, source_id, field):
+                    stats["new_entries"] += 1
+                    entries.append(json.dumps([candidate.ean, image_id, candidate.score, source_id, field]) + "\n")
+
+        # Tables first: every id in the country log must resolve after a crash
+        self.urls.flush()
+        self.sources.flush()
+        with open(self._country_path(country), "a", encoding="utf-8") as f:
+            f.writelines(entries)
+        return stats
+
+    def add_export(self, country: str, path: str, fields: Dict[str, str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+        digest = file_digest(path)
+        key = f"{country}:{digest}"
+        if key in self.manifest["ingested"]:
+            return {"file": path, "country": country, "skipped": "already ingested"}
+        stats = self.add(country, read_export(path, fields))
+        self.manifest["ingested"][key] = {"file": os.path.abspath(path), **stats}
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._manifest_path)
+        return {"file": path, "country": country, **stats}
+
+    def ranked(self, country: str, ean: str) -> List[Tuple[int, float, int, str]]:
+        ean = ean.strip()
+        ranked = self._ranked.setdefault(country, {})
+        result = ranked.get(ean)
+        if result is None:
+            images = self._images.get(country, {}).get(ean, {})
+            # Best score first, then the image found first
+            result = ranked[ean] = sorted(
+                ((i, s, src, field) for i, (s, src, field) in images.items()),
+                key=lambda r: (-r[1], r[0]),
+            )
+        return result
+
+    def images_response(
+        self, country: str, eans: Iterable[Any], limit: Optional[int] = DEFAULT_LIMIT, include_base64: bool = False,
+        metadata: bool = False,
+    ) -> Dict[str, Any]:
+        """Answer an `/images` request from the index; a `limit` of None applies the spec's default."""
+        limit = DEFAULT_LIMIT if limit is None else max(0, limit)
+        results = []
+        for ean in eans:
+            ean = str(ean).strip()
+            images = []
+            for rank, (image_id, score, source_id, field) in enumerate(self.ranked(country, ean)[:limit], 1):
+                image: Dict[str, Any] = {
+                    "url": self.urls.values[image_id],
+                    "schours": score,
+                    "source": self.sources.values[source_id],
+                }
+                if include_base64:
+                    # Image bytes are not cached offline; callers fetch them from `url` or the endpoint
+                    image["base64"] = None
+                if metadata:
+                    image["indexMetadata"] = {"imageId": image_id, "rank": rank, "field": field}
+                images.append(image)
+            results.append({"ean": ean, "images": images})
+        return {"results": results}
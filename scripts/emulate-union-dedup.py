@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Dry-run `load_union` + `dedup` locally on real exports, with bounded memory.
+
+The sources and keys are read from a pipeline YAML (the first `load_union` and the
+`dedup` after it, e.g. `13-vertical-stitch-union-dedup-offers.yaml`), with `${VAR}`
+paths resolved from the environment or `--env`; or given directly as CSV files
+with `--key`. The engine is `pipeline_union.py`: streamed union by column name and
+first-row-per-key dedup that spills sorted runs to disk past `--memory-mb`.
+
+The stitched rows are written as CSV (`--output`, default stdout); a JSON report
+(rows per source, duplicates, spilled runs, peak RSS) goes to stderr.
+
+Usage:
+    OUTPUT_PATH_A=a.csv OUTPUT_PATH_B=b.csv \\
+        python3 scripts/emulate-union-dedup.py --pipeline examples/pipelines/13-vertical-stitch-union-dedup-offers.yaml \\
+        --output stitched.csv
+    python3 scripts/emulate-union-dedup.py a.csv b.csv --key url --memory-mb 64 --output stitched.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from csv_fields import allow_large_fields
+from pipeline_union import (
+    DEFAULT_MEMORY_BYTES,
+    DedupStats,
+    dedup,
+    key_indexes,
+    resolve_source,
+    union_by_name,
+    union_dedup_stages,
+)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _parse_env(items: List[str]) -> Dict[str, str]:
+    env: Dict[str, str] = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Invalid --env '{item}' (expected NAME=VALUE)")
+        env[key] = value
+    return env
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Emulate load_union + dedup locally with bounded memory.")
+    parser.add_argument("paths", nargs="*", help="CSV files to union (with header), instead of --pipeline")
+    parser.add_argument("--pipeline", help="Pipeline YAML with a load_union stage followed by dedup")
+    parser.add_argument("--key", action="append", default=[], help="Dedup key column (repeatable; default: full row)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Value of a ${NAME} reference in source paths")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_BYTES / (1024 * 1024),
+                        help="Memory budget for the key set and the spill buffer")
+    parser.add_argument("--temp-dir", help="Directory for spilled runs (default: system temp)")
+    parser.add_argument("--output", help="Output CSV (default: stdout)")
+    args = parser.parse_args(argv)
+    allow_large_fields()
+
+    if bool(args.pipeline) == bool(args.paths):
+        parser.error("give either --pipeline or CSV paths")
+
+    try:
+        env = _parse_env(args.env)
+        if args.pipeline:
+            from spec_cache import load_yaml
+
+            specs, keys = union_dedup_stages(load_yaml(args.pipeline) or {})
+            if args.key:
+                keys = args.key
+        else:
+            specs = [{"format": "csv", "path": p, "options": {"header": "true"}} for p in args.paths]
+            keys = args.key or None
+        sources = [resolve_source(spec, env) for spec in specs]
+        counts: Dict[str, int] = {}
+        union = union_by_name(sources, counts)
+        indexes = key_indexes(union.columns, keys)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    stats = DedupStats()
+    start = time.perf_counter()
+    out: Any = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(union.columns)
+        writer.writerows(dedup(union.rows, indexes, int(args.memory_mb * 1024 * 1024), args.temp_dir, stats))
+    except (OSError, ValueError, csv.Error, UnicodeDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    report = {
+        "sources": [{"path": s.label, "format": s.format, "files": len(s.files), "rows": counts.get(s.label, 0)}
+                    for s in sources],
+        "columns": union.columns,
+        "keys": keys,
+        **stats.as_dict(),
+        "elapsed_sec": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    json.dump(report, sys.stderr, indent=2)
+    sys.stderr.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Tabella dichiarativa delle regole di classificazione degli endpoint OpenAPI.
+
+Raccoglie in un unico posto le regole per tags, summary/description e descrizioni dei
+parametri usate da `enrich-endpoints.py` (profilo `descriptions`) e da
+`auto-enrich-endpoints.py` (profilo `defaults`). `RuleSet` valuta la tabella con un
+ciclo sulle regole ed è il riferimento; `endpoint_info` e `generic_tags` sono le catene
+di test originali, usate dagli script perché più veloci (in CPython ogni test `in` gira
+in C e nessuna valutazione della tabella, né regex combinata né maschere per segmento,
+le eguaglia). `bench-endpoint-rules.py` e `tests/test_endpoint_rules.py` verificano che
+le catene diano gli stessi risultati della tabella.
+"""
+
+DESCRIPTIONS = 'descriptions'
+DEFAULTS = 'defaults'
+BOTH = (DESCRIPTIONS, DEFAULTS)
+
+# Token speciale: il path termina con 's' (tipicamente una lista di risorse)
+ENDS_WITH_S = '<ends-with-s>'
+
+# (sottostringa del path, tag, profili) - l'ordine della tabella è l'ordine dei tag assegnati
+TAG_RULES = [
+    ('/projects/', 'Projects', BOTH),
+    ('/jobs/', 'Jobs', BOTH),
+    ('/tasks/', 'Tasks', BOTH),
+    ('/agents/', 'Agents', BOTH),
+    ('/datasets/', 'Datasets', (DESCRIPTIONS,)),
+    ('/datasets', 'Datasets', (DEFAULTS,)),
+    ('/categories/', 'Categories', BOTH),
+    ('/cloud/', 'Cloud', (DESCRIPTIONS,)),
+    ('/cloud-credentials', 'Cloud Credentials', (DEFAULTS,)),
+    ('/admin/', 'Admin', BOTH),
+    ('/package/', 'Package', (DEFAULTS,)),
+    ('/python-extensions', 'Python Extensions', (DEFAULTS,)),
+    ('/ai-providers', 'AI Providers', (DEFAULTS,)),
+    ('/ean-image-sourcing', 'EAN Plugin', (DEFAULTS,)),
+]
+
+# Per metodo HTTP: (sottostringhe, summary, description) valutate in ordine, vince la prima
+# regola con almeno una sottostringa presente nel path; la regola con () è il default.
+SUMMARY_RULES = {
+    'GET': [
+        (('/id/', '/{id}', '/{name}'),
+         "Ottiene una risorsa specifica",
+         "Restituisce i dettagli di una risorsa specifica identificata dall'ID o nome nel path."),
+        (('all', ENDS_WITH_S),
+         "Ottiene tutte le risorse",
+         "Restituisce la lista di tutte le risorse disponibili nel sistema."),
+        (('/status',),
+         "Ottiene lo status di una risorsa",
+         "Restituisce lo stato attuale di una risorsa, incluse informazioni su esecuzione e progresso."),
+        (('/logs',),
+         "Ottiene i log di una risorsa",
+         "Restituisce i log di esecuzione di una risorsa."),
+        (('/info',),
+         "Ottiene informazioni su una risorsa",
+         "Restituisce informazioni generali su una risorsa, incluse versioni e configurazioni."),
+        (('/health',),
+         "Health check",
+         "Verifica lo stato di salute di un servizio o risorsa."),
+        ((),
+         "Ottiene dati",
+         "Restituisce dati relativi alla risorsa specificata."),
+    ],
+    'POST': [
+        (('/execute',),
+         "Esegue un'operazione",
+         "Esegue un'operazione o avvia un processo per la risorsa specificata."),
+        (('/upload',),
+         "Carica un file o dataset",
+         "Carica un file o dataset nel sistema."),
+        (('/schedule',),
+         "Schedula un'operazione",
+         "Crea o aggiorna la schedulazione di un'operazione ricorrente."),
+        ((),
+         "Crea una nuova risorsa",
+         "Crea una nuova risorsa nel sistema con i dati forniti nella richiesta."),
+    ],
+    'PUT': [
+        ((),
+         "Aggiorna una risorsa",
+         "Aggiorna i dati di una risorsa esistente con i nuovi valori forniti."),
+    ],
+    'DELETE': [
+        ((),
+         "Elimina una risorsa",
+         "Elimina una risorsa dal sistema. **Attenzione:** Questa operazione è irreversibile."),
+    ],
+    'PATCH': [
+        ((),
+         "Modifica parziale di una risorsa",
+         "Applica una modifica parziale a una risorsa esistente."),
+    ],
+}
+
+# Descrizioni dei parametri per nome esatto, per profilo
+PARAMETER_DESCRIPTIONS = {
+    DESCRIPTIONS: {
+        'country': 'Codice paese ISO (es. "denmark", "italy", "france")',
+        'namespace': 'Namespace Kubernetes (opzionale)',
+    },
+    DEFAULTS: {
+        'name': "Nome della risorsa",
+        'namespace': "Namespace Kubernetes (opzionale)",
+        'provider': "Nome del provider (es. 'aws', 'azure', 'gcp')",
+        'country': "Codice paese ISO (es. 'denmark', 'italy', 'france')",
+        'page': "Numero di pagina (0-based)",
+        'pageSize': "Dimensione della pagina",
+        'status': "Filtra per status",
+        'offset': "Offset per la paginazione",
+        'limit': "Numero massimo di risultati",
+    },
+}
+
+# Parametri identificativi: il profilo `descriptions` conosce solo questi nomi,
+# il profilo `defaults` tratta come ID qualunque nome che contiene 'Id'
+ID_PARAMETERS = frozenset(['projectId', 'jobId', 'taskId', 'agentId', 'datasetId', 'categoryId'])
+
+
+def _ends_with_s(path):
+    return path.endswith('s') and not path.endswith('{id}')
+
+
+def _split(tokens):
+    """Sottostringhe ordinarie e presenza del token speciale `ENDS_WITH_S`."""
+    return tuple(t for t in tokens if t != ENDS_WITH_S), ENDS_WITH_S in tokens
+
+
+class RuleSet:
+    """
+    Regole di un profilo, valutate con un ciclo sulla tabella (riferimento, vedi `endpoint_info`).
+
+    Le regole del profilo vengono selezionate una volta sola e il token speciale
+    `ENDS_WITH_S` viene separato dalle sottostringhe: per ogni path resta un test `in`
+    per regola, nell'ordine della tabella.
+    """
+
+    def __init__(self, profile, case_sensitive):
+        self.profile = profile
+        self.case_sensitive = case_sensitive
+        tag_rules = [(token, tag) for token, tag, profiles in TAG_RULES if profile in profiles]
+        if any(token == ENDS_WITH_S for token, _ in tag_rules):
+            raise ValueError(f"{ENDS_WITH_S} non è supportato nelle regole dei tag")
+        self._tag_rules = tuple(tag_rules)
+        self._summary_rules = {}
+        for method, rules in SUMMARY_RULES.items():
+            compiled = []
+            for j, (tokens, summary, description) in enumerate(rules):
+                if not tokens and j != len(rules) - 1:
+                    raise ValueError(f"La regola di default per {method} deve essere l'ultima")
+                compiled.append(_split(tokens) + (not tokens, summary, description))
+            self._summary_rules[method] = tuple(compiled)
+        self._parameters = PARAMETER_DESCRIPTIONS[profile]
+
+    def tags(self, path):
+        """Tag generici del path, nell'ordine della tabella."""
+        text = path if self.case_sensitive else path.lower()
+        return [tag for token, tag in self._tag_rules if token in text]
+
+    def classify(self, path, method):
+        """{'tags', 'summary', 'description'} per path e metodo."""
+        text = path if self.case_sensitive else path.lower()
+        tags = [tag for token, tag in self._tag_rules if token in text] or ['API']
+        method_upper = method.upper()
+        for tokens, ends_with_s, default, summary, description in self._summary_rules.get(method_upper, ()):
+            if default or any(token in text for token in tokens) or ends_with_s and _ends_with_s(path):
+                return {'tags': tags, 'summary': summary, 'description': description}
+        return {
+            'tags': tags,
+            'summary': f'Operazione {method_upper}',
+            'description': f"Esegue un'operazione {method_upper} sulla risorsa specificata.",
+        }
+
+    def parameter_description(self, name):
+        """Descrizione di default per un parametro, o None se nessuna regola si applica."""
+        if self.profile == DEFAULTS:
+            if 'Id' in name:
+                resource = name.replace('Id', '').lower()
+                return f"ID univoco del {resource if resource else 'elemento'}"
+        elif name in ID_PARAMETERS:
+            return f'ID univoco del {name.replace("Id", "")}'
+        return self._parameters.get(name)
+
+
+# Regole di `enrich-endpoints.py`: confronto sul path originale
+DESCRIPTION_RULES = RuleSet(DESCRIPTIONS, case_sensitive=True)
+# Regole di `auto-enrich-endpoints.py`: confronto sul path in minuscolo
+DEFAULT_RULES = RuleSet(DEFAULTS, case_sensitive=False)
+
+
+# --- Percorso veloce: le catene di test originali, equivalenti alle tabelle sopra ---
+
+def generic_tags(path):
+    """Tag generici del path per il profilo `descriptions` (equivale a `DESCRIPTION_RULES.tags`)."""
+    tags = []
+    if '/projects/' in path:
+        tags.append('Projects')
+    if '/jobs/' in path:
+        tags.append('Jobs')
+    if '/tasks/' in path:
+        tags.append('Tasks')
+    if '/agents/' in path:
+        tags.append('Agents')
+    if '/datasets/' in path:
+        tags.append('Datasets')
+    if '/categories/' in path:
+        tags.append('Categories')
+    if '/cloud/' in path:
+        tags.append('Cloud')
+    if '/admin/' in path:
+        tags.append('Admin')
+    return tags
+
+
+def endpoint_info(path, method):
+    """{'tags', 'summary', 'description'} per il profilo `defaults` (equivale a `DEFAULT_RULES.classify`)."""
+    path_lower = path.lower()
+    method_upper = method.upper()
+
+    tags = []
+    if '/projects/' in path_lower:
+        tags.append('Projects')
+    if '/jobs/' in path_lower:
+        tags.append('Jobs')
+    if '/tasks/' in path_lower:
+        tags.append('Tasks')
+    if '/agents/' in path_lower:
+        tags.append('Agents')
+    if '/datasets' in path_lower:
+        tags.append('Datasets')
+    if '/categories/' in path_lower:
+        tags.append('Categories')
+    if '/cloud-credentials' in path_lower:
+        tags.append('Cloud Credentials')
+    if '/admin/' in path_lower:
+        tags.append('Admin')
+    if '/package/' in path_lower:
+        tags.append('Package')
+    if '/python-extensions' in path_lower:
+        tags.append('Python Extensions')
+    if '/ai-providers' in path_lower:
+        tags.append('AI Providers')
+    if '/ean-image-sourcing' in path_lower:
+        tags.append('EAN Plugin')
+
+    # `rule` è l'indice della regola in SUMMARY_RULES[method_upper]: i testi restano nella tabella
+    rules = SUMMARY_RULES.get(method_upper)
+    if method_upper == 'GET':
+        if '/id/' in path_lower or '/{id}' in path_lower or '/{name}' in path_lower:
+            rule = 0
+        elif 'all' in path_lower or path.endswith('s') and not path.endswith('{id}'):
+            rule = 1
+        elif '/status' in path_lower:
+            rule = 2
+        elif '/logs' in path_lower:
+            rule = 3
+        elif '/info' in path_lower:
+            rule = 4
+        elif '/health' in path_lower:
+            rule = 5
+        else:
+            rule = 6
+    elif method_upper == 'POST':
+        if '/execute' in path_lower:
+            rule = 0
+        elif '/upload' in path_lower:
+            rule = 1
+        elif '/schedule' in path_lower:
+            rule = 2
+        else:
+            rule = 3
+    elif rules is not None:
+        rule = 0
+    else:
+        return {
+            'tags': tags if tags else ['API'],
+            'summary': f'Operazione {method_upper}',
+            'description': f"Esegue un'operazione {method_upper} sulla risorsa specificata.",
+        }
+    _, summary, description = rules[rule]
+    return {'tags': tags if tags else ['API'], 'summary': summary, 'description': description}
@@ -4,9 +4,11 @@ Script per arricchire automaticamente gli endpoint OpenAPI con descrizioni stand
 Questo script aggiunge summary, description, tags e responses dettagliati agli endpoint che ne sono privi.
 """
 
-import yaml
-import re
-from pathlib import Path
+import argparse
+
+import instrumentation
+import spec_engine
+from endpoint_rules import DESCRIPTION_RULES, generic_tags
 
 # Mappatura endpoint -> descrizioni
 ENDPOINT_DESCRIPTIONS = {
@@ -59,23 +61,7 @@ def enrich_endpoint(path, method, operation):
     
     # Aggiungi tags generici basati sul path
     if 'tags' not in operation:
-        tags = []
-        if '/projects/' in endpoint_path:
-            tags.append('Projects')
-        if '/jobs/' in endpoint_path:
-            tags.append('Jobs')
-        if '/tasks/' in endpoint_path:
-            tags.append('Tasks')
-        if '/agents/' in endpoint_path:
-            tags.append('Agents')
-        if '/datasets/' in endpoint_path:
-            tags.append('Datasets')
-        if '/categories/' in endpoint_path:
-            tags.append('Categories')
-        if '/cloud/' in endpoint_path:
-            tags.append('Cloud')
-        if '/admin/' in endpoint_path:
-            tags.append('Admin')
+        tags = generic_tags(endpoint_path)
         if tags:
             operation['tags'] = tags
     
@@ -143,46 +129,17 @@ def enrich_endpoint(path, method, operation):
     if 'parameters' in operation:
         for param in operation['parameters']:
             if 'description' not in param:
-                param_name = param.get('name', '')
-                if param_name in ['projectId', 'jobId', 'taskId', 'agentId', 'datasetId', 'categoryId']:
-                    param['description'] = f'ID univoco del {param_name.replace("Id", "")}'
-                elif param_name == 'country':
-                    param['description'] = 'Codice paese ISO (es. "denmark", "italy", "france")'
-                elif param_name == 'namespace':
-                    param['description'] = 'Namespace Kubernetes (opzionale)'
+                description = DESCRIPTION_RULES.parameter_description(param.get('name', ''))
+                if description is not None:
+                    param['description'] = description
     
     return operation
 
 def main():
-    openapi_file = Path(__file__).parent.parent / 'openapi.yaml'
-    
-    print(f"📖 Leggendo {openapi_file}...")
-    with open(openapi_file, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
-    paths = data.get('paths', {})
-    enriched_count = 0
-    
-    print(f"🔍 Trovati {len(paths)} endpoint...")
-    
-    for path, path_item in paths.items():
-        for method, operation in path_item.items():
-            if method in ['get', 'post', 'put', 'delete', 'patch']:
-                if 'operationId' in operation:
-                    # Arricchisci solo se manca summary o description
-                    if 'summary' not in operation or 'description' not in operation:
-                        enrich_endpoint(path, method, operation)
-                        enriched_count += 1
-    
-    print(f"✨ Arricchiti {enriched_count} endpoint...")
-    
-    # Salva
-    print(f"💾 Salvando in {openapi_file}...")
-    with open(openapi_file, 'w', encoding='utf-8') as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-    
-    print("✅ Completato!")
+    parser = argparse.ArgumentParser(description='Arricchisce gli endpoint privi di summary o description')
+    instrumentation.add_arguments(parser)
+    instrumentation.setup('enrich-endpoints.py', parser.parse_args())
+    spec_engine.run(['endpoint_descriptions'])
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Estimate page fetches and LLM calls of pipeline YAML files before submitting them.
+
+Each file is parsed and validated with the rules of `validate-pipeline-examples.py`,
+then walked by the cost model in `pipeline_cost.py`. The report is JSON on stdout:
+per-stage rows in/out, fetches and LLM calls, totals, and the assumptions used.
+
+Budgets make the script usable as a gate: with `--max-fetches` / `--max-llm-calls`
+it exits with status 2 if any pipeline exceeds them (or fails validation).
+
+Usage:
+    python3 scripts/estimate-pipeline-cost.py                                  # examples/pipelines/
+    python3 scripts/estimate-pipeline-cost.py examples/pipelines/19-price-comparison-5-sites.yaml
+    python3 scripts/estimate-pipeline-cost.py --assume explore_branching=1 --assume join_branching=48
+    python3 scripts/estimate-pipeline-cost.py --max-fetches 50000 --max-llm-calls 2000 --summary
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from pipeline_cost import DEFAULT_ASSUMPTIONS, estimate
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_validator() -> Any:
+    path = os.path.join(SCRIPTS_DIR, "validate-pipeline-examples.py")
+    spec = importlib.util.spec_from_file_location("validate_pipeline_examples", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _parse_assumptions(items: List[str]) -> Dict[str, float]:
+    assumptions: Dict[str, float] = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or key not in DEFAULT_ASSUMPTIONS:
+            raise ValueError(f"Invalid assumption '{item}' (known keys: {', '.join(DEFAULT_ASSUMPTIONS)})")
+        assumptions[key] = float(value)
+    return assumptions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = os.path.dirname(SCRIPTS_DIR)
+
+    parser = argparse.ArgumentParser(description="Estimate page fetches and LLM calls of pipeline YAML files.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Files or directories to analyze (default: examples/pipelines/)",
+    )
+    parser.add_argument(
+        "--assume", action="append", default=[], metavar="KEY=VALUE",
+        help=f"Override a cost assumption ({', '.join(DEFAULT_ASSUMPTIONS)})",
+    )
+    parser.add_argument("--max-fetches", type=float, help="Fail if a pipeline exceeds this many fetches")
+    parser.add_argument("--max-llm-calls", type=float, help="Fail if a pipeline exceeds this many LLM calls")
+    parser.add_argument("--summary", action="store_true", help="Omit the per-stage breakdown")
+    args = parser.parse_args(argv)
+
+    try:
+        assumptions = _parse_assumptions(args.assume)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    validator = _load_validator()
+    files = validator._collect_files(root, args.paths)
+    if not files:
+        print(f"No YAML files found under {', '.join(args.paths) or os.path.join(root, 'examples', 'pipelines')}",
+              file=sys.stderr)
+        return 1
+
+    budgets = {"fetches": args.max_fetches, "llm_calls": args.max_llm_calls}
+    report: List[Dict[str, Any]] = []
+    rejected = 0
+    for f in files:
+        entry: Dict[str, Any] = {"file": os.path.relpath(f, root)}
+        try:
+            data = validator._load_yaml(f)
+            validator.validate_pipeline(data)
+        except Exception as e:
+            entry.update(ok=False, error=str(e))
+            rejected += 1
+            report.append(entry)
+            continue
+
+        result = estimate(data, assumptions)
+        over = [k for k, limit in budgets.items() if limit is not None and result["totals"][k] > limit]
+        entry.update(ok=not over, over_budget=over, totals=result["totals"])
+        if not args.summary:
+            entry["stages"] = result["stages"]
+        rejected += bool(over)
+        report.append(entry)
+
+    json.dump(
+        {"assumptions": {**DEFAULT_ASSUMPTIONS, **assumptions}, "pipelines": report},
+        sys.stdout, indent=2,
+    )
+    sys.stdout.write("\n")
+    return 2 if rejected else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
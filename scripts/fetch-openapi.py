@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Download condizionale delle specifiche OpenAPI (vedi `spec_fetch.py`).
+
+Senza `--target` scarica `${API_URL}/api/openapi.json` in `${OUTPUT_FILE}` (stesse
+variabili e default di `update-openapi.sh`). Con `--target NOME=URL` (ripetibile)
+scarica più ambienti in parallelo, ognuno in `<output-dir>/openapi.NOME.yaml`.
+
+Per ogni target stampa l'esito: `not_modified` (304), `unchanged` (stesso
+contenuto, conversione saltata) o `updated` (YAML riscritto). Esce con stato 1
+se almeno un download fallisce.
+
+Uso:
+    python3 scripts/fetch-openapi.py
+    API_URL=http://localhost:8080/api python3 scripts/fetch-openapi.py --force
+    python3 scripts/fetch-openapi.py --target prod=https://api.webrobot.eu/api/api/openapi.json \\
+        --target staging=https://staging.webrobot.eu/api/api/openapi.json --output-dir specs
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import spec_fetch
+
+ICONS = {'updated': '📝', 'unchanged': '✅', 'not_modified': '✅', 'error': '❌'}
+MESSAGES = {
+    'updated': 'specifica aggiornata',
+    'unchanged': 'contenuto invariato, conversione saltata',
+    'not_modified': 'non modificata (304)',
+}
+
+
+def _targets(args):
+    if not args.target:
+        api_url = os.environ.get('API_URL', 'https://api.webrobot.eu/api').rstrip('/')
+        output = Path(os.environ.get('OUTPUT_FILE', 'openapi.yaml'))
+        return [spec_fetch.Target(output.stem, f'{api_url}/api/openapi.json', output)]
+    targets = []
+    for value in args.target:
+        name, sep, url = value.partition('=')
+        if not sep or not name or not url:
+            raise ValueError(f'target non valido (atteso NOME=URL): {value}')
+        targets.append(spec_fetch.Target(name, url, args.output_dir / f'openapi.{name}.yaml'))
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download condizionale delle specifiche OpenAPI')
+    parser.add_argument('--target', action='append', default=[], metavar='NOME=URL',
+                        help="URL della specifica JSON di un ambiente (ripetibile)")
+    parser.add_argument('--output-dir', type=Path, default=Path('.'), help='Cartella dei file dei --target')
+    parser.add_argument('--state', type=Path, default=spec_fetch.DEFAULT_STATE_FILE,
+                        help='File con ETag, Last-Modified e hash dei download precedenti')
+    parser.add_argument('--force', action='store_true', help='Ignora lo stato: scarica e converte comunque')
+    parser.add_argument('--max-per-host', type=int, default=4, help='Connessioni concorrenti per host')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Timeout di rete in secondi')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    try:
+        targets = _targets(args)
+    except ValueError as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    state = spec_fetch.load_state(args.state)
+    report, pool = asyncio.run(spec_fetch.fetch_all(
+        targets, state, max_per_host=args.max_per_host, timeout=args.timeout, force=args.force,
+    ))
+    spec_fetch.save_state(state, args.state)
+
+    if args.json:
+        json.dump({'targets': report, 'connections': pool}, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        for entry in report:
+            icon = ICONS[entry['result']]
+            if entry['result'] == 'error':
+                print(f"{icon} {entry['target']}: {entry['error']}")
+            else:
+                print(f"{icon} {entry['target']}: {MESSAGES[entry['result']]} -> {entry['output']} "
+                      f"({entry['bytes']} byte, {entry['elapsed_ms']} ms)")
+    return 1 if any(entry['result'] == 'error' for entry in report) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
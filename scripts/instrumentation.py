@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Strumentazione condivisa degli script: tempi per fase, contatori e picco di memoria.
+
+Si attiva con `--profile [json|otel]` (vedi `add_arguments`) o con la variabile
+d'ambiente `WEBROBOT_PROFILE` (`1`/`json` o `otel`); `--profile-output` o
+`WEBROBOT_PROFILE_OUTPUT` scelgono il file di destinazione (default: stderr).
+Il resoconto viene scritto all'uscita del processo.
+
+Il vocabolario è quello di `guides/observability-metrics.md`: `durationSeconds` e
+`recordsProcessed` per l'esecuzione, `cpuSeconds` e il picco di memoria per
+l'infrastruttura, durata e record per stage (qui: fase). Il formato `otel` è un
+documento OTLP/JSON di metriche, inviabile così com'è a un collector
+(`POST /v1/metrics`).
+
+Disattivata, `phase()` restituisce un context manager vuoto condiviso e `count()`
+esce subito: il costo è una chiamata di funzione per fase.
+"""
+
+import atexit
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import time
+
+ENV_VAR = 'WEBROBOT_PROFILE'
+ENV_OUTPUT = 'WEBROBOT_PROFILE_OUTPUT'
+FORMATS = ('json', 'otel')
+SERVICE_NAME = 'webrobot-scripts'
+SCOPE_NAME = 'webrobot.scripts.instrumentation'
+SCOPE_VERSION = '1'
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+def _peak_memory_bytes():
+    # VmHWM è il picco del solo processo corrente (ru_maxrss può includere quello del padre)
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in byte su macOS, in KiB altrove
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _snake(name):
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+class Profiler:
+    """Raccoglie fasi e contatori di un'esecuzione e produce il resoconto."""
+
+    def __init__(self, script, fmt='json', output=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"formato di profiling sconosciuto: {fmt} (disponibili: {', '.join(FORMATS)})")
+        self.script = script
+        self.format = fmt
+        self.output = output
+        # nome fase -> [secondi totali, chiamate], in ordine di prima esecuzione
+        self.phases = {}
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._start_ns = time.time_ns()
+        self._cpu = time.process_time()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def record(self, name, seconds, calls=1):
+        stats = self.phases.get(name)
+        if stats is None:
+            self.phases[name] = [seconds, calls]
+        else:
+            stats[0] += seconds
+            stats[1] += calls
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Resoconto JSON nel vocabolario della guida alle metriche."""
+        duration = time.perf_counter() - self._start
+        return {
+            'script': self.script,
+            'startTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self._start_ns / 1e9)),
+            'execution': {
+                'durationSeconds': round(duration, 6),
+                'recordsProcessed': self.counters.get('recordsProcessed', 0),
+            },
+            'infrastructure': {
+                'cpuSeconds': round(time.process_time() - self._cpu, 6),
+                'peakMemoryMb': round(_peak_memory_bytes() / 2**20, 2),
+            },
+            'stages': [
+                {'stage': name, 'durationSeconds': round(seconds, 6), 'calls': calls}
+                for name, (seconds, calls) in self.phases.items()
+            ],
+            'counters': dict(self.counters),
+        }
+
+    def otlp(self):
+        """Lo stesso resoconto come documento OTLP/JSON di metriche."""
+        report = self.snapshot()
+        start, now = str(self._start_ns), str(time.time_ns())
+
+        def point(value, attributes=None):
+            data = {'startTimeUnixNano': start, 'timeUnixNano': now}
+            if isinstance(value, int):
+                data['asInt'] = str(value)
+            else:
+                data['asDouble'] = value
+            if attributes:
+                data['attributes'] = [{'key': k, 'value': {'stringValue': v}} for k, v in attributes.items()]
+            return data
+
+        def gauge(name, unit, points):
+            return {'name': name, 'unit': unit, 'gauge': {'dataPoints': points}}
+
+        def total(name, unit, points):
+            return {'name': name, 'unit': unit, 'sum': {
+                'aggregationTemporality': 2, 'isMonotonic': True, 'dataPoints': points,
+            }}
+
+        metrics = [
+            gauge('webrobot.execution.duration', 's', [point(report['execution']['durationSeconds'])]),
+            total('webrobot.execution.records_processed', '{record}',
+                  [point(int(report['execution']['recordsProcessed']))]),
+            total('webrobot.infrastructure.cpu_time', 's', [point(report['infrastructure']['cpuSeconds'])]),
+            gauge('webrobot.infrastructure.memory.peak', 'By', [point(_peak_memory_bytes())]),
+            gauge('webrobot.stage.duration', 's', [
+                point(stage['durationSeconds'], {'stage': stage['stage']}) for stage in report['stages']
+            ]),
+        ]
+        for name, value in report['counters'].items():
+            if name != 'recordsProcessed':
+                metrics.append(total(f'webrobot.script.{_snake(name)}', '1', [point(value)]))
+        return {'resourceMetrics': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}},
+                {'key': 'process.command', 'value': {'stringValue': self.script}},
+                {'key': 'process.runtime.version', 'value': {'stringValue': platform.python_version()}},
+            ]},
+            'scopeMetrics': [{'scope': {'name': SCOPE_NAME, 'version': SCOPE_VERSION}, 'metrics': metrics}],
+        }]}
+
+    def write(self):
+        document = self.otlp() if self.format == 'otel' else self.snapshot()
+        text = json.dumps(document, indent=2, ensure_ascii=False) + '\n'
+        if self.output:
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            sys.stderr.write(text)
+
+
+_active = None
+_registered = False
+
+
+def enable(script, fmt='json', output=None):
+    """Attiva la strumentazione per il processo corrente; il resoconto si scrive all'uscita."""
+    global _active, _registered
+    if not _registered:
+        atexit.register(_write_active)
+        _registered = True
+    _active = Profiler(script, fmt, output)
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def _write_active():
+    if _active is not None:
+        _active.write()
+
+
+def active():
+    return _active
+
+
+def phase(name):
+    """Context manager che cronometra una fase (cumulativo sulle chiamate ripetute)."""
+    if _active is None:
+        return _NULL_PHASE
+    return _active.phase(name)
+
+
+def record(name, seconds, calls=1):
+    """Aggiunge a una fase un tempo misurato altrove (es. in un processo worker)."""
+    if _active is not None:
+        _active.record(name, seconds, calls)
+
+
+def count(name, value=1):
+    if _active is not None:
+        _active.count(name, value)
+
+
+def add_arguments(parser):
+    parser.add_argument('--profile', nargs='?', const='json', choices=FORMATS, default=None,
+                        help=f'Tempi per fase, contatori e picco di memoria (default json; env {ENV_VAR})')
+    parser.add_argument('--profile-output', default=None,
+                        help=f'File del resoconto di profiling (default: stderr; env {ENV_OUTPUT})')
+
+
+def setup(script, args=None):
+    """Attiva la strumentazione se richiesta da `--profile` o da `WEBROBOT_PROFILE`."""
+    fmt = getattr(args, 'profile', None)
+    if fmt is None:
+        value = os.environ.get(ENV_VAR, '').strip().lower()
+        if value in ('', '0', 'false', 'no', 'off'):
+            return None
+        fmt = 'json' if value in ('1', 'true', 'yes', 'on') else value
+        if fmt not in FORMATS:
+            print(f"⚠️  {ENV_VAR}={value}: formato sconosciuto, profiling disattivato", file=sys.stderr)
+            return None
+    output = getattr(args, 'profile_output', None) or os.environ.get(ENV_OUTPUT) or None
+    return enable(script, fmt, output)
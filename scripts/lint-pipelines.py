@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Lint pipeline YAML files for performance problems and print suggested rewrites.
+
+Each file is parsed and validated with the rules of `validate-pipeline-examples.py`,
+then checked by the rules in `pipeline_lint.py` (default: `examples/pipelines/`; the
+expected findings on that corpus are tested in `tests/test_pipeline_lint.py`).
+
+Exit status: 0 when every file is valid (findings are warnings), 2 if a file fails
+validation or if findings are reported with `--fail-on-findings`.
+
+Usage:
+    python3 scripts/lint-pipelines.py                                   # examples/pipelines/
+    python3 scripts/lint-pipelines.py customer-pipelines/ --fail-on-findings
+    python3 scripts/lint-pipelines.py --rules dedup-key,explore-depth --max-explore-depth 2
+    python3 scripts/lint-pipelines.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from pipeline_lint import DEFAULT_LIMITS, RULES, lint
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_validator() -> Any:
+    path = os.path.join(SCRIPTS_DIR, "validate-pipeline-examples.py")
+    spec = importlib.util.spec_from_file_location("validate_pipeline_examples", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _location(stages: Optional[List[int]]) -> str:
+    if stages is None:
+        return "python_extensions"
+    first, last = stages
+    return f"pipeline[{first}]" if first == last else f"pipeline[{first}..{last}]"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = os.path.dirname(SCRIPTS_DIR)
+
+    parser = argparse.ArgumentParser(description="Lint pipeline YAML files for performance problems.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Files or directories to lint (default: examples/pipelines/)",
+    )
+    parser.add_argument("--rules", help=f"Comma-separated rules to run (default: all: {', '.join(RULES)})")
+    parser.add_argument(
+        "--max-explore-depth", type=int, default=DEFAULT_LIMITS["explore_depth"],
+        help="Depth limit for explore / wgetExplore / intelligent_explore",
+    )
+    parser.add_argument(
+        "--max-browser-explore-depth", type=int, default=DEFAULT_LIMITS["browser_explore_depth"],
+        help="Depth limit for visitExplore",
+    )
+    parser.add_argument("--json", action="store_true", help="Print findings as JSON")
+    parser.add_argument("--fail-on-findings", action="store_true", help="Exit with status 2 if any finding is reported")
+    args = parser.parse_args(argv)
+
+    rules = [r.strip() for r in args.rules.split(",") if r.strip()] if args.rules else None
+    unknown = [r for r in rules or [] if r not in RULES]
+    if unknown:
+        print(f"Unknown lint rules: {', '.join(unknown)} (available: {', '.join(RULES)})", file=sys.stderr)
+        return 1
+    limits = {"explore_depth": args.max_explore_depth, "browser_explore_depth": args.max_browser_explore_depth}
+
+    validator = _load_validator()
+    files = validator._collect_files(root, args.paths)
+    if not files:
+        print(f"No YAML files found under {', '.join(args.paths) or os.path.join(root, 'examples', 'pipelines')}")
+        return 1
+
+    report: List[Dict[str, Any]] = []
+    invalid = 0
+    flagged = 0
+    total = 0
+    for f in files:
+        rel = os.path.relpath(f, root)
+        try:
+            data = validator._load_yaml(f)
+            validator.validate_pipeline(data)
+            findings = lint(data, limits, rules)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            invalid += 1
+            report.append({"file": rel, "ok": False, "error": str(e)})
+            if not args.json:
+                print(f"ERR - {rel}: {e}")
+            continue
+
+        total += len(findings)
+        flagged += bool(findings)
+        report.append({"file": rel, "ok": True, "findings": [f._asdict() for f in findings]})
+        if args.json:
+            continue
+        for finding in findings:
+            print(f"WARN - {rel}: {_location(finding.stages)} [{finding.rule}] {finding.message}")
+            if finding.rewrite:
+                print("       suggested rewrite:")
+            for line in finding.rewrite.splitlines():
+                print(f"         {line}")
+
+    if args.json:
+        json.dump({"limits": limits, "files": report}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif invalid:
+        print(f"\nFAILED: {invalid}/{len(files)} file(s) invalid, {total} finding(s) in the others")
+    elif total:
+        print(f"\nFOUND: {total} finding(s) in {flagged}/{len(files)} file(s)")
+    else:
+        print(f"\nCLEAN: {len(files)} file(s) linted")
+
+    if invalid or (total and args.fail_on_findings):
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
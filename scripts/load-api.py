@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Generatore di carico per l'API o per il mock locale (vedi `api_load.py`).
+
+Replica un mix pesato di operazioni (`--mix operationId=peso,...`, di default
+query sui dataset, esecuzione di job e polling dello stato) al ritmo di `--rps`
+richieste al secondo per `--duration` secondi, e riporta throughput e latenze
+p50/p95/p99 in totale e per operazione. Con `--mock` avvia nello stesso
+processo il mock di `mock-api.py` e lo usa come bersaglio: nessuna rete esterna.
+
+Un ritardo di partenza (`lag`) alto indica che il collo di bottiglia è il
+client stesso (event loop o pool di connessioni saturi), non il server.
+`--max-p99-ms` fa uscire con stato 2 se il p99 totale supera la soglia.
+
+Uso:
+    python3 scripts/load-api.py --mock --rps 200 --duration 10
+    python3 scripts/load-api.py --base-url http://127.0.0.1:8020/api --mix getExecutionStatus=1 --rps 500
+    python3 scripts/load-api.py --mock --mock-delay-ms 20 --max-p99-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+import yaml
+
+import api_client
+import api_load
+import api_mock
+import instrumentation
+import spec_engine
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:8020/api'
+
+
+def _overrides(values):
+    overrides = {}
+    for value in values:
+        name, sep, text = value.partition('=')
+        if not sep or not name:
+            raise ValueError(f'parametro non valido (atteso NOME=VALORE): {value}')
+        overrides[name] = text
+    return overrides
+
+
+async def _run(data, args, mix, overrides):
+    server = None
+    base_url = args.base_url
+    if args.mock:
+        mock = api_mock.MockApi(data, delay=args.mock_delay_ms / 1000)
+        server, port, _ = await api_mock.serve(mock.handler())
+        base_url = f'http://127.0.0.1:{port}{mock.base_path}'
+    try:
+        headers = api_client.auth_headers(data, args.api_key)
+        requests = api_load.build_requests(data, mix, base_url, headers, overrides)
+        with instrumentation.phase('load'):
+            return await api_load.run_load(requests, args.rps, args.duration, connections=args.connections,
+                                           timeout=args.timeout, seed=args.seed)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+def _print_report(report):
+    def line(name, summary):
+        latency, lag = summary['latencyMs'], summary['lagMs']
+        print(f"   {name:<28}{summary['requests']:>10}{summary['errors']:>8}{summary['throughput'] or 0:>10}"
+              f"{latency['p50'] or 0:>10}{latency['p95'] or 0:>10}{latency['p99'] or 0:>10}{lag['p99'] or 0:>10}")
+
+    print(f"🚀 {report['total']['requests']} richieste in {report['elapsedSeconds']} s "
+          f"(obiettivo {report['targetRps']} rps)")
+    print(f"   {'operazione':<28}{'richieste':>10}{'errori':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'lag p99':>10}")
+    for name, summary in report['operations'].items():
+        line(name, summary)
+    line('TOTALE', report['total'])
+    if 'connections' in report:
+        print(f"🔌 Connessioni: {report['connections']['opened']} aperte, {report['connections']['reused']} riusi")
+    if report['total']['statuses']:
+        print(f"📊 Stati: {', '.join(f'{k}: {v}' for k, v in report['total']['statuses'].items())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generatore di carico per l'API o per il mock locale")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'URL base del bersaglio (default {DEFAULT_BASE_URL})')
+    parser.add_argument('--mock', action='store_true', help='Avvia il mock locale e lo usa come bersaglio')
+    parser.add_argument('--mock-delay-ms', type=float, default=0.0, help='Latenza simulata dal mock')
+    parser.add_argument('--mix', default=api_load.DEFAULT_MIX, help='operationId=peso,... (default: %(default)s)')
+    parser.add_argument('--rps', type=float, default=50.0, help='Richieste al secondo')
+    parser.add_argument('--duration', type=float, default=10.0, help='Durata in secondi')
+    parser.add_argument('--connections', type=int, default=32, help='Connessioni massime verso il bersaglio')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Timeout di rete in secondi')
+    parser.add_argument('--param', action='append', default=[], metavar='NOME=VALORE',
+                        help='Valore di un parametro di path o query (ripetibile)')
+    parser.add_argument('--api-key', default=None, help=f'Chiave API organizzazione:chiave (env {api_client.API_KEY_ENV})')
+    parser.add_argument('--seed', type=int, default=None, help='Seme della scelta delle operazioni')
+    parser.add_argument('--max-p99-ms', type=float, default=None, help='Soglia del p99 totale (stato 2 se superata)')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup('load-api', args)
+
+    try:
+        mix = api_load.parse_mix(args.mix)
+        overrides = _overrides(args.param)
+        data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+        report = asyncio.run(_run(data, args, mix, overrides))
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    instrumentation.count('recordsProcessed', report['total']['requests'])
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        _print_report(report)
+
+    p99 = report['total']['latencyMs']['p99']
+    if args.max_p99_ms is not None and (p99 is None or p99 > args.max_p99_ms):
+        if not args.json:
+            print(f"❌ p99 {p99} ms oltre la soglia di {args.max_p99_ms} ms")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Mock locale dell'API da `openapi.yaml` (vedi `api_mock.py`).
+
+Avvia un server HTTP/1.1 keep-alive che risponde a ogni operazione della
+specifica con la sua risposta d'esempio, già serializzata all'avvio. I path si
+accettano con o senza il prefisso del server (`/api`); i path sconosciuti
+ricevono 404, i metodi non previsti 405. Con `--delay-ms` ogni risposta attende
+la latenza indicata; con `--require-api-key` le richieste senza `X-API-Key`
+ricevono 401.
+
+Il carico si genera con `load-api.py`.
+
+Uso:
+    python3 scripts/mock-api.py                       # http://127.0.0.1:8020/api
+    python3 scripts/mock-api.py --port 9000 --delay-ms 20
+    python3 scripts/mock-api.py --routes
+"""
+
+import argparse
+import asyncio
+
+import yaml
+
+import api_mock
+import spec_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock locale dell'API da openapi.yaml")
+    parser.add_argument('--host', default='127.0.0.1', help='Indirizzo di ascolto')
+    parser.add_argument('--port', type=int, default=8020, help='Porta di ascolto')
+    parser.add_argument('--delay-ms', type=float, default=0.0, help='Latenza simulata per risposta')
+    parser.add_argument('--require-api-key', action='store_true', help='401 alle richieste senza chiave API')
+    parser.add_argument('--routes', action='store_true', help='Elenca le route compilate ed esce')
+    args = parser.parse_args()
+
+    try:
+        data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+        mock = api_mock.MockApi(data, delay=args.delay_ms / 1000, require_api_key=args.require_api_key)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+
+    if args.routes:
+        for route in sorted(mock.routes, key=lambda r: (r.template, r.method)):
+            print(f"{route.method:<7} {route.status} {mock.base_path}{route.template}  ({route.operation_id})")
+        return 0
+
+    async def serve_forever():
+        server, port, stats = await api_mock.serve(mock.handler(), args.host, args.port)
+        print(f"🧪 Mock di {len(mock.routes)} operazioni su http://{args.host}:{port}{mock.base_path}")
+        try:
+            await server.serve_forever()
+        finally:
+            print(f"📊 {stats['requests']} richieste su {stats['connections']} connessioni")
+
+    try:
+        asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+        print("⏹️  Mock fermato")
+    except OSError as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
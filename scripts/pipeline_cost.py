@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Static fetch / LLM cost model for pipeline definitions.
+
+Walks a parsed (and validated) pipeline in order, tracking an estimated row count for
+the current dataset and for every `store` label, and charges each stage with the
+page fetches and LLM calls it would make on that many rows. Fan-out is driven by
+assumed branching factors (`DEFAULT_ASSUMPTIONS`) that callers can override.
+
+Stages without an explicit model fall back on the `fetches` / `llm` flags of the
+stage registry (`pipeline_stages.py`): one fetch and/or one LLM call per input row.
+
+This is an order-of-magnitude estimate meant to reject or re-plan expensive pipelines
+before they are submitted, not a prediction of the exact Spark workload.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pipeline_stages import lookup
+
+DEFAULT_ASSUMPTIONS: Dict[str, float] = {
+    # Rows produced by load_csv / load_* / each load_union or unionByName source
+    "input_rows": 1000,
+    # Links followed from every page at each explore level
+    "explore_branching": 2,
+    # Links followed from every page by join stages with a CSS selector
+    "join_branching": 20,
+    # Segments (output rows) per page for flatSelect / intelligent_flatSelect
+    "segments_per_page": 20,
+    # Results per searchEngine query when `num_results` is not set
+    "search_results": 10,
+    # LLM calls per page for selector inference (lower it to model the template-cluster cache)
+    "llm_calls_per_page": 1,
+    # LLM calls per row for iextract (chunks of the HTML block)
+    "iextract_chunks": 1,
+    # Images compared per row by imageSimilarity (one download and one LLM call each)
+    "images_per_row": 5,
+    # Fraction of rows kept by dedup
+    "dedup_keep_ratio": 1.0,
+}
+
+EXPLORE_STAGES = {"explore", "wgetExplore", "visitExplore", "intelligent_explore"}
+JOIN_STAGES = {"join", "wgetJoin", "visitJoin", "intelligent_join"}
+PAGE_STAGES = {"wget", "visit"}
+BROWSER_STAGES = {"visit", "visitJoin", "visitExplore"}
+LOAD_STAGES = {
+    "load_csv", "load_avro", "load_delta", "load_iceberg", "load_xml", "load_bigquery",
+    "load_athena", "load_mongodb", "load_cassandra", "load_elasticsearch", "load_kafka",
+}
+
+
+class StageCost(NamedTuple):
+    index: int
+    stage: str
+    rows_in: float
+    rows_out: float
+    fetches: float
+    browser_fetches: float
+    llm_calls: float
+
+
+class _State:
+    def __init__(self, assumptions: Dict[str, float], initial_rows: float) -> None:
+        self.a = assumptions
+        self.rows = initial_rows
+        self.labels: Dict[str, float] = {}
+
+
+def _is_column(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("$")
+
+
+def _arg(args: List[Any], i: int, default: Any = None) -> Any:
+    return args[i] if i < len(args) else default
+
+
+def explore_levels(rows: float, args: List[Any], branching: float) -> List[float]:
+    """Pages discovered at each level 1..depth of an explore stage seeded with `rows` pages."""
+    depth = _arg(args, 1, 1)
+    depth = depth if isinstance(depth, int) and not isinstance(depth, bool) else 1
+    return [rows * branching ** level for level in range(1, depth + 1)]
+
+
+def _explore(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    # Pages discovered at levels 1..depth; the seed pages are kept in the output
+    pages = sum(explore_levels(st.rows, args, st.a["explore_branching"]))
+    llm = pages * st.a["llm_calls_per_page"] if name == "intelligent_explore" else 0
+    return st.rows + pages, pages, llm
+
+
+def _join(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    # A `$column` holds one URL per row; a selector follows every matching link
+    branching = 1 if _is_column(_arg(args, 0)) else st.a["join_branching"]
+    llm = 0
+    if name == "intelligent_join":
+        limit = _arg(args, 2)
+        if isinstance(limit, int) and not isinstance(limit, bool):
+            branching = min(branching, limit)
+        llm = st.rows * st.a["llm_calls_per_page"]
+    pages = st.rows * branching
+    return pages, pages, llm
+
+
+def _page(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    # A literal URL on an empty dataset fetches exactly one page
+    rows = st.rows if st.rows else 1
+    return rows, rows, 0
+
+
+def _flat_select(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    llm = st.rows * st.a["llm_calls_per_page"] if name == "intelligent_flatSelect" else 0
+    return st.rows * st.a["segments_per_page"], 0, llm
+
+
+def _search_engine(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    config = _arg(args, 0, {})
+    config = config if isinstance(config, dict) else {}
+    results = config.get("num_results", st.a["search_results"])
+    results = results if isinstance(results, (int, float)) and not isinstance(results, bool) else st.a["search_results"]
+    queries = st.rows
+    # With `enrich` every result page is fetched as well
+    fetches = queries + (queries * results if config.get("enrich") else 0)
+    return queries * results, fetches, 0
+
+
+def _iextract(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    return st.rows, 0, st.rows * st.a["iextract_chunks"]
+
+
+def _image_similarity(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    images = st.rows * st.a["images_per_row"]
+    return st.rows, images, images
+
+
+def _load(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    sources = len(args) if name == "load_union" else 1
+    return st.a["input_rows"] * sources, 0, 0
+
+
+def _union_by_name(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    return st.rows + st.a["input_rows"] * len(args), 0, 0
+
+
+def _dedup(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    return st.rows * st.a["dedup_keep_ratio"], 0, 0
+
+
+def _store(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    st.labels[str(_arg(args, 0))] = st.rows
+    return st.rows, 0, 0
+
+
+def _reset(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    return 0, 0, 0
+
+
+def _union_with(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    return st.rows + sum(st.labels.get(str(label), 0) for label in args), 0, 0
+
+
+def _default(st: _State, name: str, args: List[Any]) -> Tuple[float, float, float]:
+    schema = lookup(name)
+    fetches = st.rows if schema is not None and schema.fetches else 0
+    llm = st.rows if schema is not None and schema.llm else 0
+    return st.rows, fetches, llm
+
+
+Model = Callable[[_State, str, List[Any]], Tuple[float, float, float]]
+
+MODELS: Dict[str, Model] = {
+    **{name: _explore for name in EXPLORE_STAGES},
+    **{name: _join for name in JOIN_STAGES},
+    **{name: _page for name in PAGE_STAGES},
+    **{name: _load for name in LOAD_STAGES},
+    "flatSelect": _flat_select,
+    "intelligent_flatSelect": _flat_select,
+    "searchEngine": _search_engine,
+    "iextract": _iextract,
+    "intelligentExtract": _iextract,
+    "imageSimilarity": _image_similarity,
+    "load_union": _load,
+    "unionByName": _union_by_name,
+    "dedup": _dedup,
+    "store": _store,
+    "reset": _reset,
+    "union_with": _union_with,
+}
+
+
+def _trace_costs(data: Dict[str, Any]) -> Dict[str, int]:
+    """Browser actions and LLM prompts replayed by `fetch.traces` on every browser fetch."""
+    fetch = data.get("fetch")
+    traces = (fetch.get("traces") or []) if isinstance(fetch, dict) else []
+    prompts = sum(1 for t in traces if isinstance(t, dict) and t.get("action") == "prompt")
+    return {"actions": len(traces), "prompts": prompts}
+
+
+def estimate(data: Dict[str, Any], assumptions: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Estimate fetches and LLM calls of a validated pipeline document.
+
+    Returns a JSON-serializable dict with per-stage costs, totals and the assumptions used.
+    """
+    a = dict(DEFAULT_ASSUMPTIONS)
+    a.update(assumptions or {})
+    fetch = data.get("fetch") if isinstance(data.get("fetch"), dict) else {}
+    # The start URL in `fetch.url` is the seed page of the first stage
+    st = _State(a, 1 if fetch.get("url") else 0)
+    traces = _trace_costs(data)
+
+    stages: List[StageCost] = []
+    if fetch.get("url"):
+        stages.append(StageCost(-1, "fetch.url", 0, 1, 1, 1 if traces["actions"] else 0, 0))
+
+    for idx, item in enumerate(data.get("pipeline", [])):
+        stage = item["stage"]
+        args = item.get("args") or []
+        schema = lookup(stage)
+        name = schema.name if schema is not None else stage
+        rows_in = st.rows
+        rows_out, fetches, llm = MODELS.get(name, _default)(st, name, args)
+        browser = fetches if name in BROWSER_STAGES else 0
+        # Trace prompts run on every page loaded in the browser
+        llm += browser * traces["prompts"]
+        st.rows = rows_out
+        stages.append(StageCost(idx, stage, rows_in, rows_out, fetches, browser, llm))
+
+    totals = {
+        "fetches": sum(s.fetches for s in stages),
+        "browser_fetches": sum(s.browser_fetches for s in stages),
+        "llm_calls": sum(s.llm_calls for s in stages),
+        "trace_actions": sum(s.browser_fetches for s in stages) * traces["actions"],
+        "rows_out": st.rows,
+    }
+    return {
+        "stages": [_rounded({**s._asdict(), "fan_out": s.rows_out / s.rows_in if s.rows_in else None}) for s in stages],
+        "totals": _rounded(totals),
+        "assumptions": a,
+    }
+
+
+def _rounded(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in values.items()}
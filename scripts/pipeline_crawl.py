@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Wall-clock crawl simulator for pipeline definitions.
+
+The cost model (`pipeline_cost.py`) counts how many pages a pipeline fetches; this
+module estimates how long fetching them takes. Every fetching stage becomes one or
+more groups of identical page jobs (one group per level of an explore stage), and
+each group is replayed by a discrete-event simulation under the crawl limits in
+`DEFAULT_ASSUMPTIONS`: total concurrency, browser pool size for browser stages, and
+per-host politeness (pages in flight per host and minimum gap between starts).
+
+A browser page costs a page load plus the `fetch.traces` replayed on it. Trace costs
+come from the action (`visit` loads a page, `prompt` waits for the LLM, a scroll
+takes one step per `step` pixels of page height) plus its fixed delays (`cooldown`,
+`seconds`, `pauseMs`...), which are the part a pipeline author can cut.
+
+Stages are treated as barriers, like the dataset operations they compile to, so the
+critical path runs through the last page of every group and the wall-clock time is
+the sum of the group makespans. Groups larger than `MAX_SIMULATED_JOBS` are simulated
+on a prefix and extrapolated at the steady throughput reached by then.
+
+Like the cost model, this is an estimate for sizing browser pools and trimming waits
+before a crawl is launched, not a prediction of the exact run time.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from urllib.parse import urlsplit
+
+from pipeline_cost import DEFAULT_ASSUMPTIONS as COST_ASSUMPTIONS
+from pipeline_cost import EXPLORE_STAGES, estimate, explore_levels
+from pipeline_stages import lookup, normalize
+
+DEFAULT_ASSUMPTIONS: Dict[str, float] = {
+    # Pages fetched at the same time across the whole crawl
+    "concurrency": 16,
+    # Browser instances available to visit / visitJoin / visitExplore
+    "browser_pool": 4,
+    # Pages in flight per host (politeness limit)
+    "per_host": 2,
+    # Minimum seconds between two page starts on the same host
+    "host_delay": 0.0,
+    # Distinct hosts crawled; 0 counts the hosts of the URLs in the pipeline
+    "hosts": 0,
+    # Seconds to load a page in the browser (navigation, rendering)
+    "page_load_seconds": 2.0,
+    # Seconds for a plain HTTP fetch (wget*, join, explore, searchEngine...)
+    "http_fetch_seconds": 0.5,
+    # Seconds for a browser action without an explicit delay (click, scroll step...)
+    "action_seconds": 0.1,
+    # Seconds per LLM call (selector inference, trace prompts, iextract)
+    "llm_seconds": 2.0,
+    # Page height scrolled by scroll actions
+    "page_height_px": 8000,
+    # Scroll step when the action has no `step` parameter
+    "scroll_step_px": 800,
+    # Pause after each scroll step when the action has no `pauseMs` parameter
+    "scroll_pause_seconds": 0.1,
+}
+
+# Trace parameters holding a fixed delay, with their unit in seconds
+DELAY_PARAMS: Dict[str, float] = {
+    "cooldown": 1.0,
+    "seconds": 1.0,
+    "delay": 1.0,
+    "waitSeconds": 1.0,
+    "delayMs": 0.001,
+    "waitMs": 0.001,
+    "pauseMs": 0.001,
+}
+SCROLL_ACTIONS = {"scrolltobottom"}
+MAX_SIMULATED_JOBS = 20_000
+
+
+class TraceCost(NamedTuple):
+    index: int
+    action: str
+    # Seconds added to every browser page, and the fixed delays among them
+    seconds: float
+    delay_seconds: float
+
+
+class JobGroup(NamedTuple):
+    index: int
+    stage: str
+    level: int
+    jobs: float
+    page_seconds: float
+    browser: bool
+    # Page fetches are subject to per-host politeness, LLM calls are not
+    host_bound: bool
+
+
+class GroupRun(NamedTuple):
+    group: JobGroup
+    slots: int
+    wall_seconds: float
+    busy_seconds: float
+    politeness_wait_seconds: float
+    limited_by: str
+    extrapolated: bool
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def trace_cost(index: int, trace: Any, a: Dict[str, float]) -> TraceCost:
+    """Seconds a `fetch.traces` entry adds to every page loaded in the browser."""
+    trace = trace if isinstance(trace, dict) else {}
+    name = str(trace.get("action") or trace.get("factory") or "")
+    params = trace.get("params") if isinstance(trace.get("params"), dict) else {}
+    key = normalize(name)
+    delays = {k: _number(params.get(k)) for k in DELAY_PARAMS}
+    work = a["action_seconds"]
+    if key == "visit":
+        work = a["page_load_seconds"]
+    elif key == "prompt":
+        work = a["llm_seconds"]
+    elif key in SCROLL_ACTIONS:
+        step = _number(params.get("step"))
+        steps = math.ceil(a["page_height_px"] / (step if step and step > 0 else a["scroll_step_px"]))
+        pause = delays.pop("pauseMs")
+        pause = pause * DELAY_PARAMS["pauseMs"] if pause is not None else a["scroll_pause_seconds"]
+        work = steps * a["action_seconds"]
+        delays["pauseMs"] = steps * pause / DELAY_PARAMS["pauseMs"]
+    delay = sum(max(0.0, v) * DELAY_PARAMS[k] for k, v in delays.items() if v is not None)
+    return TraceCost(index, name, work + delay, delay)
+
+
+def pipeline_hosts(data: Dict[str, Any]) -> Set[str]:
+    """Hosts of the literal URLs in `fetch` and in stage arguments."""
+    hosts: Set[str] = set()
+
+    def visit(value: Any) -> None:
+        if isinstance(value, str) and value.startswith(("http://", "https://")):
+            host = urlsplit(value).hostname
+            if host:
+                hosts.add(host)
+        elif isinstance(value, dict):
+            for v in value.values():
+                visit(v)
+        elif isinstance(value, list):
+            for v in value:
+                visit(v)
+
+    visit(data.get("fetch"))
+    for item in data.get("pipeline", []):
+        visit(item.get("args"))
+    return hosts
+
+
+def job_groups(data: Dict[str, Any], stages: List[Dict[str, Any]], a: Dict[str, float],
+               trace_seconds: float, trace_prompts: int) -> List[JobGroup]:
+    """Page and LLM jobs of every stage in pipeline order; explore stages give one group per level."""
+    items = data.get("pipeline", [])
+    groups: List[JobGroup] = []
+    for s in stages:
+        pages, browser_pages, llm = s["fetches"], s["browser_fetches"], s["llm_calls"]
+        browser = browser_pages > 0
+        if pages <= 0:
+            if llm > 0:
+                groups.append(JobGroup(s["index"], s["stage"], 0, llm, a["llm_seconds"], False, False))
+            continue
+        # Trace prompts are part of the trace cost; the rest of the LLM calls are spread over the pages
+        llm_per_page = max(0.0, llm - browser_pages * trace_prompts) / pages
+        page_seconds = (
+            (a["page_load_seconds"] + trace_seconds if browser else a["http_fetch_seconds"])
+            + llm_per_page * a["llm_seconds"]
+        )
+        schema = lookup(s["stage"]) if s["index"] >= 0 else None
+        if schema is not None and schema.name in EXPLORE_STAGES:
+            args = items[s["index"]].get("args") or []
+            levels = explore_levels(s["rows_in"], args, a["explore_branching"])
+            for level, jobs in enumerate(levels, 1):
+                groups.append(JobGroup(s["index"], s["stage"], level, jobs, page_seconds, browser, True))
+        else:
+            groups.append(JobGroup(s["index"], s["stage"], 0, pages, page_seconds, browser, True))
+    return groups
+
+
+def simulate_group(group: JobGroup, a: Dict[str, float], hosts: int) -> GroupRun:
+    """Replay a group of identical jobs on the available slots and hosts."""
+    slots = int(max(1, min(a["concurrency"], a["browser_pool"]) if group.browser else max(1, a["concurrency"])))
+    total = max(0, math.ceil(group.jobs - 1e-9))
+    n = min(total, MAX_SIMULATED_JOBS)
+    d = group.page_seconds
+    per_host = int(max(1, a["per_host"]))
+    gap = max(0.0, a["host_delay"])
+    hosts = hosts if group.host_bound else 0
+
+    free = [0.0] * slots
+    # Hosts ordered by the time they can start their next page, then by the most pages left
+    remaining = [n // hosts + (1 if h < n % hosts else 0) for h in range(hosts)] if hosts else []
+    ready = [(0.0, -remaining[h], h) for h in range(hosts) if remaining[h]]
+    running: List[List[float]] = [[] for _ in range(hosts)]
+    end = waited = 0.0
+    for _ in range(n):
+        slot_at = heapq.heappop(free)
+        start = slot_at
+        if hosts:
+            host_at, _, h = heapq.heappop(ready)
+            start = max(slot_at, host_at)
+            in_flight = running[h]
+            while in_flight and in_flight[0] <= start:
+                heapq.heappop(in_flight)
+            heapq.heappush(in_flight, start + d)
+            remaining[h] -= 1
+            if remaining[h]:
+                next_at = start + gap
+                if len(in_flight) >= per_host:
+                    next_at = max(next_at, in_flight[0])
+                heapq.heappush(ready, (next_at, -remaining[h], h))
+        waited += start - slot_at
+        heapq.heappush(free, start + d)
+        end = max(end, start + d)
+
+    extrapolated = total > n
+    if extrapolated:
+        # Steady throughput of the simulated prefix
+        end *= total / n
+        waited *= total / n
+
+    host_rate = hosts * min(per_host / d if d else math.inf, 1 / gap if gap else math.inf) if hosts else math.inf
+    if end <= d * (1 + 1e-9):
+        limited_by = "latency"
+    elif host_rate < slots / d:
+        limited_by = "per_host"
+    elif group.browser and a["browser_pool"] < a["concurrency"]:
+        limited_by = "browser_pool"
+    else:
+        limited_by = "concurrency"
+    return GroupRun(group, slots, end, total * d, waited, limited_by, extrapolated)
+
+
+def _wall(groups: List[JobGroup], a: Dict[str, float], hosts: int) -> float:
+    return sum(simulate_group(g, a, hosts).wall_seconds for g in groups)
+
+
+def simulate(data: Dict[str, Any], assumptions: Optional[Dict[str, float]] = None, top: int = 5) -> Dict[str, Any]:
+    """
+    Simulate the crawl of a validated pipeline document.
+
+    Returns a JSON-serializable dict with the wall-clock estimate, per-group runs, the
+    critical path, browser slot usage and the `top` traces that cost the most time.
+    """
+    a = {**COST_ASSUMPTIONS, **DEFAULT_ASSUMPTIONS}
+    a.update(assumptions or {})
+    cost = estimate(data, {k: v for k, v in a.items() if k in COST_ASSUMPTIONS})
+    hosts = int(a["hosts"]) or max(1, len(pipeline_hosts(data)))
+
+    fetch = data.get("fetch") if isinstance(data.get("fetch"), dict) else {}
+    traces = [trace_cost(i, t, a) for i, t in enumerate(fetch.get("traces") or [])]
+    prompts = sum(1 for t in traces if normalize(t.action) == "prompt")
+    trace_seconds = sum(t.seconds for t in traces)
+    groups = job_groups(data, cost["stages"], a, trace_seconds, prompts)
+    runs = [simulate_group(g, a, hosts) for g in groups]
+    wall = sum((r.wall_seconds for r in runs), 0.0)
+
+    browser_runs = [r for r in runs if r.group.browser]
+    browser_pool = int(max(1, min(a["concurrency"], a["browser_pool"])))
+    browser_wall = sum(r.wall_seconds for r in browser_runs)
+    browser_busy = sum(r.busy_seconds for r in browser_runs)
+    # Browsers that can be kept busy at once given politeness and the pages of each group
+    per_host = a["per_host"]
+    if a["host_delay"] > 0:
+        per_host = min(per_host, max(math.ceil(r.group.page_seconds / a["host_delay"]) for r in browser_runs)
+                       if browser_runs else per_host)
+    useful = max((min(a["concurrency"], hosts * per_host, math.ceil(r.group.jobs - 1e-9)) for r in browser_runs),
+                 default=0)
+
+    costly = []
+    pages = cost["totals"]["browser_fetches"]
+    for t in traces:
+        is_prompt = normalize(t.action) == "prompt"
+        without = job_groups(data, cost["stages"], a, trace_seconds - t.seconds, prompts - is_prompt)
+        costly.append({
+            "index": t.index,
+            "action": t.action,
+            "seconds_per_page": t.seconds,
+            "delay_seconds_per_page": t.delay_seconds,
+            "browser_seconds": t.seconds * pages,
+            "wall_seconds_saved": wall - _wall(without, a, hosts),
+        })
+    costly.sort(key=lambda c: (-c["wall_seconds_saved"], -c["browser_seconds"], c["index"]))
+
+    critical = max(runs, key=lambda r: r.wall_seconds, default=None)
+    return {
+        "wall_seconds": round(wall, 2),
+        "latency_floor_seconds": round(sum(r.group.page_seconds for r in runs if r.group.jobs > 0), 2),
+        "hosts": hosts,
+        "bottleneck": _label(critical.group) if critical is not None and wall > 0 else None,
+        "critical_path": [
+            _rounded({
+                "stage": _label(r.group),
+                "page_seconds": r.group.page_seconds,
+                "queued_seconds": max(0.0, r.wall_seconds - r.group.page_seconds),
+                "wall_seconds": r.wall_seconds,
+                "share": r.wall_seconds / wall if wall else 0.0,
+            })
+            for r in runs if r.group.jobs > 0
+        ],
+        "browser": _rounded({
+            "pool": browser_pool,
+            "useful_slots": useful,
+            "occupancy": browser_busy / (browser_pool * browser_wall) if browser_wall else None,
+            "page_seconds": browser_busy,
+            "trace_seconds_per_page": trace_seconds,
+        }),
+        "traces": [_rounded(c) for c in costly[:top]],
+        "groups": [
+            _rounded({
+                "index": r.group.index,
+                "stage": r.group.stage,
+                "level": r.group.level,
+                "jobs": r.group.jobs,
+                "browser": r.group.browser,
+                "page_seconds": r.group.page_seconds,
+                "slots": r.slots,
+                "wall_seconds": r.wall_seconds,
+                "occupancy": r.busy_seconds / (r.slots * r.wall_seconds) if r.wall_seconds else None,
+                "politeness_wait_seconds": r.politeness_wait_seconds,
+                "limited_by": r.limited_by,
+                "extrapolated": r.extrapolated,
+            })
+            for r in runs
+        ],
+        "totals": cost["totals"],
+        "assumptions": a,
+    }
+
+
+def _label(group: JobGroup) -> str:
+    label = group.stage if group.index < 0 else f"{group.stage}#{group.index}"
+    return label + (f" level {group.level}" if group.level else "")
+
+
+def _rounded(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in values.items()}
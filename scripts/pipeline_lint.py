@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Performance lint rules for pipeline definitions.
+
+Each rule receives a parsed (and validated) pipeline document and yields `Finding`s:
+a message plus a suggested YAML rewrite of the affected part of the document (empty
+when the fix cannot be written mechanically, e.g. fusing transforms that take args).
+Rules are registered with `@rule(...)` and run in registration order.
+
+Rules:
+- dedup-key: `dedup` without key columns right after a union (full-row distinct)
+- fuse-row-transforms: consecutive `python_row_transform:*` stages (one Python round-trip per stage per row)
+- cache-before-store: `store` of a branch that fetches pages or calls an LLM, without a `cache` before it
+- explore-depth: explore stages deeper than the configured limits (pages grow geometrically with depth)
+- python-per-row-setup: `python_extensions` functions that import modules or use regex literals on every row
+"""
+
+from __future__ import annotations
+
+import ast
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from pipeline_cost import EXPLORE_STAGES, estimate
+from pipeline_stages import PYTHON_ROW_TRANSFORM, lookup
+
+DEFAULT_LIMITS: Dict[str, int] = {
+    # Maximum depth for HTTP explore stages (explore, wgetExplore, intelligent_explore)
+    "explore_depth": 3,
+    # Maximum depth for visitExplore, where every page is rendered in a browser
+    "browser_explore_depth": 2,
+}
+
+UNION_STAGES = {"load_union", "union_with", "unionByName"}
+# Columns preferred as dedup keys when the pipeline produces them
+KEY_CANDIDATES = ("url", "sku", "ean", "id", "product_url", "link")
+
+# `re` functions whose first argument is the pattern
+REGEX_FUNCTIONS = {"compile", "search", "match", "fullmatch", "sub", "subn", "findall", "finditer", "split"}
+# Positional args that carry over to the compiled pattern's method (the default is pattern and string):
+# `re.sub(p, repl, s, count)` -> `P.sub(repl, s, count)`, `re.split(p, s, maxsplit)` -> `P.split(s, maxsplit)`
+REGEX_MAX_ARGS = {"compile": 1, "sub": 4, "subn": 4, "split": 3}
+
+
+class Finding(NamedTuple):
+    rule: str
+    # Range of affected pipeline stages [first, last], or None for `python_extensions`
+    stages: Optional[Tuple[int, int]]
+    message: str
+    rewrite: str
+
+
+class _Context:
+    def __init__(self, data: Dict[str, Any], limits: Dict[str, int]) -> None:
+        self.data = data
+        self.limits = limits
+        self.pipeline: List[Dict[str, Any]] = data.get("pipeline", [])
+        # Canonical registry name of each stage (the raw name if unknown)
+        self.names = []
+        for item in self.pipeline:
+            schema = lookup(item["stage"])
+            self.names.append(schema.name if schema is not None else item["stage"])
+        self._costs: Optional[List[Dict[str, Any]]] = None
+
+    def args(self, i: int) -> List[Any]:
+        return self.pipeline[i].get("args") or []
+
+    def stage_costs(self) -> Dict[int, Dict[str, Any]]:
+        if self._costs is None:
+            self._costs = estimate(self.data)["stages"]
+        return {s["index"]: s for s in self._costs}
+
+    def produced_columns(self) -> List[str]:
+        columns = []
+        for i, name in enumerate(self.names):
+            if name in {"extract", "flatSelect"}:
+                for extractor in _flatten(self.args(i)):
+                    if isinstance(extractor, dict) and isinstance(extractor.get("as"), str):
+                        columns.append(extractor["as"])
+        return columns
+
+
+def _flatten(values: List[Any]) -> Iterator[Any]:
+    for value in values:
+        if isinstance(value, list):
+            yield from _flatten(value)
+        else:
+            yield value
+
+
+# --- YAML output -----------------------------------------------------------
+
+class _SnippetDumper(yaml.SafeDumper):
+    pass
+
+
+def _represent_str(dumper: yaml.SafeDumper, value: str) -> Any:
+    # Multi-line strings (function sources) as literal blocks, like the examples
+    style = "|" if "\n" in value else None
+    return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+
+_SnippetDumper.add_representer(str, _represent_str)
+
+
+def to_yaml(value: Any) -> str:
+    return yaml.dump(value, Dumper=_SnippetDumper, sort_keys=False, default_flow_style=None, width=100)
+
+
+def _stage(name: str, args: List[Any]) -> Dict[str, Any]:
+    return {"stage": name, "args": args}
+
+
+# --- Rules -------------------------------------------------------------------
+
+RULES: Dict[str, Callable[[_Context], Iterator[Finding]]] = {}
+
+
+def rule(name: str) -> Callable:
+    """Register a lint rule; the registration order is the reporting order."""
+    def decorator(func: Callable[[_Context], Iterator[Finding]]) -> Callable[[_Context], Iterator[Finding]]:
+        RULES[name] = func
+        return func
+    return decorator
+
+
+@rule("dedup-key")
+def dedup_key(ctx: _Context) -> Iterator[Finding]:
+    columns = ctx.produced_columns()
+    key = next((c for c in KEY_CANDIDATES if c in columns), "url")
+    for i, name in enumerate(ctx.names):
+        if name != "dedup" or ctx.args(i):
+            continue
+        prev = i - 1
+        while prev >= 0 and ctx.names[prev] == "cache":
+            prev -= 1
+        if prev >= 0 and ctx.names[prev] in UNION_STAGES:
+            yield Finding(
+                "dedup-key",
+                (i, i),
+                f"'dedup' without keys after '{ctx.pipeline[prev]['stage']}' compares and shuffles every column; "
+                f"deduplicate on the business key instead (assumed '{key}')",
+                to_yaml([_stage(ctx.pipeline[i]["stage"], [key])]),
+            )
+
+
+@rule("fuse-row-transforms")
+def fuse_row_transforms(ctx: _Context) -> Iterator[Finding]:
+    i = 0
+    while i < len(ctx.names):
+        j = i
+        while j < len(ctx.names) and ctx.names[j] == PYTHON_ROW_TRANSFORM:
+            j += 1
+        if j - i < 2:
+            i = max(j, i + 1)
+            continue
+
+        run = range(i, j)
+        functions = [ctx.pipeline[k]["stage"].partition(":")[2].strip() for k in run]
+        message = (
+            f"{j - i} consecutive python_row_transform stages ({', '.join(functions)}) each ship every row "
+            "to Python and back; fuse them into a single pass"
+        )
+        sources = (ctx.data.get("python_extensions") or {}).get("stages") or {}
+        inline = [sources.get(f) for f in functions]
+        with_args = [ctx.pipeline[k]["stage"] for k in run if ctx.args(k)]
+        if with_args or not all(isinstance(e, dict) and isinstance(e.get("function"), str) for e in inline):
+            # How stage args reach the function is up to the runtime, and functions registered
+            # outside python_extensions are not in scope: describe the fusion without code
+            reason = (f"stages with args ({', '.join(with_args)}) cannot be fused mechanically" if with_args
+                      else "define the functions in python_extensions to get a fused stage suggested")
+            yield Finding("fuse-row-transforms", (i, j - 1), f"{message} ({reason})", "")
+            i = j
+            continue
+
+        fused = "__".join(functions)
+        # The original definitions come first so the fused function can call them
+        definitions = "".join(sources[f]["function"].rstrip("\n") + "\n\n\n" for f in dict.fromkeys(functions))
+        body = "".join(f"    row = {f}(row)\n" for f in functions)
+        rewrite: Dict[str, Any] = {
+            "python_extensions": {"stages": {fused: {
+                "type": "row_transform",
+                "function": f"{definitions}def {fused}(row):\n{body}    return row\n",
+            }}},
+            "pipeline": [_stage(f"{PYTHON_ROW_TRANSFORM}:{fused}", [])],
+        }
+        yield Finding("fuse-row-transforms", (i, j - 1), message, to_yaml(rewrite))
+        i = j
+
+
+@rule("cache-before-store")
+def cache_before_store(ctx: _Context) -> Iterator[Finding]:
+    branch_start = 0
+    for i, name in enumerate(ctx.names):
+        if name == "reset":
+            branch_start = i + 1
+            continue
+        if name != "store" or (i > 0 and ctx.names[i - 1] == "cache"):
+            continue
+        expensive = []
+        for k in range(branch_start, i):
+            schema = lookup(ctx.pipeline[k]["stage"])
+            if schema is not None and (schema.fetches or schema.llm):
+                expensive.append(ctx.names[k])
+        if expensive:
+            yield Finding(
+                "cache-before-store",
+                (i, i),
+                f"branch stored as {ctx.args(i)} is recomputed (including {', '.join(dict.fromkeys(expensive))}) "
+                "every time the label is used; cache it before 'store'",
+                to_yaml([_stage("cache", []), ctx.pipeline[i]]),
+            )
+
+
+@rule("explore-depth")
+def explore_depth(ctx: _Context) -> Iterator[Finding]:
+    for i, name in enumerate(ctx.names):
+        if name not in EXPLORE_STAGES:
+            continue
+        args = ctx.args(i)
+        depth = args[1] if len(args) > 1 else 1
+        limit = ctx.limits["browser_explore_depth" if name == "visitExplore" else "explore_depth"]
+        if not isinstance(depth, int) or depth <= limit:
+            continue
+        pages = ctx.stage_costs()[i]["fetches"]
+        yield Finding(
+            "explore-depth",
+            (i, i),
+            f"'{ctx.pipeline[i]['stage']}' depth {depth} fetches ~{pages:,.0f} pages (pages grow geometrically "
+            f"with depth); limit it to {limit} or follow pagination with a narrower selector",
+            to_yaml([_stage(ctx.pipeline[i]["stage"], [args[0], limit])]),
+        )
+
+
+def _alone_on_lines(lines: List[str], node: ast.stmt) -> bool:
+    """True if nothing but blanks and a comment shares the lines of the statement `node`."""
+    before = lines[node.lineno - 1][:node.col_offset]
+    after = lines[node.end_lineno - 1][node.end_col_offset:].strip()
+    return not before.strip() and (not after or after.startswith("#"))
+
+
+def hoist_per_row_setup(function: str, source: str) -> Optional[Tuple[List[str], str]]:
+    """
+    Move imports and literal regex patterns out of `function` to module level.
+
+    Only imports written directly in the function body, each on lines of its own, are
+    moved: imports in `try` / `if` blocks may be conditional fallbacks. Returns
+    (descriptions of the hoisted items, rewritten source), or None if nothing is per-row;
+    the rewritten source is empty if the rewrite would not compile.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    func = next((n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == function), None)
+    if func is None:
+        return None
+
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    def pos(lineno: int, col: int) -> int:
+        return offsets[lineno - 1] + col
+
+    found: List[str] = []
+    header: List[str] = []
+    edits: List[Tuple[int, int, str]] = []
+    patterns: Dict[str, str] = {}
+
+    for node in func.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and _alone_on_lines(lines, node):
+            statement = ast.get_source_segment(source, node)
+            found.append(f"'{statement}'")
+            # A trailing comment moves with the statement; the emptied lines are dropped
+            comment = lines[node.end_lineno - 1][node.end_col_offset:].strip()
+            header.append(statement + (f"  {comment}" if comment else "") + "\n")
+            edits.append((offsets[node.lineno - 1], offsets[node.end_lineno], ""))
+
+    for node in ast.walk(func):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id == "re"
+            and node.func.attr in REGEX_FUNCTIONS
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+            and not node.keywords
+        ):
+            # Positional flags (e.g. `re.search(p, s, re.I)`) are left alone
+            max_args = REGEX_MAX_ARGS.get(node.func.attr, 2)
+            if len(node.args) > max_args:
+                continue
+            literal = ast.get_source_segment(source, node.args[0])
+            constant = patterns.setdefault(literal, f"_{function.upper()}_RE_{len(patterns) + 1}")
+            found.append(f"re.{node.func.attr}({literal}, ...)")
+            rest = ", ".join(ast.get_source_segment(source, a) for a in node.args[1:])
+            call = constant if node.func.attr == "compile" else f"{constant}.{node.func.attr}({rest})"
+            edits.append((pos(node.lineno, node.col_offset), pos(node.end_lineno, node.end_col_offset), call))
+
+    if not found:
+        return None
+
+    body = source
+    for start, end, text in sorted(edits, reverse=True):
+        body = body[:start] + text + body[end:]
+    if patterns and not any(h.split("#")[0].strip() == "import re" for h in header):
+        header.append("import re\n")
+    header = list(dict.fromkeys(header))
+    constants = [f"{name} = re.compile({literal})\n" for literal, name in patterns.items()]
+    rewritten = "".join(header) + "".join(constants) + "\n\n" + body
+    try:
+        ast.parse(rewritten)
+    except SyntaxError:
+        # e.g. a function whose body was only imports
+        rewritten = ""
+    return found, rewritten
+
+
+@rule("python-per-row-setup")
+def python_per_row_setup(ctx: _Context) -> Iterator[Finding]:
+    stages = (ctx.data.get("python_extensions") or {}).get("stages") or {}
+    for function, entry in stages.items():
+        if not isinstance(entry, dict) or not isinstance(entry.get("function"), str):
+            continue
+        hoisted = hoist_per_row_setup(function, entry["function"])
+        if hoisted is None:
+            continue
+        found, rewritten = hoisted
+        yield Finding(
+            "python-per-row-setup",
+            None,
+            f"python_extensions '{function}' runs {', '.join(found)} on every row; "
+            "hoist imports and compiled patterns to module level",
+            to_yaml({"python_extensions": {"stages": {function: {**entry, "function": rewritten}}}})
+            if rewritten else "",
+        )
+
+
+def lint(
+    data: Dict[str, Any],
+    limits: Optional[Dict[str, int]] = None,
+    rules: Optional[List[str]] = None,
+) -> List[Finding]:
+    """Run the lint rules (all, or the named ones) on a validated pipeline document."""
+    names = list(RULES) if rules is None else rules
+    unknown = [n for n in names if n not in RULES]
+    if unknown:
+        raise ValueError(f"Unknown lint rules: {', '.join(unknown)} (available: {', '.join(RULES)})")
+    ctx = _Context(data, {**DEFAULT_LIMITS, **(limits or {})})
+    findings: List[Finding] = []
+    for name in names:
+        findings.extend(RULES[name](ctx))
+    return findings
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Registry of pipeline stage schemas documented in `guides/pipeline-stages.md`.
+
+Each stage is described once in `STAGE_TABLE` (arguments, aliases, and whether the
+stage fetches pages or calls an LLM). The table is compiled at import time into a
+dict keyed by the normalized stage name, so every lookup is O(1) and the registry
+is shared by all files validated in the same process.
+
+Names are normalized like the Scala stage resolver: case-insensitive and tolerant to
+underscores (`visitJoin`, `visit_join` and `visitjoin` resolve to the same stage).
+"""
+
+from __future__ import annotations
+
+import difflib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Argument types, checked against the values produced by the YAML loader
+ARG_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "int": (int,),
+    "number": (int, float),
+    "map": (dict,),
+    "list": (list,),
+    "string|map": (str, dict),
+    "any": (object,),
+}
+
+# Prefix of the Python extension stages: `python_row_transform:<function>`
+PYTHON_ROW_TRANSFORM = "python_row_transform"
+
+
+class Arg(NamedTuple):
+    name: str
+    type: str = "any"
+    optional: bool = False
+
+
+class StageSchema(NamedTuple):
+    name: str
+    args: Tuple[Arg, ...] = ()
+    # The last argument may be repeated (e.g. `union_with`, `extract`)
+    variadic: bool = False
+    aliases: Tuple[str, ...] = ()
+    fetches: bool = False
+    llm: bool = False
+
+    @property
+    def min_args(self) -> int:
+        return sum(1 for a in self.args if not a.optional)
+
+    @property
+    def max_args(self) -> Optional[int]:
+        return None if self.variadic else len(self.args)
+
+    def signature(self) -> str:
+        parts = [f"optional {a.name}" if a.optional else a.name for a in self.args]
+        if self.variadic and parts:
+            parts[-1] += ", ..."
+        return ", ".join(parts)
+
+
+def _args(*specs: str) -> Tuple[Arg, ...]:
+    """Compact argument specs: `"name:type"`, with a trailing `?` for optional arguments."""
+    result = []
+    for spec in specs:
+        optional = spec.endswith("?")
+        name, _, arg_type = spec.rstrip("?").partition(":")
+        result.append(Arg(name, arg_type or "any", optional))
+    return tuple(result)
+
+
+_CONFIG = _args("config:map?")
+
+STAGE_TABLE: Tuple[StageSchema, ...] = (
+    # Core stages
+    StageSchema("explore", _args("selector:string", "depth:int?"), fetches=True),
+    StageSchema("join", _args("selector:string", "joinType:string?"), fetches=True),
+    StageSchema("wgetJoin", _args("selector:string", "joinType:string?"), fetches=True),
+    StageSchema("wgetExplore", _args("selector:string", "depth:int?"), fetches=True),
+    StageSchema("extract", _args("extractor:map"), variadic=True),
+    # Intelligent stages (LLM-powered)
+    StageSchema("intelligent_explore", _args("prompt:string", "depth:int?"), fetches=True, llm=True),
+    StageSchema(
+        "intelligent_join",
+        _args("selectorPrompt:string", "actionPrompt:string?", "limit:int?"),
+        fetches=True,
+        llm=True,
+    ),
+    # The leading extractor map is optional: a default `{ selector: "body", method: "code" }` is injected
+    StageSchema("iextract", _args("extractor?", "prompt:string?", "prefix:string?"), llm=True),
+    StageSchema(
+        "intelligent_flatSelect",
+        _args("segPrompt:string", "extrPrompt:string?", "prefix:string?"),
+        llm=True,
+    ),
+    # Browser / per-row fetch stages
+    StageSchema("wget", _args("url:string?"), aliases=("fetch",), fetches=True),
+    StageSchema("visit", _args("url:string?"), fetches=True),
+    StageSchema("visitJoin", _args("selector:string", "joinType:string?"), fetches=True),
+    StageSchema("visitExplore", _args("selector:string", "depth:int?"), fetches=True),
+    # Extraction stages
+    StageSchema("flatSelect", _args("segmentSelector:string", "extractors:list?"), aliases=("widen",)),
+    StageSchema("intelligent_table"),  # placeholder/no-op
+    StageSchema("intelligentExtract", _args("inputField:string", "query:string", "outputField:string"), llm=True),
+    # Utility + aggregation stages
+    StageSchema("echo", _args("message:string?")),
+    StageSchema("cache"),
+    StageSchema("store", _args("label:string")),
+    StageSchema("reset"),
+    StageSchema("union_with", _args("label:string"), variadic=True),
+    StageSchema("filter_country", _args("country:string"), variadic=True),
+    StageSchema("sentiment", _args("textField:string?")),
+    StageSchema("aggregatesentiment", _args("groupField:string?")),
+    StageSchema("avg_sentiment_by_key", _args("groupField:string?")),
+    StageSchema("sentiment_monthly", _args("textField:string?")),
+    StageSchema("sum_sales"),
+    # I/O stages
+    StageSchema("load_csv", _args("source:string|map", "option:string?"), variadic=True),
+    StageSchema("save_csv", _args("path:string", "mode:string?")),
+    StageSchema("load_avro", _args("source:string|map")),
+    StageSchema("load_delta", _args("source:string|map")),
+    StageSchema("load_iceberg", _args("source:string|map")),
+    StageSchema("load_xml", _args("source:string|map")),
+    StageSchema("load_bigquery", _args("source:string|map")),
+    StageSchema("load_athena", _args("source:string|map")),
+    StageSchema("load_mongodb", _args("source:string|map")),
+    StageSchema("load_cassandra", _args("source:string|map")),
+    StageSchema("load_elasticsearch", _args("source:string|map")),
+    StageSchema("load_kafka", _args("source:string|map")),
+    # Set operations
+    StageSchema("load_union", _args("source:map"), variadic=True),
+    StageSchema("unionByName", _args("source:map"), variadic=True),
+    StageSchema("dedup", _args("key:string?"), variadic=True),
+    # External API fetch stages
+    StageSchema("searchEngine", _args("config:map"), aliases=("search",), fetches=True),
+    StageSchema("socialAPI", _args("config:map"), aliases=("social",), fetches=True),
+    StageSchema("eurostatAPI", _args("config:map"), aliases=("eurostat", "macroEU"), fetches=True),
+    StageSchema("istatAPI", _args("config:map"), aliases=("istat", "macroIT"), fetches=True),
+    # Matching / scoring stages
+    StageSchema("enrichMatchingScore", _CONFIG),
+    StageSchema("imageSimilarity", llm=True),
+    # Use-case stages
+    StageSchema("priceNormalize", _args("currency:string?")),
+    StageSchema("priceCompare"),  # placeholder/no-op
+    StageSchema("oddsNormalize"),
+    StageSchema("arbitrageDetect"),  # placeholder/no-op
+    StageSchema("propertyNormalize"),
+    StageSchema("realEstateArbitrage"),
+    StageSchema("trendAggregate"),  # placeholder/no-op
+    StageSchema("autoScroll", _args("maxIterations:int?", "waitSeconds:number?")),  # placeholder/no-op
+    # Advanced analytics stages
+    StageSchema("propertyCluster", _CONFIG),
+    StageSchema("propertyClusterML", _CONFIG),
+    StageSchema("surebetFinder", _CONFIG),
+    StageSchema("fundamentalAnalysis", _CONFIG),
+    StageSchema("portfolioDataPrep", _CONFIG),
+    StageSchema("technicalIndicators", _CONFIG),
+    # Python extensions: `python_row_transform:<function>` (args are forwarded to the function)
+    StageSchema(PYTHON_ROW_TRANSFORM, _args("config?"), variadic=True),
+)
+
+
+def normalize(name: str) -> str:
+    """Stage name as resolved by the Scala registry: lowercase, without underscores."""
+    return name.replace("_", "").lower()
+
+
+def _build_registry() -> Dict[str, StageSchema]:
+    registry: Dict[str, StageSchema] = {}
+    for schema in STAGE_TABLE:
+        for name in (schema.name,) + schema.aliases:
+            key = normalize(name)
+            if key in registry:
+                raise ValueError(f"Duplicate stage name '{name}' (already registered by '{registry[key].name}')")
+            registry[key] = schema
+    return registry
+
+
+REGISTRY: Dict[str, StageSchema] = _build_registry()
+
+
+def lookup(stage: str) -> Optional[StageSchema]:
+    """Schema of a stage name as written in YAML (`python_row_transform:<fn>` included), or None."""
+    base, sep, function = stage.partition(":")
+    schema = REGISTRY.get(normalize(base))
+    if schema is None:
+        return None
+    if schema.name == PYTHON_ROW_TRANSFORM:
+        return schema if function.strip() else None
+    return None if sep else schema
+
+
+def suggest(stage: str) -> Optional[str]:
+    """Closest registered stage name, used to point at misspelled stages."""
+    matches = difflib.get_close_matches(normalize(stage.partition(":")[0]), list(REGISTRY), n=1, cutoff=0.75)
+    if not matches:
+        return None
+    name = REGISTRY[matches[0]].name
+    return f"{name}:<function>" if name == PYTHON_ROW_TRANSFORM else name
+
+
+def _matches(value: Any, arg_type: str) -> bool:
+    # YAML booleans are ints in Python: do not accept `true` where a number is expected
+    if isinstance(value, bool) and arg_type in ("int", "number"):
+        return False
+    return isinstance(value, ARG_TYPES[arg_type])
+
+
+def check_args(stage: str, schema: StageSchema, args: List[Any]) -> List[str]:
+    """Arity and argument type errors of one stage item (empty list when valid)."""
+    if schema.name == PYTHON_ROW_TRANSFORM:
+        return []
+    errors = []
+    if len(args) < schema.min_args:
+        errors.append(f"'{stage}' requires at least {schema.min_args} arg(s) ({schema.signature()})")
+    elif schema.max_args is not None and len(args) > schema.max_args:
+        errors.append(f"'{stage}' supports at most {schema.max_args} arg(s) ({schema.signature()})")
+
+    for i, value in enumerate(args):
+        if i < len(schema.args):
+            spec = schema.args[i]
+        elif schema.variadic and schema.args:
+            spec = schema.args[-1]
+        else:
+            break
+        if not _matches(value, spec.type):
+            errors.append(
+                f"'{stage}' arg {i} ({spec.name}) must be {spec.type.replace('|', ' or ')}, got {type(value).__name__}"
+            )
+    return errors
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Local, bounded-memory emulation of `load_union` + `dedup`.
+
+Sources are the same maps the YAML stage takes (`format`, `path`, `options`). Paths
+may use `${VAR}` environment references and may point to a file or to a Spark output
+directory (`part-*` files). Only the formats that can be read locally are supported:
+`csv` (Spark reader options `header`, `sep`/`delimiter`, `quote`, `escape`, `encoding`)
+and `json` (JSON lines, like Spark's default).
+
+Union follows `unionByName(allowMissingColumns=true)`: the columns of the first source,
+then the new columns of each following source; names match case-insensitively and
+missing columns are null. Values stay strings (`inferSchema` is ignored) and null is
+the empty string, so null keys compare equal, like in Spark's `dropDuplicates`.
+
+Dedup keeps the first row seen for each key. Keys are held in an in-memory set until
+it reaches its share of the memory budget; after that, rows with a key not in the
+set are buffered, sorted and spilled to runs on disk, then merged externally. Rows
+from the in-memory phase come out in input order, spilled rows in key order (Spark
+gives no ordering guarantee either).
+"""
+
+from __future__ import annotations
+
+import csv
+import glob
+import heapq
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+SUPPORTED_FORMATS = {"csv", "json"}
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+# Runs merged at once; more runs are merged in several passes
+MERGE_FAN_IN = 64
+# Rough per-entry overhead of a tuple of strings in a set / a buffered row
+_ENTRY_OVERHEAD = 120
+_FIELD_OVERHEAD = 56
+
+
+class Source(NamedTuple):
+    format: str
+    files: List[str]
+    options: Dict[str, str]
+    label: str
+
+
+def _bool_option(options: Dict[str, str], name: str, default: bool) -> bool:
+    value = options.get(name)
+    return default if value is None else str(value).strip().lower() == "true"
+
+
+def resolve_source(spec: Any, env: Optional[Dict[str, str]] = None) -> Source:
+    """Turn a `load_union` source map into local files; raises ValueError if it cannot be read locally."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"source spec must be a map, got {type(spec).__name__}")
+    fmt = str(spec.get("format", "")).lower()
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(
+            f"format '{spec.get('format')}' is not supported locally (supported: {', '.join(sorted(SUPPORTED_FORMATS))})"
+        )
+    raw = spec.get("path")
+    if not isinstance(raw, str) or not raw:
+        raise ValueError(f"source {spec} has no path")
+    environ = {**os.environ, **(env or {})}
+    path = raw
+    for name, value in environ.items():
+        path = path.replace("${" + name + "}", value)
+    if "${" in path:
+        raise ValueError(f"unresolved variable in path '{raw}' (set it in the environment or with --env)")
+    if "://" in path and not path.startswith("file://"):
+        raise ValueError(f"remote path '{path}' cannot be read locally; download it and point the variable to the copy")
+    path = path[len("file://"):] if path.startswith("file://") else path
+
+    if os.path.isdir(path):
+        files = sorted(
+            f for f in glob.glob(os.path.join(path, "part-*")) + glob.glob(os.path.join(path, f"*.{fmt}"))
+            if os.path.isfile(f) and not os.path.basename(f).startswith((".", "_"))
+        )
+        files = list(dict.fromkeys(files))
+    else:
+        files = sorted(glob.glob(path)) if any(c in path for c in "*?[") else [path]
+    missing = [f for f in files if not os.path.isfile(f)]
+    if missing or not files:
+        raise ValueError(f"no readable files for path '{path}'")
+    options = {str(k): str(v) for k, v in (spec.get("options") or {}).items()}
+    return Source(fmt, files, options, path)
+
+
+# --- Readers -------------------------------------------------------------------
+
+def _csv_reader(source: Source, f: Any) -> Any:
+    o = source.options
+    return csv.reader(
+        f,
+        delimiter=o.get("sep", o.get("delimiter", ",")),
+        quotechar=o.get("quote", '"') or '"',
+        escapechar=o.get("escape", "\\") or None,
+        doublequote=True,
+    )
+
+
+def _open(source: Source, path: str) -> Any:
+    encoding = source.options.get("encoding", source.options.get("charset", "utf-8"))
+    return open(path, newline="", encoding=encoding)
+
+
+def read_columns(source: Source) -> List[str]:
+    """Column names of a source (for JSON, the sorted union of the keys, like Spark's inference)."""
+    if source.format == "json":
+        keys = set()
+        for row in _json_records(source):
+            keys.update(row)
+        return sorted(keys)
+    with _open(source, source.files[0]) as f:
+        first = next(_csv_reader(source, f), [])
+    if _bool_option(source.options, "header", False):
+        return first
+    return [f"_c{i}" for i in range(len(first))]
+
+
+def _json_records(source: Source) -> Iterator[Dict[str, Any]]:
+    for path in source.files:
+        with _open(source, path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def read_rows(source: Source, columns: List[str]) -> Iterator[List[str]]:
+    """Rows of a source as lists of strings in the order of `columns`."""
+    if source.format == "json":
+        for record in _json_records(source):
+            yield [_text(record.get(c)) for c in columns]
+        return
+    header = _bool_option(source.options, "header", False)
+    width = len(columns)
+    for path in source.files:
+        with _open(source, path) as f:
+            reader = _csv_reader(source, f)
+            if header:
+                next(reader, None)
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) != width:
+                    row = (row + [""] * width)[:width]
+                yield row
+
+
+# --- Union -----------------------------------------------------------------------
+
+class UnionResult(NamedTuple):
+    columns: List[str]
+    rows: Iterator[List[str]]
+
+
+def union_by_name(sources: Sequence[Source], counts: Optional[Dict[str, int]] = None) -> UnionResult:
+    """Stream the union of `sources` aligned by column name; `counts` receives rows read per source."""
+    columns: List[str] = []
+    positions: Dict[str, int] = {}
+    layouts: List[Tuple[Source, List[str], List[int]]] = []
+    for source in sources:
+        own = read_columns(source)
+        for name in own:
+            if name.lower() not in positions:
+                positions[name.lower()] = len(columns)
+                columns.append(name)
+        layouts.append((source, own, [positions[name.lower()] for name in own]))
+
+    def rows() -> Iterator[List[str]]:
+        width = len(columns)
+        for source, own, targets in layouts:
+            identity = targets == list(range(width))
+            n = 0
+            for row in read_rows(source, own):
+                n += 1
+                if identity:
+                    yield row
+                    continue
+                out = [""] * width
+                for value, target in zip(row, targets):
+                    out[target] = value
+                yield out
+            if counts is not None:
+                counts[source.label] = counts.get(source.label, 0) + n
+
+    return UnionResult(columns, rows())
+
+
+# --- Dedup -----------------------------------------------------------------------
+
+def _row_bytes(values: Sequence[str]) -> int:
+    return _ENTRY_OVERHEAD + sum(_FIELD_OVERHEAD + len(v) for v in values)
+
+
+class DedupStats:
+    def __init__(self) -> None:
+        self.rows_in = 0
+        self.rows_out = 0
+        self.in_memory_keys = 0
+        self.spilled_rows = 0
+        self.runs = 0
+        self.merge_passes = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self), duplicates=self.rows_in - self.rows_out)
+
+
+class _Runs:
+    """Sorted runs of (key, seq, row) records, written with pickle to a temporary directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.paths: List[str] = []
+        self._next = 0
+
+    def write(self, records: Iterator[Tuple[Tuple[str, ...], int, List[str]]]) -> str:
+        path = os.path.join(self.directory, f"run-{self._next:06d}.pkl")
+        self._next += 1
+        with open(path, "wb") as f:
+            # One pickle per record: a shared Pickler memo would keep every record alive
+            for record in records:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[Tuple[str, ...], int, List[str]]]:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+
+def _first_per_key(
+    records: Iterator[Tuple[Tuple[str, ...], int, List[str]]],
+) -> Iterator[Tuple[Tuple[str, ...], int, List[str]]]:
+    """Records sorted by (key, seq) -> the first record of each key."""
+    previous = None
+    for record in records:
+        if record[0] != previous:
+            previous = record[0]
+            yield record
+
+
+def dedup(
+    rows: Iterator[List[str]],
+    key_indexes: Optional[List[int]],
+    memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    temp_dir: Optional[str] = None,
+    stats: Optional[DedupStats] = None,
+) -> Iterator[List[str]]:
+    """
+    Keep the first row of each key (`key_indexes`, or the whole row if None).
+
+    Half of `memory_bytes` holds the in-memory key set, the other half the spill buffer.
+    """
+    stats = stats if stats is not None else DedupStats()
+    budget = max(1, memory_bytes // 2)
+    seen = set()
+    seen_bytes = 0
+    buffer: List[Tuple[Tuple[str, ...], int, List[str]]] = []
+    buffer_bytes = 0
+
+    with tempfile.TemporaryDirectory(prefix="union-dedup-", dir=temp_dir) as directory:
+        runs = _Runs(directory)
+
+        def spill() -> None:
+            buffer.sort(key=lambda r: (r[0], r[1]))
+            runs.paths.append(runs.write(_first_per_key(iter(buffer))))
+            stats.runs += 1
+            buffer.clear()
+
+        for seq, row in enumerate(rows):
+            stats.rows_in += 1
+            key = tuple(row) if key_indexes is None else tuple(row[i] for i in key_indexes)
+            if key in seen:
+                continue
+            if seen_bytes < budget:
+                seen.add(key)
+                seen_bytes += _row_bytes(key)
+                stats.in_memory_keys += 1
+                stats.rows_out += 1
+                yield row
+                continue
+            # The key set is full: keys it does not know are resolved by the external merge
+            buffer.append((key, seq, row))
+            stats.spilled_rows += 1
+            buffer_bytes += _row_bytes(row) + (0 if key_indexes is None else _row_bytes(key))
+            if buffer_bytes >= budget:
+                spill()
+                buffer_bytes = 0
+
+        if not runs.paths:
+            buffer.sort(key=lambda r: (r[0], r[1]))
+            for _, _, row in _first_per_key(iter(buffer)):
+                stats.rows_out += 1
+                yield row
+            return
+        if buffer:
+            spill()
+        seen.clear()
+
+        # Reduce the number of runs until a single merge can read them all
+        paths = runs.paths
+        while len(paths) > MERGE_FAN_IN:
+            stats.merge_passes += 1
+            merged = []
+            for i in range(0, len(paths), MERGE_FAN_IN):
+                group = paths[i:i + MERGE_FAN_IN]
+                merged.append(runs.write(_first_per_key(_merge(group))))
+                for path in group:
+                    os.remove(path)
+            paths = merged
+
+        stats.merge_passes += 1
+        for _, _, row in _first_per_key(_merge(paths)):
+            stats.rows_out += 1
+            yield row
+
+
+def _merge(paths: List[str]) -> Iterator[Tuple[Tuple[str, ...], int, List[str]]]:
+    return heapq.merge(*(_Runs.read(p) for p in paths), key=lambda r: (r[0], r[1]))
+
+
+# --- Pipelines -------------------------------------------------------------------
+
+def union_dedup_stages(data: Dict[str, Any]) -> Tuple[List[Any], Optional[List[str]]]:
+    """
+    Source specs of the first `load_union` of a pipeline and the keys of the `dedup` after it.
+
+    Keys are None for a full-row dedup; raises ValueError if there is no `load_union` or no `dedup`.
+    """
+    from pipeline_stages import lookup
+
+    pipeline = data.get("pipeline") or []
+    names = []
+    for item in pipeline:
+        schema = lookup(item.get("stage", "")) if isinstance(item, dict) else None
+        names.append(schema.name if schema is not None else None)
+    try:
+        start = names.index("load_union")
+    except ValueError:
+        raise ValueError("pipeline has no load_union stage")
+    for i in range(start + 1, len(names)):
+        if names[i] == "dedup":
+            keys = [str(k) for k in pipeline[i].get("args") or []]
+            return list(pipeline[start].get("args") or []), keys or None
+        if names[i] != "cache":
+            break
+    raise ValueError("load_union is not followed by a dedup stage")
+
+
+def key_indexes(columns: List[str], keys: Optional[List[str]]) -> Optional[List[int]]:
+    if keys is None:
+        return None
+    positions = {c.lower(): i for i, c in enumerate(columns)}
+    missing = [k for k in keys if k.lower() not in positions]
+    if missing:
+        raise ValueError(f"dedup keys not in the union schema: {', '.join(missing)} (columns: {', '.join(columns)})")
+    return [positions[k.lower()] for k in keys]
+
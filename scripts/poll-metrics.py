@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Monitoraggio delle metriche di progetti, job e task (vedi `api_metrics.py`).
+
+I target si indicano con `--project ID`, `--job PROGETTO/JOB` e `--task
+PROGETTO/JOB/TASK` (tutti ripetibili); con `--discover` i job elencati nelle
+metriche di un progetto vengono aggiunti da soli. Le richieste viaggiano in
+parallelo su connessioni keep-alive, con un intervallo adattivo per target tra
+`--min-interval` e `--max-interval`; i task si fermano allo stato finale.
+
+La chiave API si passa con `--api-key` o `WEBROBOT_API_KEY`; l'URL base è
+`--base-url`, `API_URL` o il primo `servers` di `openapi.yaml`. `--output` salva
+le serie raccolte (dato grezzo e livelli di downsampling) in JSON.
+
+Uso:
+    python3 scripts/poll-metrics.py --project 98 --discover --duration 3600 --output metrics.json
+    python3 scripts/poll-metrics.py --job 98/220 --task 98/220/229 --min-interval 2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+import api_client
+import api_metrics
+import instrumentation
+import spec_engine
+
+
+def _targets(args):
+    targets = []
+    for kind in ('project', 'job', 'task'):
+        targets += [api_metrics.Target.parse(kind, value) for value in getattr(args, kind)]
+    if not targets:
+        raise ValueError('nessun target: usa --project, --job o --task')
+    return targets
+
+
+def _print_summary(summary, store):
+    for entry in summary:
+        icon = '❌' if entry['errors'] and entry['polls'] == 0 else '🏁' if entry['done'] else '📈'
+        status = f", stato {entry['status']}" if entry['status'] else ''
+        print(f"{icon} {entry['target']}: {entry['polls']} letture, {entry['changes']} variazioni, "
+              f"{entry['errors']} errori, intervallo {entry['interval']} s{status}")
+    print(f"💾 Store: {len(store.targets())} target, {store.nbytes() / 1024:.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monitoraggio concorrente delle metriche di progetti, job e task')
+    parser.add_argument('--project', action='append', default=[], metavar='ID', help='Progetto (ripetibile)')
+    parser.add_argument('--job', action='append', default=[], metavar='P/J', help='Job (ripetibile)')
+    parser.add_argument('--task', action='append', default=[], metavar='P/J/T', help='Task (ripetibile)')
+    parser.add_argument('--discover', action='store_true', help='Aggiunge i job elencati nelle metriche dei progetti')
+    parser.add_argument('--duration', type=float, default=None, help='Durata in secondi (default: fino a Ctrl-C)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Richieste contemporanee')
+    parser.add_argument('--min-interval', type=float, default=5.0, help='Intervallo minimo per target in secondi')
+    parser.add_argument('--max-interval', type=float, default=300.0, help='Intervallo massimo per target in secondi')
+    parser.add_argument('--base-url', default=None, help="URL base dell'API (default: API_URL o servers della specifica)")
+    parser.add_argument('--api-key', default=None, help=f'Chiave API organizzazione:chiave (env {api_client.API_KEY_ENV})')
+    parser.add_argument('--output', type=Path, default=None, help='File JSON con le serie raccolte')
+    parser.add_argument('--json', action='store_true', help='Riepilogo JSON')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup('poll-metrics', args)
+
+    try:
+        targets = _targets(args)
+        data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+        poller = api_metrics.MetricsPoller(
+            data, concurrency=args.concurrency, min_interval=args.min_interval, max_interval=args.max_interval,
+            base_url=args.base_url, api_key=args.api_key, discover=args.discover,
+        )
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    for target in targets:
+        poller.add(target)
+
+    print(f"📡 {len(targets)} target su {poller.base_url}")
+    try:
+        summary = asyncio.run(poller.run(args.duration))
+    except KeyboardInterrupt:
+        print("⏹️  Interrotto")
+        summary = [target.summary() for target in poller.targets.values()]
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(poller.store.snapshot(), ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"💾 Serie salvate in {args.output}")
+    if args.json:
+        json.dump({'targets': summary, 'storeBytes': poller.store.nbytes()}, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        _print_summary(summary, poller.store)
+    return 1 if any(entry['polls'] == 0 and entry['errors'] for entry in summary) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Run the `python_extensions` row transforms of a pipeline locally over a CSV and profile them.
+
+The `row_transform` functions declared under `python_extensions.stages` are compiled
+once and applied in batches to the rows of a CSV (e.g. `dataset_226_results.csv`), in
+the order the pipeline references them: each function receives the row produced by
+the previous one, as in Spark. Batches can be spread over a process pool.
+
+Reported per function:
+- rows/sec (function time only) and latency percentiles plus a log2 histogram
+- net allocated blocks per row and peak traced memory per batch (separate pass,
+  with `tracemalloc`, so it does not distort the timings)
+
+With `--compare OTHER.yaml` (same function names) or `--hoisted` (the rewrite
+suggested by the `python-per-row-setup` lint rule) every function is also run in
+its alternative version: speedups are reported and the outputs must match.
+
+Usage:
+    python3 scripts/profile-row-transforms.py examples/pipelines/05-python-row-transforms.yaml \\
+        dataset_226_results.csv --rename prod_price=price_raw --repeat 5000 --hoisted
+    python3 scripts/profile-row-transforms.py pipeline.yaml input.csv --jobs 4 --batch-size 5000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import math
+import sys
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from pipeline_lint import hoist_per_row_setup
+from pipeline_stages import PYTHON_ROW_TRANSFORM, lookup
+from spec_cache import load_yaml
+
+Row = Dict[str, Any]
+Sources = List[Tuple[str, str]]
+
+
+def load_functions(path: str) -> Sources:
+    """(name, source) of the row_transform functions, in the order the pipeline uses them."""
+    data = load_yaml(path)
+    stages = ((data.get("python_extensions") or {}).get("stages") or {}) if isinstance(data, dict) else {}
+    declared = {
+        name: entry["function"]
+        for name, entry in stages.items()
+        if isinstance(entry, dict) and entry.get("type", "row_transform") == "row_transform"
+        and isinstance(entry.get("function"), str)
+    }
+    order: List[str] = []
+    for item in data.get("pipeline") or []:
+        stage = item.get("stage", "") if isinstance(item, dict) else ""
+        schema = lookup(stage)
+        function = stage.partition(":")[2].strip()
+        if schema is not None and schema.name == PYTHON_ROW_TRANSFORM and function in declared:
+            order.append(function)
+    order += [name for name in declared if name not in order]
+    return [(name, declared[name]) for name in dict.fromkeys(order)]
+
+
+def compile_functions(sources: Sources) -> List[Tuple[str, Callable[[Row], Row]]]:
+    functions = []
+    for name, source in sources:
+        namespace: Dict[str, Any] = {}
+        exec(compile(source, f"<python_extensions:{name}>", "exec"), namespace)
+        if not callable(namespace.get(name)):
+            raise ValueError(f"python_extensions '{name}' does not define a function named '{name}'")
+        functions.append((name, namespace[name]))
+    return functions
+
+
+def read_batches(path: str, batch_size: int, repeat: int, rename: Dict[str, str]) -> Iterator[List[Row]]:
+    """Rows of the CSV (cycled `repeat` times) in batches, with columns renamed."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [{rename.get(k, k): v for k, v in row.items()} for row in csv.DictReader(f)]
+    stream = itertools.chain.from_iterable(itertools.repeat(rows, repeat))
+    while True:
+        batch = list(itertools.islice(stream, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _row_digest(row: Any) -> str:
+    items = sorted(row.items(), key=lambda kv: str(kv[0])) if isinstance(row, dict) else row
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+
+def run_batch(
+    functions: List[Tuple[str, Callable[[Row], Row]]],
+    rows: List[Row],
+    digest: bool = False,
+) -> Dict[str, Any]:
+    """Apply the chain to every row; per-function latencies (ns), errors and (optionally) output digests."""
+    latencies = {name: array("q") for name, _ in functions}
+    errors: Dict[str, List[Any]] = {}
+    digests = []
+    clock = time.perf_counter_ns
+    for row in rows:
+        row = dict(row)
+        for name, func in functions:
+            start = clock()
+            try:
+                row = func(row)
+            except Exception as e:
+                latencies[name].append(clock() - start)
+                entry = errors.setdefault(name, [0, f"{type(e).__name__}: {e}"])
+                entry[0] += 1
+                break
+            latencies[name].append(clock() - start)
+        if digest:
+            digests.append(_row_digest(row))
+    return {"latencies": {k: v.tobytes() for k, v in latencies.items()}, "errors": errors, "digests": digests}
+
+
+_worker_functions: List[Tuple[str, Callable[[Row], Row]]] = []
+
+
+def _init_worker(sources: Sources) -> None:
+    global _worker_functions
+    _worker_functions = compile_functions(sources)
+
+
+def _worker_batch(rows: List[Row], digest: bool) -> Dict[str, Any]:
+    return run_batch(_worker_functions, rows, digest)
+
+
+def measure_allocations(sources: Sources, rows: List[Row]) -> Dict[str, Dict[str, float]]:
+    """Net allocated blocks per row and tracemalloc peak (KiB) of each function over `rows`."""
+    functions = compile_functions(sources)
+    inputs = [dict(r) for r in rows]
+    result: Dict[str, Dict[str, float]] = {}
+    for name, func in functions:
+        copies = [dict(r) for r in inputs]
+        outputs: List[Any] = []
+        before = sys.getallocatedblocks()
+        for row in copies:
+            try:
+                outputs.append(func(row))
+            except Exception:
+                outputs.append(row)
+        blocks = (sys.getallocatedblocks() - before) / max(len(copies), 1)
+
+        copies = [dict(r) for r in inputs]
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for row in copies:
+            try:
+                func(row)
+            except Exception:
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result[name] = {
+            "alloc_blocks_per_row": round(blocks, 2) + 0.0,
+            "peak_kib": round((peak - baseline) / 1024, 1),
+        }
+        # Feed the next function with this function's output, as in the timed run
+        inputs = [o if isinstance(o, dict) else r for o, r in zip(outputs, inputs)]
+    return result
+
+
+def _histogram(values: array) -> Dict[str, int]:
+    """Latency counts in power-of-two microsecond buckets."""
+    buckets: Dict[int, int] = {}
+    for ns in values:
+        us = ns / 1000
+        bucket = 0 if us < 1 else int(math.log2(us)) + 1
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    return {
+        ("<1us" if b == 0 else f"{2 ** (b - 1)}-{2 ** b}us"): buckets[b]
+        for b in sorted(buckets)
+    }
+
+
+def _summarize(latencies: Dict[str, array], errors: Dict[str, List[Any]]) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    for name, values in latencies.items():
+        ordered = sorted(values)
+        total = sum(ordered)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] / 1000, 2) if ordered else 0.0
+
+        summary[name] = {
+            "rows": len(ordered),
+            "rows_per_sec": round(len(ordered) / (total / 1e9)) if total else None,
+            "p50_us": pct(0.50),
+            "p95_us": pct(0.95),
+            "p99_us": pct(0.99),
+            "max_us": round(ordered[-1] / 1000, 2) if ordered else 0.0,
+            "histogram": _histogram(values),
+            "errors": errors.get(name, [0, None])[0],
+            "first_error": errors.get(name, [0, None])[1],
+        }
+    return summary
+
+
+def profile(sources: Sources, batches: List[List[Row]], jobs: int, digest: bool = False) -> Dict[str, Any]:
+    """Run every batch (in a process pool if `jobs` > 1) and aggregate the measurements."""
+    if jobs > 1:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(sources,)) as pool:
+            results = list(pool.map(_worker_batch, batches, itertools.repeat(digest)))
+    else:
+        functions = compile_functions(sources)
+        # Untimed warm-up batch, so the first variant measured does not pay for cold caches
+        run_batch(functions, batches[0])
+        start = time.perf_counter()
+        results = [run_batch(functions, batch, digest) for batch in batches]
+    wall = time.perf_counter() - start
+
+    latencies = {name: array("q") for name, _ in sources}
+    errors: Dict[str, List[Any]] = {}
+    digests: List[str] = []
+    for r in results:
+        for name, raw in r["latencies"].items():
+            latencies[name].frombytes(raw)
+        for name, (count, message) in r["errors"].items():
+            entry = errors.setdefault(name, [0, message])
+            entry[0] += count
+        digests.extend(r["digests"])
+
+    rows = sum(len(b) for b in batches)
+    return {
+        "rows": rows,
+        "wall_s": round(wall, 3),
+        "rows_per_sec": round(rows / wall) if wall else None,
+        "functions": _summarize(latencies, errors),
+        "digests": digests,
+    }
+
+
+def _hoisted_sources(sources: Sources) -> Sources:
+    variant = []
+    for name, source in sources:
+        hoisted = hoist_per_row_setup(name, source)
+        variant.append((name, hoisted[1] if hoisted else source))
+    return variant
+
+
+def _print_report(label: str, report: Dict[str, Any]) -> None:
+    print(f"{label}: {report['rows']} rows in {report['wall_s']:.3f}s ({report['rows_per_sec']:,} rows/s end-to-end)")
+    print(f"   {'function':<32}{'rows/s':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'blocks/row':>12}"
+          f"{'peak KiB':>10}{'errors':>8}")
+    for name, s in report["functions"].items():
+        alloc = report.get("allocations", {}).get(name, {})
+        rate = f"{s['rows_per_sec']:,}" if s["rows_per_sec"] else "-"
+        print(f"   {name:<32}{rate:>12}{s['p50_us']:>10}{s['p95_us']:>10}{s['p99_us']:>10}"
+              f"{alloc.get('alloc_blocks_per_row', '-'):>12}{alloc.get('peak_kib', '-'):>10}{s['errors']:>8}")
+        print(f"   {'':<32}histogram: {', '.join(f'{k}={v}' for k, v in s['histogram'].items())}")
+        if s["first_error"]:
+            print(f"   {'':<32}first error: {s['first_error']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile python_extensions row transforms over a CSV.")
+    parser.add_argument("pipeline", help="Pipeline YAML with a python_extensions section")
+    parser.add_argument("csv", help="Input CSV (one row per Spark row)")
+    parser.add_argument("--function", action="append", help="Only profile these functions (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Run batches in N worker processes")
+    parser.add_argument("--repeat", type=int, default=1, help="Cycle the CSV rows N times (to scale small samples)")
+    parser.add_argument(
+        "--rename", action="append", default=[], metavar="CSV_COLUMN=FIELD",
+        help="Rename a CSV column to the field name the functions expect",
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per variant (the fastest is kept)")
+    parser.add_argument("--alloc-rows", type=int, default=1000, help="Rows used by the allocation pass (0 to skip)")
+    alternatives = parser.add_mutually_exclusive_group()
+    alternatives.add_argument(
+        "--compare", metavar="OTHER_YAML",
+        help="Compare with the same functions from another YAML",
+    )
+    alternatives.add_argument(
+        "--hoisted", action="store_true",
+        help="Compare with the python-per-row-setup lint rewrite (imports and regexes hoisted)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        rename = dict(item.split("=", 1) for item in args.rename)
+    except ValueError:
+        print("--rename expects CSV_COLUMN=FIELD", file=sys.stderr)
+        return 1
+
+    try:
+        sources = load_functions(args.pipeline)
+        if args.function:
+            missing = set(args.function) - {name for name, _ in sources}
+            if missing:
+                raise ValueError(f"Functions not found in python_extensions: {', '.join(sorted(missing))}")
+            sources = [(name, src) for name, src in sources if name in args.function]
+        if not sources:
+            raise ValueError("No row_transform functions found under python_extensions.stages")
+        alternative = None
+        if args.compare:
+            other = dict(load_functions(args.compare))
+            alternative = [(name, other.get(name, src)) for name, src in sources]
+        elif args.hoisted:
+            alternative = _hoisted_sources(sources)
+        compile_functions(sources)
+        if alternative:
+            compile_functions(alternative)
+    except (OSError, ValueError, SyntaxError, yaml.YAMLError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    batches = list(read_batches(args.csv, args.batch_size, args.repeat, rename))
+    if not batches:
+        print(f"No rows in {args.csv}", file=sys.stderr)
+        return 1
+    sample = list(itertools.islice(itertools.chain.from_iterable(batches), args.alloc_rows))
+
+    compare = alternative is not None
+    variants = [("baseline", sources)] + ([("alternative", alternative)] if compare else [])
+    reports: Dict[str, Any] = {}
+    # Variants are run in alternation and the fastest round of each is kept, so that
+    # machine noise and drift do not favor the variant that happens to run first
+    for _ in range(max(args.rounds, 1)):
+        for label, variant in variants:
+            report = profile(variant, batches, args.jobs, compare)
+            if label not in reports or report["wall_s"] < reports[label]["wall_s"]:
+                reports[label] = report
+    for label, variant in (("baseline", sources), ("alternative", alternative)):
+        if label in reports and sample:
+            reports[label]["allocations"] = measure_allocations(variant, sample)
+
+    mismatches = None
+    if alternative:
+        base, alt = reports["baseline"]["digests"], reports["alternative"]["digests"]
+        mismatches = sum(1 for a, b in zip(base, alt) if a != b)
+        reports["speedup"] = {
+            name: round(reports["alternative"]["functions"][name]["rows_per_sec"] / s["rows_per_sec"], 2)
+            if s["rows_per_sec"] and reports["alternative"]["functions"][name]["rows_per_sec"] else None
+            for name, s in reports["baseline"]["functions"].items()
+        }
+        reports["output_mismatches"] = mismatches
+    for r in reports.values():
+        if isinstance(r, dict):
+            r.pop("digests", None)
+
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        _print_report("baseline", reports["baseline"])
+        if alternative:
+            _print_report("alternative", reports["alternative"])
+            print("speedup (alternative vs baseline, function time):")
+            for name, ratio in reports["speedup"].items():
+                print(f"   {name:<32}{ratio}x" if ratio else f"   {name:<32}-")
+            status = "identical" if not mismatches else f"{mismatches} row(s) differ"
+            print(f"outputs: {status}")
+
+    return 2 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Refresh notturno della specifica OpenAPI in una sola lettura/scrittura.
+
+Esegue in sequenza, in memoria, le passate registrate in `spec_engine`
+(rimozione endpoint legacy, descrizioni personalizzate, default per path/metodo,
+parametri e responses) e stampa il tempo di ogni passata.
+
+Uso:
+    python3 scripts/refresh-spec.py
+    python3 scripts/refresh-spec.py --passes remove_legacy,endpoint_info
+    python3 scripts/refresh-spec.py --input merged.yaml --output openapi.yaml
+    python3 scripts/refresh-spec.py --profile otel --profile-output refresh-metrics.json
+"""
+
+import argparse
+from pathlib import Path
+
+import instrumentation
+import spec_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh della specifica OpenAPI a passata singola')
+    parser.add_argument('--input', type=Path, default=spec_engine.OPENAPI_FILE, help='Specifica da leggere')
+    parser.add_argument('--output', type=Path, default=None, help='File di destinazione (default: --input)')
+    parser.add_argument('--passes', default=None,
+                        help=f"Passate separate da virgola (default: {','.join(spec_engine.PASSES)})")
+    parser.add_argument('--full-dump', action='store_true',
+                        help='Riserializza tutto il documento invece di riscrivere solo le operazioni modificate')
+    parser.add_argument('--list-passes', action='store_true', help='Elenca le passate disponibili ed esce')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.list_passes:
+        for name in spec_engine.PASSES:
+            print(name)
+        return 0
+
+    names = args.passes.split(',') if args.passes else None
+    instrumentation.setup('refresh-spec.py', args)
+    try:
+        spec_engine.run(names, input_file=args.input, output_file=args.output, incremental=not args.full_dump)
+    except ValueError as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -3,38 +3,33 @@
 Script per rimuovere tutti gli endpoint legacy dalla documentazione OpenAPI.
 """
 
-import yaml
-from pathlib import Path
+import argparse
 
-def main():
-    openapi_file = Path(__file__).parent.parent / 'openapi.yaml'
-    
-    print(f"📖 Leggendo {openapi_file}...")
-    with open(openapi_file, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
-    
-    paths = data.get('paths', {})
-    removed_count = 0
-    
+import instrumentation
+import spec_engine
+
+
+def remove_legacy_paths(paths):
+    """Rimuove dal dizionario `paths` tutti gli endpoint legacy e restituisce i path rimossi."""
     # Trova e rimuovi tutti gli endpoint legacy
     legacy_paths = [path for path in paths.keys() if 'datasets-legacy' in path]
-    
+
     print(f"🔍 Trovati {len(legacy_paths)} endpoint legacy da rimuovere...")
-    
+
     for path in legacy_paths:
         print(f"  - Rimuovendo: {path}")
         del paths[path]
-        removed_count += 1
-    
-    print(f"✨ Rimossi {removed_count} endpoint legacy...")
-    
-    # Salva
-    print(f"💾 Salvando in {openapi_file}...")
-    with open(openapi_file, 'w', encoding='utf-8') as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False, width=120)
-    
-    print("✅ Completato!")
+
+    print(f"✨ Rimossi {len(legacy_paths)} endpoint legacy...")
+    return legacy_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rimuove gli endpoint legacy dalla specifica')
+    instrumentation.add_arguments(parser)
+    instrumentation.setup('remove-legacy-endpoints.py', parser.parse_args())
+    spec_engine.run(['remove_legacy'])
+
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Recompute `matching_score` of EAN result exports offline, with NumPy-vectorized scoring.
+
+Requires NumPy for vectorized scoring (`python3 -m pip install numpy`); without it the
+rescore falls back on the per-row scorer and says so on stderr, and `--benchmark` exits
+with an error.
+
+Uses the configuration keys of the `enrichMatchingScore` stage (`ean_field`,
+`description_field`, `brand_field`, `extracted_prefix`, `output_field`), taken from a
+pipeline YAML (`--pipeline`) and/or `--config KEY=VALUE`, and streams the CSV in
+chunks (`--chunk-rows`), so memory stays bounded on multi-GB exports.
+
+Scoring models (`--model`; the Scala scorer is not part of this repository):
+- search (default): where the input EAN digits (8+) appear in the search result that
+  produced the row; of the configuration it only reads `ean_field` and `output_field`. 0.8 if in `result_snippet` or `result_title`, 0.6 if only in
+  `result_link`, 0 otherwise. This reproduces every score of dataset_226_results.csv
+  (an EAN in the title alone does not occur there and is scored like the snippet).
+- fields: a tunable weighted model on the extracted fields, which does NOT reproduce the
+  existing scores (use it to experiment, not to rewrite exports):
+  - ean: 1 if the input EAN digits appear in `<prefix>ean_code` or the extracted name/description
+  - brand: 1 if the input brand appears in `<prefix>brand`, `<prefix>product_name` or `<prefix>description`
+  - description: Jaccard similarity of hashed character trigrams between the input
+    description and `<prefix>product_name`
+  - score = weights · components (see `--weight`), rounded to 4 decimals
+
+The report compares the recomputed scores with the output field already in the file:
+`agreement` is the fraction of unchanged rows and `differences` counts the
+`old -> new` transitions, so a model is checked against the file before it is used
+to rewrite one.
+
+Text is lowercased, ASCII punctuation becomes a separator and every field is
+truncated to `--max-chars` characters; the per-row scorer (used by `--benchmark`)
+applies exactly the same rules, so both produce the same scores.
+
+Usage:
+    python3 scripts/rescore-matching.py dataset_226_results.csv
+    python3 scripts/rescore-matching.py export.csv --pipeline examples/pipelines/07-searchengine-ean-enrich.yaml \\
+        --output rescored.csv
+    python3 scripts/rescore-matching.py dataset_226_results.csv --model fields --weight description=0.5 --weight brand=0.1
+    python3 scripts/rescore-matching.py dataset_226_results.csv --benchmark --repeat 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CONFIG: Dict[str, str] = {
+    "ean_field": "EAN number",
+    "description_field": "Item description",
+    "brand_field": "Brand",
+    "extracted_prefix": "prod_",
+    "output_field": "matching_score",
+}
+# Spellings used by some pipeline examples for the same keys
+CONFIG_ALIASES = {"input_ean_field": "ean_field", "iextract_prefix": "extracted_prefix"}
+
+DEFAULT_WEIGHTS: Dict[str, float] = {"ean": 0.5, "brand": 0.2, "description": 0.3}
+
+MODELS = ("search", "fields")
+# Configuration keys read only by the fields model; the search model reads ean_field and output_field
+FIELDS_CONFIG = ("description_field", "brand_field", "extracted_prefix")
+# Scores of the search model: EAN in the result text (snippet or title), EAN only in the link
+SEARCH_SCORES: Dict[str, float] = {"text": 0.8, "link": 0.6}
+
+# Bits of the hashed trigram sets (power of two)
+TRIGRAM_BITS = 1024
+MIN_EAN_DIGITS = 8
+
+# ASCII characters that are not letters or digits become separators
+_SEPARATORS = {c: " " for c in range(128) if not chr(c).isalnum()}
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "NumPy is required for vectorized scoring.\n"
+            "Install with: python3 -m pip install numpy\n"
+            f"Import error: {e}"
+        )
+    return numpy
+
+
+# --- Columns ---------------------------------------------------------------
+
+class Columns:
+    """Indexes of the CSV columns used by the scorer (matched case-insensitively)."""
+
+    def __init__(self, header: List[str], config: Dict[str, str], model: str) -> None:
+        lookup = {name.strip().lower(): i for i, name in enumerate(header)}
+        prefix = config["extracted_prefix"]
+
+        def find(name: str) -> Optional[int]:
+            return lookup.get(name.strip().lower())
+
+        self.ean = find(config["ean_field"])
+        self.description = find(config["description_field"])
+        self.brand = find(config["brand_field"])
+        self.ean_code = find(f"{prefix}ean_code")
+        self.product_name = find(f"{prefix}product_name")
+        self.product_brand = find(f"{prefix}brand")
+        self.product_description = find(f"{prefix}description")
+        self.result_title = find("result_title")
+        self.result_snippet = find("result_snippet")
+        self.result_link = find("result_link")
+        self.output = find(config["output_field"])
+        required = [("ean_field", self.ean)]
+        if model == "fields":
+            required += [("description_field", self.description), ("brand_field", self.brand)]
+        missing = [config[k] for k, i in required if i is None]
+        if missing:
+            raise ValueError(f"Input columns not found in CSV header: {', '.join(missing)}")
+        if model == "search" and self.result_snippet is None and self.result_link is None:
+            raise ValueError("The search model needs the result_snippet / result_link columns (see --model fields)")
+
+    def values(self, rows: List[List[str]], index: Optional[int]) -> List[str]:
+        if index is None:
+            return [""] * len(rows)
+        return [row[index] if index < len(row) else "" for row in rows]
+
+
+# --- Per-row scorer ----------------------------------------------------------
+
+def _normalize(text: str, max_chars: int) -> str:
+    return text[:max_chars].lower().translate(_SEPARATORS)
+
+
+def _trigram_bits(text: str) -> set:
+    bits = set()
+    codes = [ord(ch) for ch in text]
+    for c0, c1, c2 in zip(codes, codes[1:], codes[2:]):
+        if c0 > 32 and c1 > 32 and c2 > 32:
+            bits.add(((c0 * 1000003) ^ (c1 * 8191) ^ c2) & (TRIGRAM_BITS - 1))
+    return bits
+
+
+def _digits(text: str) -> str:
+    return "".join(ch for ch in text if "0" <= ch <= "9")
+
+
+def score_search_row(values: Dict[str, str], max_chars: int) -> float:
+    """Search-model score of one row; `values` holds the raw field texts keyed like the `Columns` attributes."""
+    n = {k: _normalize(v, max_chars) for k, v in values.items()}
+    ean = _digits(n["ean"])
+    if len(ean) < MIN_EAN_DIGITS:
+        return 0.0
+    if ean in n["result_snippet"] or ean in n["result_title"]:
+        return SEARCH_SCORES["text"]
+    if ean in n["result_link"]:
+        return SEARCH_SCORES["link"]
+    return 0.0
+
+
+def score_row(values: Dict[str, str], weights: Dict[str, float], max_chars: int) -> float:
+    """Fields-model score of one row; `values` holds the raw field texts keyed like the `Columns` attributes."""
+    n = {k: _normalize(v, max_chars) for k, v in values.items()}
+
+    ean = _digits(n["ean"])
+    ean_hit = len(ean) >= MIN_EAN_DIGITS and (
+        ean in _digits(n["ean_code"]) or ean in n["product_name"] or ean in n["product_description"]
+    )
+
+    brand = n["brand"].strip()
+    haystack = f"{n['product_brand']} {n['product_name']} {n['product_description']}"
+    brand_hit = bool(brand) and brand in haystack
+
+    a, b = _trigram_bits(n["description"]), _trigram_bits(n["product_name"])
+    union = len(a | b)
+    similarity = len(a & b) / union if union else 0.0
+
+    return round(weights["ean"] * ean_hit + weights["brand"] * brand_hit + weights["description"] * similarity, 4)
+
+
+FIELDS = ("ean", "description", "brand", "ean_code", "product_name", "product_brand", "product_description")
+SEARCH_FIELDS = ("ean", "result_title", "result_snippet", "result_link")
+
+
+def score_rows(columns: Columns, rows: List[List[str]], model: str, weights: Dict[str, float],
+               max_chars: int) -> List[float]:
+    names = SEARCH_FIELDS if model == "search" else FIELDS
+    fields = {f: columns.values(rows, getattr(columns, f)) for f in names}
+    if model == "search":
+        return [score_search_row({f: fields[f][i] for f in names}, max_chars) for i in range(len(rows))]
+    return [
+        score_row({f: fields[f][i] for f in names}, weights, max_chars)
+        for i in range(len(rows))
+    ]
+
+
+class RowScorer:
+    """Per-row scorer with the interface of `VectorScorer`, used when NumPy is not installed."""
+
+    def __init__(self, model: str, weights: Dict[str, float], max_chars: int) -> None:
+        self.model = model
+        self.weights = weights
+        self.max_chars = max_chars
+
+    def score(self, columns: Columns, rows: List[List[str]]) -> List[float]:
+        return score_rows(columns, rows, self.model, self.weights, self.max_chars)
+
+
+# --- Vectorized scorer -------------------------------------------------------
+
+class VectorScorer:
+    """Scores whole chunks with NumPy: one array operation per step instead of one Python loop per row."""
+
+    def __init__(self, model: str, weights: Dict[str, float], max_chars: int) -> None:
+        np = self.np = _import_numpy()
+        self.model = model
+        self.weights = weights
+        self.max_chars = max_chars
+        separators = np.zeros(128, dtype=bool)
+        separators[list(_SEPARATORS)] = True
+        self.separators = separators
+
+    def _codes(self, texts: List[str]) -> Any:
+        """Normalized texts as a (rows, width) uint32 matrix of code points (0 = padding)."""
+        np = self.np
+        # str.lower while building the list costs less than np.char.lower on the array
+        texts = [t[:self.max_chars].lower() for t in texts]
+        # Width of the longest text in the chunk, not max_chars: most fields are short or empty
+        width = max(1, max(map(len, texts), default=1))
+        codes = np.array(texts, dtype=f"<U{width}").view(np.uint32).reshape(len(texts), -1).copy()
+        ascii_sep = (codes < 128) & (codes > 0) & self.separators[np.minimum(codes, 127)]
+        codes[ascii_sep] = 32
+        return codes
+
+    def _strings(self, codes: Any) -> Any:
+        return codes.view(f"<U{codes.shape[1]}").reshape(len(codes))
+
+    def _trigrams(self, codes: Any) -> Any:
+        """Sorted unique `row * TRIGRAM_BITS + hash` keys of the hashed trigrams of each row."""
+        np = self.np
+        if codes.shape[1] < 3:
+            return np.zeros(0, dtype=np.int64)
+        c0, c1, c2 = (codes[:, i:codes.shape[1] - 2 + i].astype(np.int64) for i in range(3))
+        valid = (c0 > 32) & (c1 > 32) & (c2 > 32)
+        hashes = ((c0 * 1000003) ^ (c1 * 8191) ^ c2) & (TRIGRAM_BITS - 1)
+        rows, _ = np.nonzero(valid)
+        keys = np.sort(rows * TRIGRAM_BITS + hashes[valid])
+        return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+    def _digits(self, codes: Any) -> Any:
+        np = self.np
+        is_digit = (codes >= 48) & (codes <= 57)
+        # Stable sort moves the digits to the front of each row, in order; the rest becomes padding
+        order = np.argsort(~is_digit, axis=1, kind="stable")
+        compact = np.take_along_axis(codes * is_digit, order, axis=1)
+        return self._strings(np.ascontiguousarray(compact)), is_digit.sum(axis=1)
+
+    def score(self, columns: Columns, rows: List[List[str]]) -> List[float]:
+        scores = self._search(columns, rows) if self.model == "search" else self._fields(columns, rows)
+        return scores.tolist()
+
+    def _search(self, columns: Columns, rows: List[List[str]]) -> Any:
+        np = self.np
+        codes = {f: self._codes(columns.values(rows, getattr(columns, f))) for f in SEARCH_FIELDS}
+        text = {f: self._strings(c) for f, c in codes.items()}
+
+        ean, ean_len = self._digits(codes["ean"])
+        valid = ean_len >= MIN_EAN_DIGITS
+        in_text = valid & (
+            (np.char.find(text["result_snippet"], ean) >= 0) | (np.char.find(text["result_title"], ean) >= 0)
+        )
+        in_link = valid & (np.char.find(text["result_link"], ean) >= 0)
+        return np.where(in_text, SEARCH_SCORES["text"], np.where(in_link, SEARCH_SCORES["link"], 0.0))
+
+    def _fields(self, columns: Columns, rows: List[List[str]]) -> Any:
+        np = self.np
+        codes = {f: self._codes(columns.values(rows, getattr(columns, f))) for f in FIELDS}
+        text = {f: self._strings(c) for f, c in codes.items()}
+
+        ean, ean_len = self._digits(codes["ean"])
+        ean_code, _ = self._digits(codes["ean_code"])
+        ean_hit = (ean_len >= MIN_EAN_DIGITS) & (
+            (np.char.find(ean_code, ean) >= 0)
+            | (np.char.find(text["product_name"], ean) >= 0)
+            | (np.char.find(text["product_description"], ean) >= 0)
+        )
+
+        brand = np.char.strip(text["brand"])
+        haystack = np.char.add(
+            np.char.add(np.char.add(text["product_brand"], " "), np.char.add(text["product_name"], " ")),
+            text["product_description"],
+        )
+        brand_hit = (np.char.str_len(brand) > 0) & (np.char.find(haystack, brand) >= 0)
+
+        # Set sizes per row from the sorted keys, instead of a (rows, TRIGRAM_BITS) bit matrix
+        n = len(rows)
+        a, b = self._trigrams(codes["description"]), self._trigrams(codes["product_name"])
+        common = np.intersect1d(a, b, assume_unique=True)
+        inter = np.bincount(common // TRIGRAM_BITS, minlength=n)
+        union = np.bincount(a // TRIGRAM_BITS, minlength=n) + np.bincount(b // TRIGRAM_BITS, minlength=n) - inter
+        similarity = np.divide(inter, union, out=np.zeros(n), where=union > 0)
+
+        w = self.weights
+        return np.round(w["ean"] * ean_hit + w["brand"] * brand_hit + w["description"] * similarity, 4)
+
+
+# --- CSV streaming -----------------------------------------------------------
+
+def read_chunks(path: str, chunk_rows: int, repeat: int = 1) -> Tuple[List[str], Iterator[List[List[str]]]]:
+    """Header and an iterator of row chunks; the file is read lazily (cycled `repeat` times)."""
+    def rows() -> Iterator[List[str]]:
+        for _ in range(repeat):
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                yield from reader
+
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+
+    def chunks() -> Iterator[List[List[str]]]:
+        stream = rows()
+        while True:
+            chunk = list(itertools.islice(stream, chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+
+    return header, chunks()
+
+
+def load_config(pipeline: Optional[str], overrides: List[str]) -> Dict[str, str]:
+    config = dict(DEFAULT_CONFIG)
+    if pipeline:
+        from spec_cache import load_yaml
+        from pipeline_stages import lookup
+
+        data = load_yaml(pipeline)
+        for item in (data or {}).get("pipeline") or []:
+            schema = lookup(item.get("stage", "")) if isinstance(item, dict) else None
+            if schema is not None and schema.name == "enrichMatchingScore":
+                args = item.get("args") or [{}]
+                stage_config = args[0] if isinstance(args[0], dict) else {}
+                for key, value in stage_config.items():
+                    config[CONFIG_ALIASES.get(key, key)] = str(value)
+                break
+        else:
+            raise ValueError(f"No enrichMatchingScore stage in {pipeline}")
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        key = CONFIG_ALIASES.get(key, key)
+        if not sep or key not in DEFAULT_CONFIG:
+            raise ValueError(f"Invalid config '{item}' (known keys: {', '.join(DEFAULT_CONFIG)})")
+        config[key] = value
+    return config
+
+
+def _check_config(config: Dict[str, str], overrides: List[str], model: str) -> None:
+    """Reject `--config` keys the search model does not read; warn when a pipeline sets them."""
+    if model != "search":
+        return
+    explicit = {CONFIG_ALIASES.get(key, key) for key, _, _ in (item.partition("=") for item in overrides)}
+    rejected = [key for key in FIELDS_CONFIG if key in explicit]
+    if rejected:
+        raise ValueError(f"--config {', '.join(rejected)} only applies to --model fields")
+    ignored = [key for key in FIELDS_CONFIG if config[key] != DEFAULT_CONFIG[key]]
+    if ignored:
+        print(f"Warning: pipeline keys ignored by --model search: {', '.join(ignored)}", file=sys.stderr)
+
+
+def _parse_weights(items: List[str], model: str) -> Dict[str, float]:
+    if items and model != "fields":
+        raise ValueError("--weight only applies to --model fields")
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or key not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Invalid weight '{item}' (known: {', '.join(DEFAULT_WEIGHTS)})")
+        weights[key] = float(value)
+    return weights
+
+
+def _old_score(row: List[str], index: Optional[int]) -> Optional[float]:
+    if index is None or index >= len(row):
+        return None
+    try:
+        return float(row[index])
+    except ValueError:
+        return None
+
+
+def _make_scorer(model: str, weights: Dict[str, float], max_chars: int) -> Any:
+    try:
+        return VectorScorer(model, weights, max_chars)
+    except RuntimeError as e:
+        print(f"Warning: {e}\nFalling back on the per-row scorer.", file=sys.stderr)
+        return RowScorer(model, weights, max_chars)
+
+
+def rescore(args: argparse.Namespace, config: Dict[str, str], weights: Dict[str, float]) -> Dict[str, Any]:
+    header, chunks = read_chunks(args.csv, args.chunk_rows, args.repeat)
+    columns = Columns(header, config, args.model)
+    scorer = _make_scorer(args.model, weights, args.max_chars)
+
+    out = None
+    writer = None
+    if args.output:
+        out = open(args.output, "w", newline="", encoding="utf-8")
+        writer = csv.writer(out)
+        writer.writerow(header if columns.output is not None else header + [config["output_field"]])
+
+    stats = {"rows": 0, "score_sum": 0.0, "compared": 0, "changed": 0, "abs_diff_sum": 0.0}
+    differences: Dict[str, int] = {}
+    scoring = 0.0
+    try:
+        for chunk in chunks:
+            start = time.perf_counter()
+            scores = scorer.score(columns, chunk)
+            scoring += time.perf_counter() - start
+            for row, score in zip(chunk, scores):
+                old = _old_score(row, columns.output)
+                if old is not None:
+                    stats["compared"] += 1
+                    stats["abs_diff_sum"] += abs(score - old)
+                    if abs(score - old) > 1e-9:
+                        stats["changed"] += 1
+                        key = f"{old:g} -> {score:g}"
+                        differences[key] = differences.get(key, 0) + 1
+                if writer is not None:
+                    if columns.output is not None:
+                        row = list(row) + [""] * (len(header) - len(row))
+                        row[columns.output] = f"{score:g}"
+                    else:
+                        row = list(row) + [f"{score:g}"]
+                    writer.writerow(row)
+            stats["rows"] += len(chunk)
+            stats["score_sum"] += sum(scores)
+    finally:
+        if out is not None:
+            out.close()
+
+    rows = stats["rows"]
+    compared = stats["compared"]
+    return {
+        "model": args.model,
+        "scorer": "vectorized" if isinstance(scorer, VectorScorer) else "per-row",
+        "config": config if args.model == "fields" else {k: v for k, v in config.items() if k not in FIELDS_CONFIG},
+        "weights": weights if args.model == "fields" else None,
+        "rows": rows,
+        "mean_score": round(stats["score_sum"] / rows, 4) if rows else None,
+        "compared_with_existing": compared,
+        "changed": stats["changed"],
+        "agreement": round(1 - stats["changed"] / compared, 4) if compared else None,
+        "mean_abs_diff": round(stats["abs_diff_sum"] / compared, 4) if compared else None,
+        "differences": dict(sorted(differences.items(), key=lambda kv: -kv[1])),
+        "scoring_rows_per_sec": round(rows / scoring) if scoring else None,
+        "output": args.output,
+    }
+
+
+def benchmark(args: argparse.Namespace, config: Dict[str, str], weights: Dict[str, float]) -> Dict[str, Any]:
+    """Per-row vs vectorized scoring on the same chunks; the scores must be identical."""
+    np = _import_numpy()
+    header, chunks = read_chunks(args.csv, args.chunk_rows, args.repeat)
+    columns = Columns(header, config, args.model)
+    scorer = VectorScorer(args.model, weights, args.max_chars)
+
+    per_row = vectorized = 0.0
+    rows = mismatches = 0
+    for chunk in chunks:
+        start = time.perf_counter()
+        expected = score_rows(columns, chunk, args.model, weights, args.max_chars)
+        per_row += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = scorer.score(columns, chunk)
+        vectorized += time.perf_counter() - start
+
+        mismatches += int((np.abs(np.asarray(expected) - np.asarray(actual)) > 1e-9).sum())
+        rows += len(chunk)
+
+    return {
+        "model": args.model,
+        "rows": rows,
+        "chunk_rows": args.chunk_rows,
+        "per_row_rows_per_sec": round(rows / per_row) if per_row else None,
+        "vectorized_rows_per_sec": round(rows / vectorized) if vectorized else None,
+        "speedup": round(per_row / vectorized, 2) if vectorized else None,
+        "mismatches": mismatches,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute matching_score of EAN result CSVs offline.")
+    parser.add_argument("csv", help="Result CSV (e.g. dataset_226_results.csv)")
+    parser.add_argument("--pipeline", help="Take the configuration from the enrichMatchingScore stage of this YAML")
+    parser.add_argument(
+        "--config", action="append", default=[], metavar="KEY=VALUE",
+        help=f"Override a configuration key ({', '.join(DEFAULT_CONFIG)})",
+    )
+    parser.add_argument(
+        "--model", choices=MODELS, default="search",
+        help="search: reproduces the existing scores (default); fields: tunable weighted model",
+    )
+    parser.add_argument(
+        "--weight", action="append", default=[], metavar="COMPONENT=WEIGHT",
+        help=f"Weight of a fields-model component ({', '.join(f'{k}={v}' for k, v in DEFAULT_WEIGHTS.items())})",
+    )
+    parser.add_argument("--output", help="Write the CSV with the recomputed output field")
+    parser.add_argument("--chunk-rows", type=int, default=10_000, help="Rows per streamed chunk")
+    parser.add_argument("--max-chars", type=int, default=256, help="Characters of each field used for scoring")
+    parser.add_argument("--repeat", type=int, default=1, help="Cycle the CSV N times (to scale small samples)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare per-row and vectorized scoring")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.pipeline, args.config)
+        _check_config(config, args.config, args.model)
+        weights = _parse_weights(args.weight, args.model)
+        result = benchmark(args, config, weights) if args.benchmark else rescore(args, config, weights)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 2 if args.benchmark and result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Simulate the wall-clock time of crawling pipeline YAML files before launching them.
+
+Each file is parsed and validated with the rules of `validate-pipeline-examples.py`,
+costed by `pipeline_cost.py` and replayed by the crawl simulator in `pipeline_crawl.py`
+under the given concurrency, browser pool size and per-host politeness limits. The
+report is JSON on stdout: estimated wall-clock seconds, the critical path through the
+pipeline stages, browser slot occupancy and the number of browsers worth running, and
+the `fetch.traces` entries whose removal would save the most time.
+
+With `--max-wall-seconds` the script exits with status 2 if any pipeline is estimated
+to run longer (or fails validation).
+
+Usage:
+    python3 scripts/simulate-crawl.py                                          # examples/pipelines/
+    python3 scripts/simulate-crawl.py examples/pipelines/08-fetch-traces-browser-actions.yaml
+    python3 scripts/simulate-crawl.py --assume browser_pool=8 --assume per_host=4 --assume host_delay=1
+    python3 scripts/simulate-crawl.py --assume input_rows=50000 --max-wall-seconds 3600 --summary
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from pipeline_cost import DEFAULT_ASSUMPTIONS as COST_ASSUMPTIONS
+from pipeline_crawl import DEFAULT_ASSUMPTIONS, simulate
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWN_ASSUMPTIONS: Dict[str, float] = {**COST_ASSUMPTIONS, **DEFAULT_ASSUMPTIONS}
+
+
+def _load_validator() -> Any:
+    path = os.path.join(SCRIPTS_DIR, "validate-pipeline-examples.py")
+    spec = importlib.util.spec_from_file_location("validate_pipeline_examples", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _parse_assumptions(items: List[str]) -> Dict[str, float]:
+    assumptions: Dict[str, float] = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or key not in KNOWN_ASSUMPTIONS:
+            raise ValueError(f"Invalid assumption '{item}' (known keys: {', '.join(KNOWN_ASSUMPTIONS)})")
+        assumptions[key] = float(value)
+    return assumptions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    root = os.path.dirname(SCRIPTS_DIR)
+
+    parser = argparse.ArgumentParser(description="Simulate the wall-clock crawl time of pipeline YAML files.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Files or directories to simulate (default: examples/pipelines/)",
+    )
+    parser.add_argument(
+        "--assume", action="append", default=[], metavar="KEY=VALUE",
+        help=f"Override a crawl or cost assumption ({', '.join(KNOWN_ASSUMPTIONS)})",
+    )
+    parser.add_argument("--top", type=int, default=5, help="Costliest traces to report (default: 5)")
+    parser.add_argument("--max-wall-seconds", type=float, help="Fail if a pipeline is estimated to run longer")
+    parser.add_argument("--summary", action="store_true", help="Omit the per-group breakdown")
+    args = parser.parse_args(argv)
+
+    try:
+        assumptions = _parse_assumptions(args.assume)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    validator = _load_validator()
+    files = validator._collect_files(root, args.paths)
+    if not files:
+        print(f"No YAML files found under {', '.join(args.paths) or os.path.join(root, 'examples', 'pipelines')}",
+              file=sys.stderr)
+        return 1
+
+    report: List[Dict[str, Any]] = []
+    rejected = 0
+    for f in files:
+        entry: Dict[str, Any] = {"file": os.path.relpath(f, root)}
+        try:
+            data = validator._load_yaml(f)
+            validator.validate_pipeline(data)
+        except Exception as e:
+            entry.update(ok=False, error=str(e))
+            rejected += 1
+            report.append(entry)
+            continue
+
+        result = simulate(data, assumptions, top=args.top)
+        over = args.max_wall_seconds is not None and result["wall_seconds"] > args.max_wall_seconds
+        del result["assumptions"]
+        if args.summary:
+            del result["groups"], result["critical_path"]
+        entry.update(ok=not over, **result)
+        rejected += bool(over)
+        report.append(entry)
+
+    json.dump(
+        {"assumptions": {**KNOWN_ASSUMPTIONS, **assumptions}, "pipelines": report},
+        sys.stdout, indent=2,
+    )
+    sys.stdout.write("\n")
+    return 2 if rejected else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
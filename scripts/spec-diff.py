@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Diff strutturale tra due versioni della specifica OpenAPI (vedi `spec_diff.py`).
+
+Confronta YAML e/o JSON (es. `openapi.json` contro `openapi.yaml`) e riporta in JSON
+endpoint, schemi e componenti aggiunti, rimossi e modificati. Con `--exit-code`
+esce con stato 2 se le specifiche differiscono, per decidere se rifare la build dei docs.
+
+Uso:
+    python3 scripts/spec-diff.py openapi.json openapi.yaml
+    python3 scripts/spec-diff.py old.yaml openapi.yaml --summary
+    python3 scripts/spec-diff.py old.yaml openapi.yaml --exit-code > /dev/null || npm run build-docs
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+from spec_diff import diff, load_tree, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff strutturale tra due specifiche OpenAPI')
+    parser.add_argument('old', type=Path, help='Versione precedente (YAML o JSON)')
+    parser.add_argument('new', type=Path, help='Nuova versione (YAML o JSON)')
+    parser.add_argument('--summary', action='store_true', help='Solo i conteggi per sezione')
+    parser.add_argument('--exit-code', action='store_true', help='Esce con stato 2 se le specifiche differiscono')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        old = load_tree(args.old)
+        new = load_tree(args.new)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}", file=sys.stderr)
+        return 1
+    result = diff(old, new)
+    elapsed = time.perf_counter() - start
+
+    report = {'old': str(args.old), 'new': str(args.new), 'elapsed_ms': round(elapsed * 1000, 1)}
+    report['identical'] = result['identical']
+    report['counts'] = summary(result)
+    if not args.summary:
+        report.update({k: v for k, v in result.items() if k != 'identical'})
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write('\n')
+
+    return 2 if args.exit_code and not result['identical'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Analisi dei `$ref` della specifica OpenAPI (vedi `spec_refs.py`).
+
+Senza opzioni stampa un riepilogo: operazioni, componenti, componenti non
+raggiungibili, cicli e `$ref` pendenti. Con `--prune` scrive una copia della
+specifica senza i componenti non raggiungibili, da usare per la build dei docs
+(`npm run bundle:pruned`): la specifica sorgente non viene toccata.
+
+Esce con stato 2 se esistono `$ref` pendenti.
+
+Uso:
+    python3 scripts/spec-refs.py
+    python3 scripts/spec-refs.py --dependents Error
+    python3 scripts/spec-refs.py --dependents '#/components/schemas/AgentDto' --json
+    python3 scripts/spec-refs.py --prune dist/openapi.pruned.yaml
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+import spec_engine
+from spec_refs import RefGraph, summary
+
+
+def _write(data, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    else:
+        spec_engine.dump_spec(data, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grafo dei $ref della specifica OpenAPI')
+    parser.add_argument('--input', type=Path, default=spec_engine.OPENAPI_FILE, help='Specifica da analizzare')
+    parser.add_argument('--dependents', action='append', default=[], metavar='COMPONENTE',
+                        help="Operazioni che dipendono dal componente (nome schema, 'tipo/Nome' o puntatore)")
+    parser.add_argument('--prune', type=Path, metavar='OUTPUT',
+                        help='Scrive la specifica senza componenti non raggiungibili (.yaml o .json)')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    try:
+        data = spec_engine.load_spec(args.input)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    graph = RefGraph(data)
+    report = summary(graph)
+    if args.dependents:
+        report['dependents'] = {
+            name: sorted(graph.dependents(name)) for name in args.dependents
+        }
+    if args.prune:
+        pruned, removed = graph.prune()
+        _write(pruned, args.prune)
+        report['pruned'] = {'output': str(args.prune), 'removed': removed}
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        print(f"🔍 {report['operations']} operazioni, {report['components']} componenti, "
+              f"{report['ref_edges']} riferimenti")
+        for name, operations in report.get('dependents', {}).items():
+            if graph.normalize(name) not in graph.edges:
+                print(f"⚠️  {name}: componente inesistente")
+                continue
+            print(f"🔗 {name}: {len(operations)} operazioni")
+            for operation in operations:
+                print(f"  - {operation}")
+        print(f"🧹 Componenti non raggiungibili: {len(report['unreachable'])}")
+        for node in report['unreachable']:
+            print(f"  - {node}")
+        print(f"🔁 Cicli: {len(report['cycles'])}")
+        for cycle in report['cycles']:
+            print(f"  - {' -> '.join(cycle)}")
+        if 'pruned' in report:
+            print(f"✂️  Scritta {args.prune} senza {len(report['pruned']['removed'])} componenti")
+        if report['dangling']:
+            print(f"❌ $ref pendenti: {len(report['dangling'])}")
+            for entry in report['dangling']:
+                print(f"  - {entry['from']}: {entry['ref']}")
+        else:
+            print("✅ Nessun $ref pendente")
+
+    return 2 if report['dangling'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Shard per tag della specifica OpenAPI (vedi `spec_shards.py`).
+
+Senza opzioni scrive in `--output-dir` un file per tag, `components.yaml` e
+`index.yaml`, riscrivendo solo gli shard la cui impronta è cambiata. Con
+`--build-docs` rigenera con redocly le pagine HTML dei soli shard riscritti (o
+senza pagina). `--bundle` ricompone la specifica dagli shard; `--verify`
+controlla che la ricomposizione sia identica all'originale (stato 2 se no).
+
+Uso:
+    python3 scripts/spec-shards.py
+    python3 scripts/spec-shards.py --verify
+    python3 scripts/spec-shards.py --build-docs dist/tags
+    python3 scripts/spec-shards.py --bundle dist/openapi.bundled.yaml
+"""
+
+import argparse
+import io
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+import spec_engine
+import spec_shards
+
+DEFAULT_DIR = spec_engine.OPENAPI_FILE.parent / 'dist' / 'shards'
+
+
+def _text(data):
+    buffer = io.StringIO()
+    yaml.dump(data, buffer, Dumper=spec_engine.SpecDumper, **spec_engine.DUMP_OPTIONS)
+    return buffer.getvalue()
+
+
+def _build_docs(directory, output, slugs):
+    """Rigenera le pagine HTML degli shard indicati; restituisce gli shard falliti."""
+    npx = shutil.which('npx')
+    if npx is None:
+        raise OSError('npx non trovato: installa Node.js per usare --build-docs')
+    output.mkdir(parents=True, exist_ok=True)
+    failed = []
+    for slug in slugs:
+        source = directory / spec_shards.shard_file(slug)
+        page = output / f'{slug}.html'
+        print(f"📄 {source.name} -> {page}")
+        result = subprocess.run([npx, '--no-install', 'redocly', 'build-docs', str(source), '--output', str(page)])
+        if result.returncode != 0:
+            failed.append(slug)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shard per tag della specifica OpenAPI')
+    parser.add_argument('--input', type=Path, default=spec_engine.OPENAPI_FILE, help='Specifica da suddividere')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_DIR, help='Cartella degli shard')
+    parser.add_argument('--force', action='store_true', help='Riscrive tutti gli shard')
+    parser.add_argument('--verify', action='store_true',
+                        help="Verifica che la ricomposizione degli shard sia identica all'originale")
+    parser.add_argument('--bundle', type=Path, metavar='OUTPUT',
+                        help='Ricompone la specifica dagli shard esistenti e la scrive in OUTPUT')
+    parser.add_argument('--build-docs', type=Path, metavar='DIR',
+                        help='Rigenera con redocly le pagine HTML degli shard riscritti')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.bundle:
+            spec_engine.dump_spec(spec_shards.load_bundle(args.output_dir), args.bundle)
+            print(f"✅ Specifica ricomposta in {args.bundle}")
+            return 0
+
+        start = time.perf_counter()
+        report = spec_shards.write_shards(args.input, args.output_dir, force=args.force)
+        report['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        if args.verify:
+            original = spec_engine.load_spec(args.input)
+            bundled = spec_shards.load_bundle(args.output_dir)
+            report['verified'] = bundled == original and _text(bundled) == _text(original)
+
+        if args.build_docs:
+            pages = [
+                slug for slug in report['written'] + report['unchanged']
+                if slug in report['written'] or not (args.build_docs / f'{slug}.html').exists()
+            ]
+            report['docs_built'] = pages
+            report['docs_failed'] = _build_docs(args.output_dir, args.build_docs, pages)
+            for slug in report['removed']:
+                (args.build_docs / f'{slug}.html').unlink(missing_ok=True)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    else:
+        total = len(report['written']) + len(report['unchanged'])
+        print(f"🧩 {total} shard in {args.output_dir} ({report['elapsed_ms']} ms)")
+        print(f"📝 Riscritti: {len(report['written'])} {', '.join(report['written'])}".rstrip())
+        print(f"✅ Invariati: {len(report['unchanged'])}")
+        if report['removed']:
+            print(f"🗑️  Rimossi: {', '.join(report['removed'])}")
+        print(f"📦 components.yaml: {report['components']}")
+        if 'verified' in report:
+            print("✅ Ricomposizione identica all'originale" if report['verified']
+                  else "❌ La ricomposizione differisce dall'originale")
+        if 'docs_built' in report:
+            print(f"📚 Pagine rigenerate: {len(report['docs_built']) - len(report['docs_failed'])}")
+            for slug in report['docs_failed']:
+                print(f"❌ Build fallita: {slug}")
+
+    if report.get('verified') is False or report.get('docs_failed'):
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
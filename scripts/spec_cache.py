@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Cache su disco dei documenti YAML già parsati, condivisa da tutti gli script di `scripts/`.
+
+Il documento parsato viene salvato in formato pickle con chiave lo SHA-256 dei byte
+del file YAML, del loader usato e della versione di PyYAML: se il file non è cambiato,
+il parsing YAML viene saltato del tutto.
+Lo store ha una dimensione massima e sfratta per primi gli elementi usati meno di recente (LRU).
+
+Caricare un pickle può eseguire codice arbitrario: la directory viene creata con
+permessi 0700 e la cache viene ignorata (con un avviso) se la directory appartiene a
+un altro utente o è scrivibile da gruppo o altri; si leggono solo entry dell'utente corrente.
+
+Variabili d'ambiente:
+- SPEC_CACHE_DIR: directory della cache (default: `.cache/spec` nella root del repository)
+- SPEC_CACHE_MAX_MB: dimensione massima dello store in MB (default: 256)
+- SPEC_CACHE_DISABLE: se impostata a `1`, ogni file viene sempre riparsato
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+# Da incrementare se cambia il formato delle entry o il modo in cui vengono parsate
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'spec'
+DEFAULT_MAX_MB = 256
+
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Sentinella restituita da `SpecCache.get` in assenza di entry (None è un valore valido)
+MISS = object()
+
+
+class SpecCache:
+    """Store chiave-valore (SHA-256 -> oggetto parsato) su disco con sfratto LRU."""
+
+    def __init__(self, directory=None, max_bytes=None, enabled=True):
+        self.directory = Path(directory or os.environ.get('SPEC_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('SPEC_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # Stima della dimensione dello store: la directory viene riscandita solo quando supera il limite
+        self._size_estimate = None
+        # None finché la directory non è stata controllata (vedi `_private`)
+        self._trusted = None
+
+    def _entry(self, digest):
+        return self.directory / f'v{CACHE_VERSION}-{digest}.pickle'
+
+    def _private(self):
+        """Vero se la directory è dell'utente corrente e non è accessibile ad altri (la crea con 0700)."""
+        if self._trusted is None:
+            self._trusted = self._check_directory()
+        return self._trusted
+
+    def _check_directory(self):
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            st = self.directory.stat()
+        except OSError:
+            return False
+        if not hasattr(os, 'getuid'):
+            return True
+        if st.st_uid != os.getuid() or st.st_mode & 0o022:
+            print(f"⚠️  Cache {self.directory} ignorata: la directory non è privata dell'utente corrente",
+                  file=sys.stderr)
+            return False
+        if st.st_mode & 0o077:
+            try:
+                os.chmod(self.directory, 0o700)
+            except OSError:
+                return False
+        return True
+
+    def get(self, digest):
+        """Restituisce l'oggetto in cache per `digest`, oppure `MISS`."""
+        if not self._private():
+            return MISS
+        entry = self._entry(digest)
+        try:
+            with open(entry, 'rb') as f:
+                if hasattr(os, 'getuid') and os.fstat(f.fileno()).st_uid != os.getuid():
+                    return MISS
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return MISS
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            # Entry corrotta o troncata: scartala e riparsa
+            entry.unlink(missing_ok=True)
+            return MISS
+        # Il mtime è il timestamp di ultimo utilizzo usato dallo sfratto LRU
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return value
+
+    def put(self, digest, value):
+        """Salva `value` in modo atomico e riporta lo store entro `max_bytes`."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes or not self._private():
+            return
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_name, self._entry(digest))
+        except OSError:
+            # Una cache non scrivibile (es. filesystem read-only in CI) non deve bloccare gli script
+            return
+        if self._size_estimate is None:
+            self.evict()
+        else:
+            self._size_estimate += len(payload)
+            if self._size_estimate > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Rimuove le entry usate meno di recente finché lo store supera `max_bytes`."""
+        entries = []
+        total = 0
+        for entry in self.directory.glob('*.pickle'):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        self._size_estimate = total
+
+    def load_yaml_bytes(self, raw, loader=YamlLoader, digest=None):
+        """Parsa `raw` come YAML, passando dalla cache se il contenuto è già noto."""
+        if not self.enabled:
+            return yaml.load(raw, Loader=loader)
+
+        key = yaml_key(digest or digest_of(raw), loader)
+        value = self.get(key)
+        if value is not MISS:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = yaml.load(raw, Loader=loader)
+        self.put(key, value)
+        return value
+
+    def load_yaml(self, path, loader=YamlLoader):
+        """Parsa il file `path` come YAML, passando dalla cache se il contenuto non è cambiato."""
+        return self.load_yaml_bytes(Path(path).read_bytes(), loader=loader)
+
+
+def digest_of(raw):
+    """Digest di un documento: SHA-256 esadecimale dei suoi byte."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def yaml_key(digest, loader=YamlLoader):
+    """Chiave di cache del documento parsato: digest dei byte, loader e versione di PyYAML."""
+    loader_name = f'{loader.__module__}.{loader.__qualname__}'
+    return digest_of(f'{digest}\0{loader_name}\0pyyaml-{yaml.__version__}'.encode())
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Cache condivisa del processo, configurata dalle variabili d'ambiente."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SpecCache(enabled=os.environ.get('SPEC_CACHE_DISABLE') != '1')
+    return _default_cache
+
+
+def load_yaml(path, loader=YamlLoader):
+    return default_cache().load_yaml(path, loader=loader)
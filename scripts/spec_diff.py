@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Diff strutturale tra due versioni della specifica OpenAPI, basato su alberi di Merkle.
+
+Ogni sottoalbero del documento (path, operazione, schema, fino alle foglie) riceve un
+hash calcolato dagli hash dei figli: due sottoalberi con lo stesso hash sono
+identici, quindi il confronto scende solo nei rami cambiati e il costo è
+proporzionale alle differenze. L'ordine delle chiavi non conta, quello degli
+elementi delle liste sì.
+
+Gli alberi sono salvati nella cache di `spec_cache` con chiave lo SHA-256 del file:
+per una versione già vista non servono né il parsing né l'hashing.
+
+Il risultato riporta endpoint (`METODO /path`), schemi, altri componenti e sezioni
+di primo livello aggiunti, rimossi e modificati, con i puntatori JSON delle modifiche.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import spec_cache
+
+# Da incrementare se cambia il modo in cui si calcolano gli hash
+MERKLE_VERSION = 1
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+# Puntatori riportati al massimo per ogni elemento modificato
+MAX_CHANGES = 20
+
+
+def _hash(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class Node:
+    """Nodo dell'albero: hash del sottoalbero e figli (dict o lista di `Node`, None per le foglie)."""
+
+    __slots__ = ('hash', 'children')
+
+    def __init__(self, digest, children=None):
+        self.hash = digest
+        self.children = children
+
+    def __getstate__(self):
+        return (self.hash, self.children)
+
+    def __setstate__(self, state):
+        self.hash, self.children = state
+
+
+def build(value):
+    """Albero di Merkle di un documento già caricato."""
+    if isinstance(value, dict):
+        children = {str(k): build(v) for k, v in value.items()}
+        parts = [b'd']
+        for key in sorted(children):
+            parts.append(_hash(key.encode('utf-8')))
+            parts.append(children[key].hash)
+        return Node(_hash(b''.join(parts)), children)
+    if isinstance(value, list):
+        children = [build(v) for v in value]
+        return Node(_hash(b'l' + b''.join(c.hash for c in children)), children)
+    # Il tipo fa parte dell'hash: 1, 1.0, '1' e True sono valori diversi
+    leaf = f'{type(value).__name__}:{json.dumps(value, sort_keys=True, default=str)}'
+    return Node(_hash(leaf.encode('utf-8')))
+
+
+def _load(raw, path):
+    if Path(path).suffix == '.json' or raw.lstrip()[:1] == b'{':
+        return json.loads(raw)
+    return spec_cache.default_cache().load_yaml_bytes(raw)
+
+
+def load_tree(path, cache=None):
+    """Albero di Merkle di un file (YAML o JSON), dalla cache se il contenuto è già noto."""
+    cache = cache if cache is not None else spec_cache.default_cache()
+    raw = Path(path).read_bytes()
+    key = spec_cache.digest_of(raw + f'\0merkle-v{MERKLE_VERSION}'.encode())
+    if cache.enabled:
+        tree = cache.get(key)
+        if tree is not spec_cache.MISS:
+            return tree
+    tree = build(_load(raw, path))
+    if cache.enabled:
+        cache.put(key, tree)
+    return tree
+
+
+def _escape(token):
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def changed_pointers(old, new, prefix='', out=None, limit=MAX_CHANGES):
+    """[(tipo, puntatore)] delle differenze tra due sottoalberi; si ferma dopo `limit` voci."""
+    out = [] if out is None else out
+    if old.hash == new.hash or len(out) >= limit:
+        return out
+    if isinstance(old.children, dict) and isinstance(new.children, dict):
+        for key in sorted(old.children.keys() | new.children.keys()):
+            if len(out) >= limit:
+                break
+            pointer = f'{prefix}/{_escape(key)}'
+            if key not in new.children:
+                out.append(('removed', pointer))
+            elif key not in old.children:
+                out.append(('added', pointer))
+            else:
+                changed_pointers(old.children[key], new.children[key], pointer, out, limit)
+    elif isinstance(old.children, list) and isinstance(new.children, list) and len(old.children) == len(new.children):
+        for i, (a, b) in enumerate(zip(old.children, new.children)):
+            if len(out) >= limit:
+                break
+            changed_pointers(a, b, f'{prefix}/{i}', out, limit)
+    else:
+        out.append(('changed', prefix or '/'))
+    return out
+
+
+def _child(node, key):
+    if node is None or not isinstance(node.children, dict):
+        return None
+    return node.children.get(key)
+
+
+def _compare_maps(old, new, naming=str):
+    """Confronta i figli di due mappe: {added, removed, changed} con i puntatori delle modifiche."""
+    result = {'added': [], 'removed': [], 'changed': []}
+    old_children = old.children if old is not None and isinstance(old.children, dict) else {}
+    new_children = new.children if new is not None and isinstance(new.children, dict) else {}
+    if old is not None and new is not None and old.hash == new.hash:
+        return result
+    for key in sorted(old_children.keys() | new_children.keys()):
+        a, b = old_children.get(key), new_children.get(key)
+        if a is None:
+            result['added'].append(naming(key))
+        elif b is None:
+            result['removed'].append(naming(key))
+        elif a.hash != b.hash:
+            changes = sorted(changed_pointers(a, b), key=lambda change: change[1])
+            result['changed'].append({
+                'name': naming(key),
+                'changes': [{'op': op, 'pointer': pointer} for op, pointer in changes],
+            })
+    return result
+
+
+def diff(old, new):
+    """Differenze strutturali tra due alberi di specifica."""
+    result = {
+        'identical': old.hash == new.hash,
+        'endpoints': {'added': [], 'removed': [], 'changed': []},
+        'path_level': [],
+        'schemas': {'added': [], 'removed': [], 'changed': []},
+        'components': {},
+        'other': [],
+    }
+    if result['identical']:
+        return result
+
+    old_paths, new_paths = _child(old, 'paths'), _child(new, 'paths')
+    if old_paths is None or new_paths is None or old_paths.hash != new_paths.hash:
+        old_items = old_paths.children if old_paths is not None and isinstance(old_paths.children, dict) else {}
+        new_items = new_paths.children if new_paths is not None and isinstance(new_paths.children, dict) else {}
+        endpoints = result['endpoints']
+        for path in sorted(old_items.keys() | new_items.keys()):
+            a, b = old_items.get(path), new_items.get(path)
+            if a is not None and b is not None and a.hash == b.hash:
+                continue
+            methods = _compare_maps(
+                _only(a, HTTP_METHODS), _only(b, HTTP_METHODS), naming=lambda m, p=path: f'{m.upper()} {p}',
+            )
+            for key in ('added', 'removed', 'changed'):
+                endpoints[key].extend(methods[key])
+            # Chiavi a livello di path (parameters, servers, summary...) condivise dalle operazioni
+            shared = sorted(
+                changed_pointers(_without(a, HTTP_METHODS), _without(b, HTTP_METHODS), f'/paths/{_escape(path)}'),
+                key=lambda change: change[1],
+            )
+            if shared and a is not None and b is not None:
+                result['path_level'].append({
+                    'path': path,
+                    'changes': [{'op': op, 'pointer': pointer} for op, pointer in shared],
+                })
+
+    old_components, new_components = _child(old, 'components'), _child(new, 'components')
+    kinds = set()
+    for node in (old_components, new_components):
+        if node is not None and isinstance(node.children, dict):
+            kinds.update(node.children)
+    for kind in sorted(kinds):
+        compared = _compare_maps(_child(old_components, kind), _child(new_components, kind))
+        if kind == 'schemas':
+            result['schemas'] = compared
+        elif any(compared.values()):
+            result['components'][kind] = compared
+
+    top = set()
+    for node in (old, new):
+        if isinstance(node.children, dict):
+            top.update(node.children)
+    for key in sorted(top - {'paths', 'components'}):
+        a, b = _child(old, key), _child(new, key)
+        if a is None or b is None or a.hash != b.hash:
+            result['other'].append(key)
+    return result
+
+
+def _select(node, keep):
+    """Nodo con i soli figli per cui `keep(chiave)` è vero (hash ricalcolato)."""
+    if node is None or not isinstance(node.children, dict):
+        return Node(_hash(b'd'), {})
+    children = {k: v for k, v in node.children.items() if keep(k)}
+    parts = [b'd']
+    for key in sorted(children):
+        parts.append(_hash(key.encode('utf-8')))
+        parts.append(children[key].hash)
+    return Node(_hash(b''.join(parts)), children)
+
+
+def _only(node, keys):
+    return _select(node, lambda k: k in keys)
+
+
+def _without(node, keys):
+    return _select(node, lambda k: k not in keys)
+
+
+def summary(result):
+    """Conteggi per sezione, per messaggi brevi e gate."""
+    counts = {
+        f'{section}_{key}': len(result[section][key])
+        for section in ('endpoints', 'schemas')
+        for key in ('added', 'removed', 'changed')
+    }
+    counts['path_level'] = len(result['path_level'])
+    counts['components'] = sum(len(v) for c in result['components'].values() for v in c.values())
+    counts['other'] = len(result['other'])
+    return counts
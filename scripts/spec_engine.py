@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Motore di trasformazione a passata singola per la specifica OpenAPI.
+
+Carica `openapi.yaml` una sola volta, esegue in memoria una lista ordinata di passate
+registrate (rimozione legacy, descrizioni personalizzate, default per path e metodo,
+parametri e responses) e salva il risultato una sola volta.
+Usa il loader/dumper C di libyaml quando disponibile.
+"""
+
+import importlib.util
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+import instrumentation
+import spec_cache
+import spec_writer
+
+SCRIPTS_DIR = Path(__file__).parent
+OPENAPI_FILE = SCRIPTS_DIR.parent / 'openapi.yaml'
+
+HTTP_METHODS = ('get', 'post', 'put', 'delete', 'patch')
+
+# libyaml è molto più veloce del loader/dumper puro Python: usalo se installato
+SpecLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SpecDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+DUMP_OPTIONS = {
+    'default_flow_style': False,
+    'allow_unicode': True,
+    'sort_keys': False,
+    'width': 120,
+}
+
+# Registro ordinato delle passate: nome -> funzione(ctx) che restituisce il numero di modifiche
+PASSES = {}
+# Nome passata -> contatore di `instrumentation` in cui sommare le sue modifiche
+PASS_COUNTERS = {}
+
+
+def register_pass(name, counter=None):
+    """Registra una passata; l'ordine di registrazione è l'ordine di esecuzione."""
+    def decorator(func):
+        PASSES[name] = func
+        if counter:
+            PASS_COUNTERS[name] = counter
+        return func
+    return decorator
+
+
+_script_modules = {}
+
+
+def load_script(filename):
+    """Importa uno script di `scripts/` con nome non importabile (es. `auto-enrich-endpoints.py`)."""
+    if filename not in _script_modules:
+        module_name = filename[:-3].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / filename)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _script_modules[filename] = module
+    return _script_modules[filename]
+
+
+def read_spec(path=OPENAPI_FILE):
+    """
+    Legge la specifica: (byte, digest, documento), con il documento dalla cache dei
+    documenti parsati (vedi `spec_cache`). Byte e digest servono al writer incrementale.
+    """
+    raw = Path(path).read_bytes()
+    digest = spec_cache.digest_of(raw)
+    return raw, digest, spec_cache.default_cache().load_yaml_bytes(raw, loader=SpecLoader, digest=digest)
+
+
+def load_spec(path=OPENAPI_FILE):
+    """Carica la specifica passando dalla cache dei documenti parsati (vedi `spec_cache`)."""
+    return read_spec(path)[2]
+
+
+def dump_spec(data, path=OPENAPI_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(data, f, Dumper=SpecDumper, **DUMP_OPTIONS)
+
+
+class SpecContext:
+    """Stato condiviso tra le passate durante una singola esecuzione del motore."""
+
+    def __init__(self, data):
+        self.data = data
+        self._targets = None
+        # (path, method) -> snapshot dell'operazione prima della prima modifica
+        self._snapshots = {}
+        self.removed_paths = set()
+
+    @property
+    def paths(self):
+        return self.data.setdefault('paths', {})
+
+    def operations(self):
+        """Itera le operazioni (path, method, operation) che hanno un operationId."""
+        for path, path_item in self.paths.items():
+            for method, operation in path_item.items():
+                if method in HTTP_METHODS and 'operationId' in operation:
+                    yield path, method, operation
+
+    def touch(self, path, method, operation):
+        """Da chiamare prima di modificare un'operazione: ne salva lo stato per il writer incrementale."""
+        key = (path, method)
+        if key not in self._snapshots:
+            self._snapshots[key] = pickle.dumps(operation, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @property
+    def processed(self):
+        """Numero di operazioni su cui ha lavorato almeno una passata."""
+        return len(self._snapshots)
+
+    def changed_operations(self):
+        """Operazioni toccate il cui contenuto è effettivamente cambiato."""
+        changed = []
+        for (path, method), snapshot in self._snapshots.items():
+            operation = self.paths.get(path, {}).get(method)
+            if operation is None or pickle.dumps(operation, protocol=pickle.HIGHEST_PROTOCOL) != snapshot:
+                changed.append((path, method))
+        return changed
+
+    def enrich_targets(self):
+        """
+        Operazioni prive di summary o description, da arricchire con i default.
+
+        Calcolate alla prima richiesta e poi condivise: le passate successive
+        (parametri, responses) lavorano sullo stesso insieme anche dopo che la
+        passata dei default ha riempito summary e description.
+        """
+        if self._targets is None:
+            self._targets = [
+                (path, method, operation)
+                for path, method, operation in self.operations()
+                if 'summary' not in operation or 'description' not in operation
+            ]
+        return self._targets
+
+
+@register_pass('remove_legacy', counter='legacyPathsRemoved')
+def remove_legacy_pass(ctx):
+    remove_legacy_paths = load_script('remove-legacy-endpoints.py').remove_legacy_paths
+    removed = remove_legacy_paths(ctx.paths)
+    ctx.removed_paths.update(removed)
+    return len(removed)
+
+
+@register_pass('endpoint_descriptions', counter='operationsDescribed')
+def endpoint_descriptions_pass(ctx):
+    enrich_endpoint = load_script('enrich-endpoints.py').enrich_endpoint
+    count = 0
+    for path, method, operation in ctx.operations():
+        # Arricchisci solo se manca summary o description
+        if 'summary' not in operation or 'description' not in operation:
+            ctx.touch(path, method, operation)
+            enrich_endpoint(path, method, operation)
+            count += 1
+    return count
+
+
+@register_pass('endpoint_info', counter='operationsEnriched')
+def endpoint_info_pass(ctx):
+    get_endpoint_info = load_script('auto-enrich-endpoints.py').get_endpoint_info
+    targets = ctx.enrich_targets()
+    for path, method, operation in targets:
+        ctx.touch(path, method, operation)
+        info = get_endpoint_info(path, method)
+        if 'summary' not in operation:
+            operation['summary'] = info['summary']
+        if 'description' not in operation:
+            operation['description'] = info['description']
+        if 'tags' not in operation:
+            operation['tags'] = info['tags']
+    return len(targets)
+
+
+@register_pass('parameters', counter='parametersEnriched')
+def parameters_pass(ctx):
+    enrich_parameter = load_script('auto-enrich-endpoints.py').enrich_parameter
+    count = 0
+    for path, method, operation in ctx.enrich_targets():
+        if 'parameters' in operation:
+            ctx.touch(path, method, operation)
+            operation['parameters'] = [enrich_parameter(p) for p in operation['parameters']]
+            count += 1
+    return count
+
+
+@register_pass('responses', counter='responsesEnriched')
+def responses_pass(ctx):
+    enrich_responses = load_script('auto-enrich-endpoints.py').enrich_responses
+    targets = ctx.enrich_targets()
+    for path, method, operation in targets:
+        ctx.touch(path, method, operation)
+        enrich_responses(operation, method)
+    return len(targets)
+
+
+def resolve_passes(names=None):
+    """Valida i nomi delle passate (tutte, se `names` è None) prima di toccare la specifica."""
+    names = list(PASSES) if names is None else list(names)
+    unknown = [n for n in names if n not in PASSES]
+    if unknown:
+        raise ValueError(f"Passate sconosciute: {', '.join(unknown)} (disponibili: {', '.join(PASSES)})")
+    return names
+
+
+def run_passes(ctx, names=None):
+    """Esegue le passate richieste e restituisce [(nome, modifiche, secondi)]."""
+    timings = []
+    for name in resolve_passes(names):
+        start = time.perf_counter()
+        with instrumentation.phase(f'pass.{name}'):
+            changes = PASSES[name](ctx)
+        timings.append((name, changes, time.perf_counter() - start))
+        if name in PASS_COUNTERS:
+            instrumentation.count(PASS_COUNTERS[name], changes)
+    return timings
+
+
+def run(names=None, input_file=OPENAPI_FILE, output_file=None, incremental=True):
+    """
+    Carica la specifica una volta, esegue le passate e salva una volta sola.
+
+    Con `incremental` il salvataggio riscrive solo le operazioni modificate
+    (vedi `spec_writer`); altrimenti riserializza l'intero documento.
+    """
+    names = resolve_passes(names)
+    output_file = output_file or input_file
+
+    print(f"📖 Leggendo {input_file}...")
+    start = time.perf_counter()
+    with instrumentation.phase('load'):
+        raw, digest, data = read_spec(input_file)
+    load_time = time.perf_counter() - start
+    cache = spec_cache.default_cache()
+    load_label = 'load (cache)' if cache.hits else 'load'
+    instrumentation.count('cacheHits', cache.hits)
+
+    ctx = SpecContext(data)
+    print(f"🔍 Trovati {len(ctx.paths)} path...")
+    instrumentation.count('pathsSeen', len(ctx.paths))
+
+    timings = run_passes(ctx, names)
+    instrumentation.count('recordsProcessed', ctx.processed)
+
+    print(f"💾 Salvando in {output_file}...")
+    start = time.perf_counter()
+    with instrumentation.phase('dump'):
+        if incremental:
+            changed = ctx.changed_operations()
+            instrumentation.count('operationsWritten', len(changed))
+            mode, blocks = spec_writer.write_spec(
+                data, output_file, raw.decode('utf-8'), digest,
+                changed, ctx.removed_paths, DUMP_OPTIONS, SpecDumper,
+            )
+        else:
+            dump_spec(data, output_file)
+            mode, blocks = 'full', None
+    dump_time = time.perf_counter() - start
+    dump_label = f'dump (splice, {blocks} blocchi)' if mode == 'splice' else 'dump'
+
+    print("⏱  Tempi per passata:")
+    print(f"   {load_label:<24}{'':>8}  {load_time * 1000:9.1f} ms")
+    for name, changes, seconds in timings:
+        print(f"   {name:<24}{changes:>8}  {seconds * 1000:9.1f} ms")
+    print(f"   {dump_label:<32}  {dump_time * 1000:9.1f} ms")
+    if SpecLoader is yaml.SafeLoader:
+        print("⚠️  libyaml non disponibile: uso il loader/dumper puro Python", file=sys.stderr)
+
+    print("✅ Completato!")
+    return timings
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Download condizionale e concorrente delle specifiche OpenAPI.
+
+Ogni target (ambiente prod, staging, plugin...) ha un URL e un file YAML di
+destinazione. Le richieste partono in parallelo su un pool di connessioni HTTP/1.1
+keep-alive (asyncio, solo libreria standard) e sono condizionali: con `ETag` e
+`Last-Modified` salvati dal download precedente si inviano `If-None-Match` e
+`If-Modified-Since`, e un `304` chiude il lavoro senza trasferire il corpo.
+
+Il corpo viene scritto su disco a blocchi mentre se ne calcola lo SHA-256, senza
+tenerlo in memoria; la conversione JSON -> YAML avviene solo se l'hash è cambiato
+rispetto all'ultima conversione. Lo stato (ETag, Last-Modified, hash) è in
+`.cache/spec-fetch.json`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import ssl
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import yaml
+
+ROOT_DIR = Path(__file__).parent.parent
+DEFAULT_STATE_FILE = ROOT_DIR / '.cache' / 'spec-fetch.json'
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+USER_AGENT = 'webrobot-spec-fetch/1'
+
+SpecDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+# Stesse opzioni della vecchia conversione inline di update-openapi.sh
+YAML_OPTIONS = {'default_flow_style': False, 'allow_unicode': True, 'sort_keys': False}
+
+
+class FetchError(Exception):
+    pass
+
+
+# --- Client HTTP ---------------------------------------------------------------
+
+class Response:
+    """Risposta HTTP con corpo da leggere a blocchi tramite `iter_body()`."""
+
+    def __init__(self, status, headers, reader, pool, key, writer, has_body):
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        self._pool = pool
+        self._key = key
+        self._has_body = has_body
+        self._done = False
+
+    async def iter_body(self):
+        try:
+            if self._has_body:
+                length = self.headers.get('content-length')
+                if 'chunked' in self.headers.get('transfer-encoding', '').lower():
+                    async for chunk in self._chunked():
+                        yield chunk
+                elif length is not None:
+                    remaining = int(length)
+                    while remaining:
+                        chunk = await self._reader.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            raise FetchError('connessione chiusa prima della fine del corpo')
+                        remaining -= len(chunk)
+                        yield chunk
+                else:
+                    # Né lunghezza né chunked: il corpo finisce con la connessione
+                    self.headers['connection'] = 'close'
+                    while True:
+                        chunk = await self._reader.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+            self._done = True
+        finally:
+            self.release()
+
+    async def _chunked(self):
+        while True:
+            line = await self._reader.readline()
+            size = int(line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailer opzionali fino alla riga vuota
+                while (await self._reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return
+            remaining = size
+            while remaining:
+                chunk = await self._reader.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise FetchError('connessione chiusa dentro un chunk')
+                remaining -= len(chunk)
+                yield chunk
+            await self._reader.readexactly(2)
+
+    async def discard(self):
+        async for _ in self.iter_body():
+            pass
+
+    def release(self):
+        """Restituisce la connessione al pool se riutilizzabile, altrimenti la chiude."""
+        if self._writer is None:
+            return
+        reusable = self._done and self.headers.get('connection', '').lower() != 'close'
+        self._pool._release(self._key, self._reader, self._writer, reusable)
+        self._writer = None
+
+
+class ConnectionPool:
+    """Pool di connessioni keep-alive per host, con un limite di connessioni concorrenti per host."""
+
+    def __init__(self, max_per_host=4, timeout=30.0, ssl_context=None):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle = {}
+        self._limits = {}
+        self.opened = 0
+        self.reused = 0
+
+    def _limit(self, key):
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.max_per_host)
+        return self._limits[key]
+
+    async def _connect(self, key):
+        idle = self._idle.get(key) or []
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer
+            writer.close()
+        scheme, host, port = key
+        self.opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self.ssl_context if scheme == 'https' else None),
+            self.timeout,
+        )
+
+    def _release(self, key, reader, writer, reusable):
+        if reusable and not writer.is_closing():
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        self._limit(key).release()
+
+    async def request(self, method, url, headers=None, body=None):
+        """Invia una richiesta; chi la riceve deve consumare (`iter_body`/`discard`) la risposta."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise FetchError(f'schema non supportato: {url}')
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        host = parts.hostname if parts.port is None else f'{parts.hostname}:{parts.port}'
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {host}', f'User-Agent: {USER_AGENT}',
+                 'Accept-Encoding: identity', 'Connection: keep-alive']
+        lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b'')
+
+        await self._limit(key).acquire()
+        writer = None
+        try:
+            # Una connessione riusata può essere stata chiusa dal server: un solo nuovo tentativo
+            for attempt in range(2):
+                reader, writer = await self._connect(key)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not status_line:
+                        raise ConnectionResetError('connessione chiusa dal server')
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    writer = None
+                    if attempt:
+                        raise
+            status = int(status_line.split()[1])
+            response_headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                response_headers[name.strip().lower()] = value.strip()
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            self._limit(key).release()
+            raise
+        has_body = method != 'HEAD' and status not in (204, 304) and not 100 <= status < 200
+        return Response(status, response_headers, reader, self, key, writer, has_body)
+
+    async def close(self):
+        writers = [writer for connections in self._idle.values() for _, writer in connections]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*(w.wait_closed() for w in writers), return_exceptions=True)
+
+
+# --- Fetch ---------------------------------------------------------------------
+
+class Target:
+    def __init__(self, name, url, output):
+        self.name = name
+        self.url = url
+        self.output = Path(output)
+
+
+def load_state(path=DEFAULT_STATE_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state, path=DEFAULT_STATE_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def convert_json_to_yaml(json_path, output):
+    """Converte il JSON scaricato nel file YAML di destinazione (scrittura atomica)."""
+    with open(json_path, 'rb') as f:
+        data = json.load(f)
+    if data is None:
+        raise FetchError('la specifica scaricata è null')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        yaml.dump(data, f, Dumper=SpecDumper, **YAML_OPTIONS)
+    os.replace(tmp, output)
+
+
+async def fetch_target(pool, target, state, force=False):
+    """
+    Scarica un target e restituisce un dizionario di esito:
+    `not_modified` (304), `unchanged` (stesso hash) o `updated` (YAML riscritto).
+    """
+    entry = state.get(target.name, {})
+    same_url = entry.get('url') == target.url
+    headers = {'Accept': 'application/json'}
+    if not force and same_url and target.output.exists():
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    start = time.perf_counter()
+    url = target.url
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await pool.request('GET', url, headers)
+        if response.status in (301, 302, 303, 307, 308) and 'location' in response.headers:
+            await response.discard()
+            url = urljoin(url, response.headers['location'])
+            continue
+        break
+    else:
+        raise FetchError(f'{target.name}: troppi redirect')
+
+    result = {'target': target.name, 'url': target.url, 'status': response.status, 'bytes': 0}
+    if response.status == 304:
+        await response.discard()
+        result['result'] = 'not_modified'
+    elif response.status != 200:
+        await response.discard()
+        raise FetchError(f'{target.name}: HTTP {response.status} da {url}')
+    else:
+        digest = hashlib.sha256()
+        target.output.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.output.parent, suffix='.json.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in response.iter_body():
+                    digest.update(chunk)
+                    f.write(chunk)
+                    result['bytes'] += len(chunk)
+            sha = digest.hexdigest()
+            if not force and same_url and sha == entry.get('sha256') and target.output.exists():
+                result['result'] = 'unchanged'
+            else:
+                # json.load + yaml.dump sono CPU-bound: fuori dall'event loop
+                await asyncio.get_running_loop().run_in_executor(None, convert_json_to_yaml, tmp, target.output)
+                result['result'] = 'updated'
+            entry = {'url': target.url, 'sha256': sha}
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        for header, key in (('etag', 'etag'), ('last-modified', 'last_modified')):
+            if header in response.headers:
+                entry[key] = response.headers[header]
+        state[target.name] = entry
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    result['output'] = str(target.output)
+    return result
+
+
+async def fetch_all(targets, state, max_per_host=4, timeout=30.0, force=False, ssl_context=None):
+    """Scarica tutti i target in parallelo su un pool condiviso; gli errori sono riportati per target."""
+    pool = ConnectionPool(max_per_host=max_per_host, timeout=timeout, ssl_context=ssl_context)
+    try:
+        results = await asyncio.gather(
+            *(fetch_target(pool, t, state, force) for t in targets), return_exceptions=True,
+        )
+    finally:
+        await pool.close()
+    report = []
+    for target, result in zip(targets, results):
+        if isinstance(result, BaseException):
+            report.append({'target': target.name, 'url': target.url, 'result': 'error', 'error': str(result)})
+        else:
+            report.append(result)
+    return report, {'opened': pool.opened, 'reused': pool.reused}
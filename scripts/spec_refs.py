@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Grafo delle dipendenze `$ref` della specifica OpenAPI.
+
+Il grafo si costruisce una volta sola: ogni operazione e ogni componente
+(`#/components/<tipo>/<nome>`) è un nodo, ogni `$ref` un arco. Le risoluzioni dei
+puntatori e le chiusure transitive sono memoizzate, e l'indice inverso
+componente -> operazioni è precalcolato, quindi "quali operazioni dipendono dallo
+schema X" è un lookup O(1).
+
+Servizi offerti:
+- `dependents(ref)` / `dependencies(nodo)`: chi usa un componente e cosa usa un nodo
+- `cycles()`: componenti mutuamente ricorsivi (Tarjan)
+- `unreachable()` / `prune()`: componenti non raggiungibili dalle operazioni
+- `dangling()`: `$ref` che non puntano a nulla
+
+Gli schemi di sicurezza sono referenziati per nome (`security`), non con `$ref`:
+quelli nominati contano come raggiungibili.
+"""
+
+COMPONENT_PREFIX = '#/components/'
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+
+
+def operation_node(path, method):
+    return f'{method.upper()} {path}'
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _escape(token):
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def _collect_refs(value, refs, security=None):
+    """Aggiunge a `refs` i `$ref` contenuti in `value` (e a `security` i nomi degli schemi di sicurezza)."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, str):
+                refs.add(ref)
+            for key, child in node.items():
+                if key == 'security' and security is not None and isinstance(child, list):
+                    for requirement in child:
+                        if isinstance(requirement, dict):
+                            security.update(requirement)
+                elif key != '$ref' and isinstance(child, (dict, list)):
+                    stack.append(child)
+        elif isinstance(node, list):
+            stack.extend(c for c in node if isinstance(c, (dict, list)))
+
+
+class RefGraph:
+    """Grafo dei `$ref` di un documento OpenAPI già caricato."""
+
+    def __init__(self, data):
+        self.data = data
+        self._resolved = {}
+        self._closure = {}
+        # nodo -> $ref diretti
+        self.edges = {}
+        # nodi radice (operazioni e parti del documento fuori da components)
+        self.roots = []
+        self.security_names = set()
+
+        components = data.get('components') or {}
+        for kind, entries in components.items():
+            if not isinstance(entries, dict):
+                continue
+            for name, value in entries.items():
+                refs = set()
+                _collect_refs(value, refs)
+                self.edges[f'{COMPONENT_PREFIX}{kind}/{_escape(name)}'] = refs
+
+        for path, path_item in (data.get('paths') or {}).items():
+            if not isinstance(path_item, dict):
+                continue
+            # Parametri e altre chiavi a livello di path valgono per tutte le operazioni del path
+            shared = set()
+            _collect_refs({k: v for k, v in path_item.items() if k not in HTTP_METHODS}, shared, self.security_names)
+            for method, operation in path_item.items():
+                if method in HTTP_METHODS and isinstance(operation, dict):
+                    refs = set(shared)
+                    _collect_refs(operation, refs, self.security_names)
+                    node = operation_node(path, method)
+                    self.edges[node] = refs
+                    self.roots.append(node)
+
+        # Il resto del documento (security globale, webhooks, x-*...) è una radice unica
+        rest = {k: v for k, v in data.items() if k not in ('paths', 'components')}
+        refs = set()
+        _collect_refs(rest, refs, self.security_names)
+        self.edges['#'] = refs
+        self.roots.append('#')
+
+        self._dependents = self._build_dependents()
+
+    def resolve(self, ref):
+        """Valore puntato da un `$ref` locale (memoizzato); None se esterno o inesistente."""
+        if ref not in self._resolved:
+            value = None
+            if ref == '#':
+                value = self.data
+            elif ref.startswith('#/'):
+                value = self.data
+                for token in ref[2:].split('/'):
+                    token = _unescape(token)
+                    if isinstance(value, dict) and token in value:
+                        value = value[token]
+                    elif isinstance(value, list) and token.isdigit() and int(token) < len(value):
+                        value = value[int(token)]
+                    else:
+                        value = None
+                        break
+            self._resolved[ref] = value
+        return self._resolved[ref]
+
+    def _component_of(self, ref):
+        """Componente (`#/components/<tipo>/<nome>`) che contiene il bersaglio di un `$ref`."""
+        if not ref.startswith(COMPONENT_PREFIX):
+            return None
+        parts = ref[len(COMPONENT_PREFIX):].split('/')
+        if len(parts) < 2:
+            return None
+        node = f'{COMPONENT_PREFIX}{parts[0]}/{parts[1]}'
+        return node if node in self.edges else None
+
+    def dependencies(self, node):
+        """Componenti raggiunti (transitivamente) da un nodo, memoizzati per nodo."""
+        if node in self._closure:
+            return self._closure[node]
+        seen = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for ref in self.edges.get(current, ()):
+                target = self._component_of(ref)
+                if target is None or target in seen:
+                    continue
+                if target in self._closure:
+                    # Riusa le chiusure già calcolate
+                    seen.add(target)
+                    seen.update(self._closure[target])
+                    continue
+                seen.add(target)
+                stack.append(target)
+        self._closure[node] = frozenset(seen)
+        return self._closure[node]
+
+    def _build_dependents(self):
+        dependents = {}
+        for node in self.roots:
+            if node == '#':
+                continue
+            for component in self.dependencies(node):
+                dependents.setdefault(component, set()).add(node)
+        return dependents
+
+    def normalize(self, name):
+        """Accetta un puntatore completo, `schemas/Nome` o solo `Nome` (cercato tra gli schemi)."""
+        if name.startswith('#/'):
+            return name
+        if '/' in name:
+            return f'{COMPONENT_PREFIX}{name}'
+        return f'{COMPONENT_PREFIX}schemas/{_escape(name)}'
+
+    def dependents(self, name):
+        """Operazioni che dipendono (anche indirettamente) dal componente."""
+        return self._dependents.get(self.normalize(name), set())
+
+    def components(self):
+        return [n for n in self.edges if n.startswith(COMPONENT_PREFIX)]
+
+    def reachable(self):
+        reached = set()
+        for root in self.roots:
+            reached.update(self.dependencies(root))
+        for name in self.security_names:
+            node = f'{COMPONENT_PREFIX}securitySchemes/{_escape(name)}'
+            reached.add(node)
+            reached.update(self.dependencies(node))
+        return reached
+
+    def unreachable(self):
+        reached = self.reachable()
+        return [n for n in self.components() if n not in reached]
+
+    def dangling(self):
+        """[(nodo, $ref)] per i riferimenti locali che non si risolvono."""
+        return sorted(
+            (node, ref)
+            for node, refs in self.edges.items()
+            for ref in refs
+            if ref.startswith('#') and self.resolve(ref) is None
+        )
+
+    def cycles(self):
+        """Componenti fortemente connesse con più di un nodo o con un auto-riferimento (Tarjan iterativo)."""
+        graph = {}
+        for node in self.components():
+            targets = (self._component_of(ref) for ref in self.edges[node])
+            graph[node] = sorted({t for t in targets if t is not None})
+
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        result = []
+        counter = 0
+        for start in graph:
+            if start in index:
+                continue
+            work = [(start, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                recurse = False
+                children = graph[node]
+                while i < len(children):
+                    child = children[i]
+                    i += 1
+                    if child not in index:
+                        work.append((node, i))
+                        work.append((child, 0))
+                        recurse = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                if recurse:
+                    continue
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph[node]:
+                        result.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        return result
+
+    def prune(self):
+        """Copia del documento senza i componenti non raggiungibili; restituisce (documento, rimossi)."""
+        removed = self.unreachable()
+        if not removed:
+            return self.data, []
+        data = dict(self.data)
+        components = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.data['components'].items()}
+        for node in removed:
+            kind, name = node[len(COMPONENT_PREFIX):].split('/', 1)
+            del components[kind][_unescape(name)]
+        data['components'] = {k: v for k, v in components.items() if v != {}}
+        return data, removed
+
+
+def summary(graph):
+    return {
+        'operations': len(graph.roots) - 1,
+        'components': len(graph.components()),
+        # $ref distinti per nodo (lo stesso $ref ripetuto in un'operazione conta una volta)
+        'ref_edges': sum(len(r) for r in graph.edges.values()),
+        'unreachable': graph.unreachable(),
+        'cycles': graph.cycles(),
+        'dangling': [{'from': node, 'ref': ref} for node, ref in graph.dangling()],
+    }
+
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Suddivisione della specifica OpenAPI in un file per tag e ricomposizione esatta.
+
+Ogni operazione va nello shard del suo primo tag (o, se non ha tag, del primo tag
+assegnato da `get_endpoint_info`). Ogni shard è un documento OpenAPI completo,
+renderizzabile da solo, i cui `$ref` verso `#/components/...` puntano al file
+condiviso `components.yaml`. `index.yaml` contiene il resto del documento e, sotto
+`x-shards`, l'ordine dei path e delle chiavi di ogni path: `bundle()` riproduce il
+documento originale esatto (stesso contenuto e stesso ordine delle chiavi).
+
+Ogni shard ha un'impronta calcolata dagli hash di Merkle di `spec_diff`: le sue
+operazioni, le sezioni di primo livello e i soli componenti da cui dipende
+(chiusura transitiva di `spec_refs`). Uno shard viene riscritto solo se la sua
+impronta cambia, quindi la modifica di un endpoint o di uno schema usato da un
+solo tag rigenera solo gli shard interessati.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+import spec_diff
+import spec_engine
+from spec_refs import HTTP_METHODS, RefGraph, operation_node
+
+SHARDS_VERSION = 1
+COMPONENTS_FILE = 'components.yaml'
+INDEX_FILE = 'index.yaml'
+LOCAL_PREFIX = '#/components/'
+SHARED_PREFIX = f'{COMPONENTS_FILE}#/components/'
+# Tag degli shard per le operazioni senza tag e senza regola
+DEFAULT_TAG = 'API'
+
+
+def slugify(tag):
+    slug = re.sub(r'[^a-z0-9]+', '-', tag.lower()).strip('-')
+    return slug or 'untagged'
+
+
+def _rewrite_refs(value, old, new):
+    """Copia di `value` con i `$ref` che iniziano per `old` riscritti con prefisso `new`."""
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            if key == '$ref' and isinstance(child, str) and child.startswith(old):
+                result[key] = new + child[len(old):]
+            else:
+                result[key] = _rewrite_refs(child, old, new)
+        return result
+    if isinstance(value, list):
+        return [_rewrite_refs(child, old, new) for child in value]
+    return value
+
+
+def _has_shared_refs(value):
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, str) and ref.startswith(SHARED_PREFIX):
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
+
+def _key_hash(key):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+def _fingerprint(parts):
+    return hashlib.blake2b(b''.join(parts), digest_size=16).hexdigest()
+
+
+def split(data, tree=None):
+    """
+    Suddivide un documento già caricato.
+
+    Restituisce (indice, componenti, shard) dove `shard` è {slug: documento}.
+    `tree` è l'albero di Merkle del documento (calcolato se assente).
+    """
+    if _has_shared_refs(data.get('paths') or {}):
+        # La ricomposizione non saprebbe distinguere questi $ref da quelli riscritti
+        raise ValueError(f"la specifica contiene già $ref verso '{SHARED_PREFIX}'")
+    tree = tree if tree is not None else spec_diff.build(data)
+    get_endpoint_info = spec_engine.load_script('auto-enrich-endpoints.py').get_endpoint_info
+    graph = RefGraph(data)
+    top = {k: v for k, v in data.items() if k not in ('paths', 'components')}
+    paths_node = tree.children.get('paths')
+    components_node = tree.children.get('components')
+
+    tags = {}
+    layout = []
+    members = {}
+    for path, path_item in (data.get('paths') or {}).items():
+        methods = [m for m in path_item if m in HTTP_METHODS and isinstance(path_item[m], dict)]
+        entry_keys = []
+        for key in path_item:
+            method = key if key in methods else (methods[0] if methods else 'get')
+            operation = path_item.get(method) if method in methods else {}
+            tag_list = operation.get('tags') or get_endpoint_info(path, method)['tags'] or [DEFAULT_TAG]
+            tag = tag_list[0]
+            slug = slugify(tag)
+            # Slug uguali per tag diversi: suffisso numerico
+            while tags.setdefault(slug, tag) != tag:
+                slug += '-2'
+            members.setdefault(slug, {}).setdefault(path, []).append(key)
+            entry_keys.append([key, slug])
+        layout.append([path, entry_keys])
+
+    shards = {}
+    fingerprints = {}
+    for slug, shard_paths in members.items():
+        doc = dict(top)
+        paths = {}
+        parts = [f'shard-v{SHARDS_VERSION}'.encode()]
+        parts += [tree.children[k].hash for k in top]
+        dependencies = set()
+        for path, keys in shard_paths.items():
+            path_item = data['paths'][path]
+            owned = set(keys)
+            # Anche le chiavi a livello di path (parameters, servers...) servono allo shard
+            selected = {k: v for k, v in path_item.items()
+                        if k in owned or k not in HTTP_METHODS}
+            paths[path] = _rewrite_refs(selected, LOCAL_PREFIX, SHARED_PREFIX)
+            item_node = paths_node.children[path]
+            parts.append(_key_hash(path))
+            parts += [_key_hash(k) + item_node.children[k].hash for k in selected]
+            for method in keys:
+                if method in HTTP_METHODS:
+                    dependencies.update(graph.dependencies(operation_node(path, method)))
+        if components_node is not None:
+            security = components_node.children.get('securitySchemes')
+            if security is not None:
+                parts.append(security.hash)
+            for node in sorted(dependencies):
+                kind, name = node[len(LOCAL_PREFIX):].split('/', 1)
+                name = name.replace('~1', '/').replace('~0', '~')
+                parts.append(node.encode('utf-8') + components_node.children[kind].children[name].hash)
+        doc['paths'] = paths
+        shards[slug] = doc
+        fingerprints[slug] = _fingerprint(parts)
+
+    components = {'components': data['components']} if 'components' in data else {}
+    index = dict(top)
+    index['x-shards'] = {
+        'version': SHARDS_VERSION,
+        'order': list(data),
+        'components': COMPONENTS_FILE if 'components' in data else None,
+        'components_hash': components_node.hash.hex() if components_node is not None else None,
+        'shards': {slug: {'tag': tags[slug], 'file': shard_file(slug), 'fingerprint': fingerprints[slug]}
+                   for slug in shards},
+        'layout': layout,
+    }
+    return index, components, shards
+
+
+def shard_file(slug):
+    return f'tag-{slug}.yaml'
+
+
+def bundle(index, components, shards):
+    """Ricompone il documento originale da indice, componenti e shard ({slug: documento})."""
+    meta = index['x-shards']
+    if meta.get('version') != SHARDS_VERSION:
+        raise ValueError(f"versione degli shard non supportata: {meta.get('version')}")
+    paths = {}
+    for path, entry_keys in meta['layout']:
+        item = {}
+        for key, slug in entry_keys:
+            item[key] = _rewrite_refs(shards[slug]['paths'][path][key], SHARED_PREFIX, LOCAL_PREFIX)
+        paths[path] = item
+    data = {}
+    for key in meta['order']:
+        if key == 'paths':
+            data[key] = paths
+        elif key == 'components':
+            data[key] = components['components']
+        else:
+            data[key] = index[key]
+    return data
+
+
+def _read_index(directory):
+    path = Path(directory) / INDEX_FILE
+    if not path.exists():
+        return None
+    index = spec_engine.load_spec(path)
+    meta = index.get('x-shards') if isinstance(index, dict) else None
+    return index if meta and meta.get('version') == SHARDS_VERSION else None
+
+
+def write_shards(input_file, directory, force=False):
+    """
+    Scrive (o aggiorna) gli shard di `input_file` in `directory`.
+
+    Solo gli shard con impronta cambiata (o mancanti) vengono riscritti; gli shard
+    di tag scomparsi vengono eliminati. Restituisce il resoconto delle modifiche.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    data = spec_engine.load_spec(input_file)
+    index, components, shards = split(data, spec_diff.load_tree(input_file))
+    meta = index['x-shards']
+
+    previous = None if force else _read_index(directory)
+    old = previous['x-shards'] if previous else {'shards': {}, 'components_hash': None}
+    report = {'written': [], 'unchanged': [], 'removed': [], 'components': 'unchanged'}
+
+    for slug, doc in shards.items():
+        info = meta['shards'][slug]
+        target = directory / info['file']
+        if old['shards'].get(slug, {}).get('fingerprint') == info['fingerprint'] and target.exists():
+            report['unchanged'].append(slug)
+            continue
+        spec_engine.dump_spec(doc, target)
+        report['written'].append(slug)
+    for slug, info in old['shards'].items():
+        if slug not in shards:
+            (directory / info['file']).unlink(missing_ok=True)
+            report['removed'].append(slug)
+
+    components_path = directory / COMPONENTS_FILE
+    if components:
+        if old['components_hash'] != meta['components_hash'] or not components_path.exists():
+            spec_engine.dump_spec(components, components_path)
+            report['components'] = 'written'
+    elif components_path.exists():
+        components_path.unlink()
+        report['components'] = 'removed'
+
+    if previous is None or previous != index:
+        spec_engine.dump_spec(index, directory / INDEX_FILE)
+    return report
+
+
+def load_bundle(directory):
+    """Ricompone il documento a partire da una cartella scritta da `write_shards`."""
+    directory = Path(directory)
+    index = _read_index(directory)
+    if index is None:
+        raise ValueError(f'{directory / INDEX_FILE}: indice degli shard mancante o di versione diversa')
+    meta = index['x-shards']
+    components = spec_engine.load_spec(directory / meta['components']) if meta['components'] else {}
+    shards = {slug: spec_engine.load_spec(directory / info['file']) for slug, info in meta['shards'].items()}
+    return bundle(index, components, shards)
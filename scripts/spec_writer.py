@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Writer incrementale della specifica OpenAPI.
+
+Invece di riserializzare l'intero documento con `yaml.dump`, riscrive solo i blocchi
+`paths[path][method]` effettivamente modificati dalle passate e li innesta (splice)
+nel testo originale: i byte delle parti non toccate restano identici.
+Il costo di serializzazione cresce con il numero di modifiche, non con la dimensione della specifica.
+
+L'indice degli offset dei blocchi (path -> metodo -> [inizio, fine)) si ottiene con una
+scansione per righe del testo prodotto da `yaml.dump` ed è memorizzato in `spec_cache`
+con chiave il digest del file, quindi viene calcolato una sola volta per versione.
+Se il testo non ha la forma attesa (o le modifiche non sono innestabili) si ripiega
+sulla serializzazione completa.
+"""
+
+import re
+
+import yaml
+
+import spec_cache
+
+PATH_INDENT = 2
+METHOD_INDENT = 4
+
+# Da incrementare se cambia la struttura dell'indice salvato in cache
+INDEX_VERSION = 1
+
+# Ancore/alias YAML (`key: &id001`, `- *id001`): un blocco riscritto da solo non li preserverebbe
+ANCHOR_RE = re.compile(r'(?m)(?:^ *- |: )[&*][\w-]+(?: |$)')
+
+
+def _indent_of(line):
+    return len(line) - len(line.lstrip(' '))
+
+
+def _parse_key(line):
+    """Restituisce la chiave di una riga `chiave:` (anche quotata), o None se non è una chiave semplice."""
+    stripped = line.strip()
+    if not stripped.endswith(':') or stripped.startswith(('-', '#')):
+        return None
+    try:
+        parsed = yaml.load(stripped, Loader=spec_cache.YamlLoader)
+    except yaml.YAMLError:
+        return None
+    if not isinstance(parsed, dict) or len(parsed) != 1:
+        return None
+    key, value = next(iter(parsed.items()))
+    return key if value is None else None
+
+
+def build_index(text):
+    """
+    Indicizza i blocchi sotto `paths:` di un documento in stile `yaml.dump`.
+
+    Restituisce {path: [inizio, fine, {metodo: [inizio, fine]}]} con offset in caratteri
+    (le righe di inizio incluse, le righe di fine escluse), oppure None se `paths:` manca
+    o se il documento usa ancore/alias.
+    """
+    if ANCHOR_RE.search(text):
+        return None
+    index = {}
+    offset = 0
+    in_paths = False
+    current_path = None
+    current_method = None
+
+    def close_method(end):
+        if current_method is not None:
+            index[current_path][2][current_method][1] = end
+
+    def close_path(end):
+        close_method(end)
+        if current_path is not None:
+            index[current_path][1] = end
+
+    for line in text.splitlines(keepends=True):
+        start = offset
+        offset += len(line)
+        if not line.strip():
+            continue
+
+        indent = _indent_of(line)
+        if indent == 0:
+            if in_paths:
+                close_path(start)
+                current_path = current_method = None
+                in_paths = False
+            elif line.rstrip() == 'paths:':
+                in_paths = True
+            continue
+        if not in_paths:
+            continue
+
+        if indent == PATH_INDENT:
+            close_path(start)
+            current_method = None
+            current_path = _parse_key(line)
+            if current_path is None:
+                return None
+            index[current_path] = [start, None, {}]
+        elif indent == METHOD_INDENT and current_path is not None:
+            close_method(start)
+            current_method = _parse_key(line)
+            if current_method is not None:
+                index[current_path][2][current_method] = [start, None]
+
+    if in_paths:
+        close_path(offset)
+    return index if index else None
+
+
+def cached_index(text, digest):
+    """`build_index` memorizzato nella cache condivisa con chiave il digest del testo."""
+    cache = spec_cache.default_cache()
+    if not cache.enabled:
+        return build_index(text)
+    key = f'{digest}-paths-index-v{INDEX_VERSION}'
+    index = cache.get(key)
+    if index is spec_cache.MISS:
+        index = build_index(text)
+        cache.put(key, index)
+    return index
+
+
+def dump_block(key, value, indent, dump_options, dumper):
+    """Serializza `{key: value}` come apparirebbe annidato a `indent` spazi in un dump completo."""
+    options = dict(dump_options)
+    # La larghezza di riga in yaml.dump è assoluta: riducila dell'indentazione per
+    # ottenere gli stessi a capo del dump completo
+    options['width'] = options.get('width', 80) - indent
+    text = yaml.dump({key: value}, Dumper=dumper, **options)
+    pad = ' ' * indent
+    return ''.join(pad + line if line.strip() else line for line in text.splitlines(keepends=True))
+
+
+def splice(text, edits):
+    """Applica le sostituzioni [(inizio, fine, testo)] non sovrapposte al testo originale."""
+    pieces = []
+    cursor = 0
+    for start, end, replacement in sorted(edits, key=lambda e: e[0]):
+        if start < cursor:
+            raise ValueError('Modifiche sovrapposte nello splice')
+        pieces.append(text[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(text[cursor:])
+    return ''.join(pieces)
+
+
+def plan_edits(index, paths, changed, removed_paths, dump_options, dumper):
+    """
+    Calcola le sostituzioni per le operazioni modificate e i path rimossi.
+
+    Restituisce None se una modifica non è innestabile (es. operazione o path nuovi).
+    """
+    edits = []
+    for path in removed_paths:
+        if path not in index or path in paths:
+            return None
+        start, end, _ = index[path]
+        edits.append((start, end, ''))
+
+    for path, method in changed:
+        if path in removed_paths:
+            continue
+        entry = index.get(path)
+        if entry is None or method not in entry[2] or method not in paths.get(path, {}):
+            return None
+        start, end = entry[2][method]
+        edits.append((start, end, dump_block(method, paths[path][method], METHOD_INDENT, dump_options, dumper)))
+    return edits
+
+
+def write_spec(data, output_file, original_text, digest, changed, removed_paths, dump_options, dumper):
+    """
+    Scrive la specifica innestando solo i blocchi modificati, se possibile.
+
+    Restituisce ('splice', numero_blocchi) oppure ('full', None) se si è dovuto
+    riserializzare l'intero documento.
+    """
+    edits = None
+    if original_text is not None:
+        index = cached_index(original_text, digest)
+        if index is not None:
+            edits = plan_edits(index, data.get('paths', {}), changed, removed_paths, dump_options, dumper)
+
+    if edits is None:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, Dumper=dumper, **dump_options)
+        return 'full', None
+
+    # newline='' preserva i byte originali (anche eventuali \r\n) delle parti non toccate
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        f.write(splice(original_text, edits) if edits else original_text)
+    return 'splice', len(edits)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tail dei log di una o più esecuzioni fino alla loro conclusione (vedi `api_logs.py`).
+
+Le esecuzioni si indicano con `--execution PROGETTO/JOB/ESECUZIONE` (ripetibile);
+le righe escono su stdout, precedute dalla chiave dell'esecuzione se sono più
+d'una. A ogni giro si scarica solo la coda nuova del log; quando lo stato
+dell'esecuzione è finale (COMPLETED, FAILED...) il tail di quell'esecuzione si
+ferma. Esce con stato 1 se un'esecuzione non è raggiungibile o è fallita.
+
+La chiave API si passa con `--api-key` o `WEBROBOT_API_KEY`; l'URL base è
+`--base-url`, `API_URL` o il primo `servers` di `openapi.yaml`.
+
+Uso:
+    python3 scripts/tail-logs.py --execution 98/210/spark-2d53940045a6-95379617
+    python3 scripts/tail-logs.py --execution 98/210/spark-a --execution 98/211/spark-b --lines 100
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import yaml
+
+import api_client
+import api_logs
+import instrumentation
+import spec_engine
+
+
+async def _tail(tailer, args):
+    prefix = len(tailer.executions) > 1 and not args.no_prefix
+    async for execution, line in tailer.lines(args.duration):
+        if line is None:
+            print(f"🏁 {execution.key}: {execution.status}", file=sys.stderr)
+        elif prefix:
+            print(f'[{execution.key}] {line}')
+        else:
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tail incrementale dei log delle esecuzioni')
+    parser.add_argument('--execution', action='append', default=[], metavar='P/J/E',
+                        help='Esecuzione da seguire (ripetibile)')
+    parser.add_argument('--pod-type', choices=('driver', 'executor'), default=None, help='Solo i log di questo pod')
+    parser.add_argument('--lines', type=int, default=None, help='Righe iniziali (default: tutto il log)')
+    parser.add_argument('--duration', type=float, default=None, help='Durata massima in secondi')
+    parser.add_argument('--concurrency', type=int, default=8, help='Richieste contemporanee')
+    parser.add_argument('--min-interval', type=float, default=1.0, help='Intervallo minimo tra letture in secondi')
+    parser.add_argument('--max-interval', type=float, default=15.0, help='Intervallo massimo tra letture in secondi')
+    parser.add_argument('--buffer', type=int, default=1000, help='Righe in attesa prima di sospendere le letture')
+    parser.add_argument('--no-prefix', action='store_true', help="Righe senza la chiave dell'esecuzione")
+    parser.add_argument('--base-url', default=None, help="URL base dell'API (default: API_URL o servers della specifica)")
+    parser.add_argument('--api-key', default=None, help=f'Chiave API organizzazione:chiave (env {api_client.API_KEY_ENV})')
+    parser.add_argument('--json', action='store_true', help='Riepilogo JSON su stderr')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.setup('tail-logs', args)
+
+    try:
+        if not args.execution:
+            raise ValueError('nessuna esecuzione: usa --execution PROGETTO/JOB/ESECUZIONE')
+        executions = [api_logs.Execution.parse(value, args.pod_type) for value in args.execution]
+        data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+        tailer = api_logs.LogTailer(
+            data, concurrency=args.concurrency, min_interval=args.min_interval, max_interval=args.max_interval,
+            buffer=args.buffer, initial_lines=args.lines, base_url=args.base_url, api_key=args.api_key,
+        )
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Errore: {e}")
+        return 1
+    for execution in executions:
+        tailer.add(execution)
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(_tail(tailer, args))
+    except KeyboardInterrupt:
+        print("⏹️  Interrotto", file=sys.stderr)
+    summary = [execution.summary() for execution in tailer.executions.values()]
+    if args.json:
+        json.dump({'executions': summary, 'elapsedSeconds': round(time.perf_counter() - start, 3)},
+                  sys.stderr, indent=2, ensure_ascii=False)
+        sys.stderr.write('\n')
+    else:
+        for entry in summary:
+            print(f"📜 {entry['execution']}: {entry['lines']} righe, {entry['requests']} richieste, "
+                  f"{entry['bytes']} byte", file=sys.stderr)
+    failed = [entry for entry in summary if str(entry['status']).upper() not in api_client.TERMINAL_STATUSES
+              and entry['errors']] + [entry for entry in summary if str(entry['status']).upper() == 'FAILED']
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -18,37 +18,42 @@ fi
 
 echo "✅ API raggiungibile"
 
-# Estrai OpenAPI JSON
-echo "📥 Estrazione specifica OpenAPI..."
-OPENAPI_JSON=$(curl -s "${API_URL}/api/openapi.json")
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-if [ -z "$OPENAPI_JSON" ] || [ "$OPENAPI_JSON" == "null" ]; then
-    echo "❌ Errore: Impossibile ottenere la specifica OpenAPI"
+if ! command -v python3 &> /dev/null; then
+    echo "❌ Errore: python3 con pyyaml richiesto per il download e la conversione"
+    echo "   Installa con: pip install pyyaml"
     exit 1
 fi
 
-# Converti JSON a YAML usando js-yaml (se disponibile) o python
-if command -v js-yaml &> /dev/null; then
-    echo "$OPENAPI_JSON" | js-yaml > "$OUTPUT_FILE"
-elif command -v python3 &> /dev/null; then
-    echo "$OPENAPI_JSON" | python3 -c "
-import json, sys, yaml
-try:
-    data = json.load(sys.stdin)
-    print(yaml.dump(data, default_flow_style=False, allow_unicode=True, sort_keys=False))
-except ImportError:
-    print('Errore: pyyaml non installato. Installa con: pip install pyyaml', file=sys.stderr)
-    sys.exit(1)
-" > "$OUTPUT_FILE"
-else
-    echo "❌ Errore: js-yaml o python3 con pyyaml richiesti per la conversione"
-    echo "   Installa con: npm install -g js-yaml"
-    echo "   Oppure: pip install pyyaml"
+# Copia della versione precedente per il diff strutturale
+PREVIOUS_FILE=""
+if [ -f "$OUTPUT_FILE" ]; then
+    PREVIOUS_FILE=$(mktemp)
+    cp "$OUTPUT_FILE" "$PREVIOUS_FILE"
+fi
+
+# Download condizionale (ETag/If-Modified-Since) e conversione JSON -> YAML solo se il contenuto è cambiato
+echo "📥 Estrazione specifica OpenAPI..."
+if ! API_URL="$API_URL" OUTPUT_FILE="$OUTPUT_FILE" python3 "$SCRIPT_DIR/fetch-openapi.py"; then
+    echo "❌ Errore: Impossibile ottenere la specifica OpenAPI"
+    rm -f "$PREVIOUS_FILE"
     exit 1
 fi
 
 echo "✅ Specifica OpenAPI aggiornata in ${OUTPUT_FILE}"
 
+# Diff strutturale con la versione precedente: stato 2 se la specifica è cambiata
+if [ -n "$PREVIOUS_FILE" ]; then
+    echo "🔍 Diff strutturale con la versione precedente..."
+    if python3 "$SCRIPT_DIR/spec-diff.py" "$PREVIOUS_FILE" "$OUTPUT_FILE" --summary --exit-code; then
+        echo "ℹ️  Nessuna modifica strutturale: la build dei docs può essere saltata"
+    else
+        echo "📝 Specifica modificata: rifare la build dei docs"
+    fi
+    rm -f "$PREVIOUS_FILE"
+fi
+
 # Valida con Redocly (se disponibile)
 if command -v redocly &> /dev/null; then
     echo "🔍 Validazione con Redocly..."
@@ -7,20 +7,41 @@ This is a *static* validator:
 - Ensures the top-level structure matches what the Scala PipelineParser expects:
   - top-level `pipeline` is a list
   - each stage item is a mapping with only `stage` and optional `args`
-- Performs light sanity checks on a few common stages
+- Checks every stage against the schema registry in `pipeline_stages.py`
+  (known stage name, arity and argument types)
 
 Note: This does NOT execute pipelines. It's meant to catch documentation drift early.
+
+Usage:
+    python3 scripts/validate-pipeline-examples.py                      # examples/pipelines/
+    python3 scripts/validate-pipeline-examples.py customer-pipelines/ --jobs 8
+    python3 scripts/validate-pipeline-examples.py customer-pipelines/ --incremental
+    python3 scripts/validate-pipeline-examples.py --changed-since origin/main
+    gateway | python3 scripts/validate-pipeline-examples.py --stdin               # multi-document YAML
+    gateway | python3 scripts/validate-pipeline-examples.py --stdin --format jsonl
+    python3 scripts/validate-pipeline-examples.py --profile               # phase timings on stderr
 """
 
 from __future__ import annotations
 
+import argparse
+import functools
 import glob
+import hashlib
+import json
 import os
+import re
+import subprocess
 import sys
-from typing import Any, Dict, List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO
+
+import instrumentation
+from pipeline_stages import check_args, lookup, suggest
 
 
-def _load_yaml(path: str) -> Dict[str, Any]:
+def _import_yaml() -> Any:
     try:
         import yaml  # type: ignore
     except Exception as e:  # pragma: no cover
@@ -29,13 +50,16 @@ def _load_yaml(path: str) -> Dict[str, Any]:
             "Install with: python3 -m pip install pyyaml\n"
             f"Import error: {e}"
         )
+    return yaml
+
+
+def _load_yaml(path: str) -> Any:
+    _import_yaml()
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    # Parsed documents are cached by content hash: unchanged files skip YAML parsing.
+    from spec_cache import load_yaml
 
-    if not isinstance(data, dict):
-        raise ValueError("YAML root must be a mapping/object")
-    return data
+    return load_yaml(path)
 
 
 def _expect(cond: bool, msg: str) -> None:
@@ -44,8 +68,12 @@ def _expect(cond: bool, msg: str) -> None:
 
 
 def validate_file(path: str) -> None:
-    data = _load_yaml(path)
+    validate_pipeline(_load_yaml(path))
 
+
+def validate_pipeline(data: Any) -> None:
+    """Validate an already parsed pipeline document (the rules shared by files and --stdin)."""
+    _expect(isinstance(data, dict), "YAML root must be a mapping/object")
     _expect("pipeline" in data, "Missing top-level 'pipeline' key")
     pipeline = data["pipeline"]
     _expect(isinstance(pipeline, list), "Top-level 'pipeline' must be a list")
@@ -78,38 +106,282 @@ def validate_file(path: str) -> None:
         args = st.get("args", [])
         _expect(isinstance(args, list), f"'pipeline[{idx}].args' must be a list if present")
 
-        # Light sanity checks for a few common stages (not exhaustive)
-        stage_lc = stage.lower()
-        if stage_lc in {"join", "visitjoin"}:
-            _expect(len(args) >= 1, f"'{stage}' requires at least 1 arg (selector or $column)")
-            _expect(len(args) <= 2, f"'{stage}' supports at most 2 args (selector, optional joinType)")
-        elif stage_lc in {"explore", "visitexplore"}:
-            _expect(len(args) >= 1, f"'{stage}' requires at least 1 arg (selector or $column)")
-            _expect(len(args) <= 2, f"'{stage}' supports at most 2 args (selector, optional depth)")
-        elif stage_lc == "extract":
-            _expect(len(args) >= 1, "'extract' requires at least 1 extractor definition")
-        elif stage_lc in {"flatselect", "widen"}:
-            _expect(len(args) >= 1, "'flatSelect' requires a segment selector as first arg")
-
-
-def main() -> int:
+        schema = lookup(stage)
+        if schema is None:
+            hint = suggest(stage)
+            hint_msg = f" (did you mean '{hint}'?)" if hint else ""
+            raise ValueError(f"'pipeline[{idx}].stage' unknown stage '{stage}'{hint_msg}")
+        errors = check_args(stage, schema, args)
+        _expect(not errors, f"'pipeline[{idx}]' {'; '.join(errors)}")
+
+
+class _Checked(NamedTuple):
+    error: Optional[str]
+    # Phase timings travel with the result: under --jobs they are measured in a worker process
+    parse_seconds: float
+    validate_seconds: Optional[float]
+
+
+def _check(path: str) -> _Checked:
+    """Validate one file; the error message is None if it is valid."""
+    # Same as validate_file, split so --profile can time parsing and rule checks apart
+    start = time.perf_counter()
+    try:
+        data = _load_yaml(path)
+    except Exception as e:
+        return _Checked(str(e), time.perf_counter() - start, None)
+    parsed = time.perf_counter()
+    try:
+        validate_pipeline(data)
+    except Exception as e:
+        return _Checked(str(e), parsed - start, time.perf_counter() - parsed)
+    return _Checked(None, parsed - start, time.perf_counter() - parsed)
+
+
+def _digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _validator_version() -> str:
+    """Hash of the validation rules: cached results are discarded when the rules change."""
+    h = hashlib.sha256()
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in (os.path.basename(__file__), "pipeline_stages.py"):
+        with open(os.path.join(scripts_dir, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class _ResultCache:
+    """JSON store of content hash -> validation error (None when the file is valid)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.version = _validator_version()
+        self.results: Dict[str, Optional[str]] = {}
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(stored, dict) and stored.get("version") == self.version:
+            self.results = stored.get("results", {})
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "results": self.results}, f)
+        os.replace(tmp, self.path)
+
+
+def _collect_files(root: str, targets: List[str]) -> List[str]:
+    if not targets:
+        targets = [os.path.join(root, "examples", "pipelines")]
+    files: List[str] = []
+    for target in targets:
+        if os.path.isdir(target):
+            files.extend(glob.glob(os.path.join(target, "**", "*.y*ml"), recursive=True))
+        else:
+            files.append(target)
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+def _changed_files(rev: str) -> Set[str]:
+    """Files changed since `rev` in the current git work tree (committed, staged, unstaged, untracked)."""
+    def git(*args: str) -> List[str]:
+        out = subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+        return [line for line in out.splitlines() if line]
+
+    toplevel = git("rev-parse", "--show-toplevel")[0]
+    names = git("diff", "--name-only", "--diff-filter=d", rev, "--")
+    names += git("ls-files", "--others", "--exclude-standard", "--full-name", toplevel)
+    return {os.path.abspath(os.path.join(toplevel, n)) for n in names}
+
+
+# Lines that open (`---`) or close (`...`) a document in a YAML stream
+_YAML_DOC_START = re.compile(r"^---(?:\s|$)")
+_YAML_DOC_END = re.compile(r"^\.\.\.\s*$")
+
+
+def _yaml_documents(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Split a multi-document YAML stream into document texts as soon as each one is complete.
+
+    A document is complete at the next `---` or at an explicit `...` end marker, so a
+    client that terminates every document with `...` gets its result without waiting
+    for the following submission.
+    """
+    doc: List[str] = []
+    for line in lines:
+        if _YAML_DOC_START.match(line):
+            if "".join(doc).strip():
+                yield "".join(doc)
+            doc = [line]
+        elif _YAML_DOC_END.match(line):
+            if "".join(doc).strip():
+                yield "".join(doc)
+            doc = []
+        else:
+            doc.append(line)
+    if "".join(doc).strip():
+        yield "".join(doc)
+
+
+def _jsonl_documents(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        if line.strip():
+            yield line
+
+
+@functools.lru_cache(maxsize=4096)
+def _check_text(text: str, fmt: str) -> Optional[str]:
+    """Parse and validate one streamed document; repeated submissions are answered from memory."""
+    try:
+        if fmt == "jsonl":
+            data = json.loads(text)
+        else:
+            yaml = _import_yaml()
+            data = yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        validate_pipeline(data)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def serve(fmt: str, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> int:
+    """
+    Long-lived mode: validate a stream of pipeline documents from `stdin` and write one
+    NDJSON result per document to `stdout`, flushed as soon as the document is checked.
+    Returns 2 if any document failed, like the file mode.
+    """
+    if fmt == "yaml":
+        _import_yaml()  # pay the import before the first document, not during it
+    lines = iter(stdin.readline, "")
+    documents = _jsonl_documents(lines) if fmt == "jsonl" else _yaml_documents(lines)
+    failed = 0
+    for index, text in enumerate(documents):
+        start = time.perf_counter()
+        error = _check_text(text, fmt)
+        result: Dict[str, Any] = {"index": index, "ok": error is None}
+        if error is not None:
+            failed += 1
+            result["error"] = error
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        stdout.write(json.dumps(result) + "\n")
+        stdout.flush()
+        instrumentation.count("recordsProcessed")
+    instrumentation.count("documentsFailed", failed)
+    return 2 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    examples_dir = os.path.join(root, "examples", "pipelines")
-    files = sorted(glob.glob(os.path.join(examples_dir, "*.y*ml")))
 
+    parser = argparse.ArgumentParser(description="Statically validate pipeline YAML files.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="Files or directories to validate (default: examples/pipelines/)",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Validate files in N worker processes")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Reuse results for files whose content hash was already validated",
+    )
+    parser.add_argument(
+        "--cache-file", default=os.path.join(root, ".cache", "pipeline-validation.json"),
+        help="Result cache used by --incremental",
+    )
+    parser.add_argument("--changed-since", metavar="GIT_REV", help="Only validate files changed since GIT_REV")
+    parser.add_argument(
+        "--stdin", action="store_true",
+        help="Validate a stream of documents from stdin and write one NDJSON result per document",
+    )
+    parser.add_argument(
+        "--format", choices=("yaml", "jsonl"), default="yaml",
+        help="Format of the --stdin stream: multi-document YAML or one JSON document per line",
+    )
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.setup("validate-pipeline-examples.py", args)
+
+    if args.stdin:
+        return serve(args.format)
+
+    with instrumentation.phase("collect"):
+        files = _collect_files(root, args.paths)
     if not files:
-        print(f"No YAML files found under {examples_dir}")
+        print(f"No YAML files found under {', '.join(args.paths) or os.path.join(root, 'examples', 'pipelines')}")
         return 1
 
-    failed: List[str] = []
-    for f in files:
+    if args.changed_since:
         try:
-            validate_file(f)
-            print(f"OK  - {os.path.relpath(f, root)}")
-        except Exception as e:
-            failed.append(f)
-            print(f"ERR - {os.path.relpath(f, root)}: {e}")
+            changed = _changed_files(args.changed_since)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Cannot list files changed since {args.changed_since}: {e}")
+            return 1
+        files = [f for f in files if f in changed]
+        if not files:
+            print(f"No YAML files changed since {args.changed_since}")
+            return 0
+
+    with instrumentation.phase("cache"):
+        cache = _ResultCache(args.cache_file) if args.incremental else None
+        digests = {f: _digest(f) for f in files} if cache else {}
+    # Hits are decided on the results stored before this run; files with the same content are checked once
+    cached = set(cache.results) if cache else set()
+    pending: List[str] = []
+    queued: Set[str] = set()
+    for f in files:
+        if cache and (digests[f] in cached or digests[f] in queued):
+            continue
+        if cache:
+            queued.add(digests[f])
+        pending.append(f)
+    instrumentation.count("recordsProcessed", len(files))
+    instrumentation.count("filesValidated", len(pending))
+    instrumentation.count("filesCached", len(files) - len(pending))
 
+    pool = None
+    if args.jobs > 1 and len(pending) > 1:
+        pool = ProcessPoolExecutor(max_workers=args.jobs)
+        chunksize = max(1, len(pending) // (args.jobs * 8))
+        results: Iterator[_Checked] = pool.map(_check, pending, chunksize=chunksize)
+    else:
+        results = map(_check, pending)
+
+    # Results are consumed in file order, so the report is identical to a sequential run
+    failed: List[str] = []
+    try:
+        for f in files:
+            if cache and (digests[f] in cached or digests[f] not in queued):
+                error = cache.results[digests[f]]
+            else:
+                checked = next(results)
+                error = checked.error
+                instrumentation.record("parse", checked.parse_seconds)
+                if checked.validate_seconds is not None:
+                    instrumentation.record("validate", checked.validate_seconds)
+                if cache:
+                    queued.discard(digests[f])
+                    cache.results[digests[f]] = error
+                    cache.dirty = True
+            if error is None:
+                print(f"OK  - {os.path.relpath(f, root)}")
+            else:
+                failed.append(f)
+                print(f"ERR - {os.path.relpath(f, root)}: {error}")
+    finally:
+        if pool:
+            pool.shutdown()
+        if cache:
+            cache.save()
+
+    instrumentation.count("filesFailed", len(failed))
     if failed:
         print(f"\nFAILED: {len(failed)}/{len(files)} example(s)")
         return 2
@@ -120,5 +392,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules under test live in scripts/, which the scripts themselves run from
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
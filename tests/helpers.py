@@ -0,0 +1,28 @@
+"""Shared helpers of the test suite."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT, "scripts")
+FIXTURES_DIR = os.path.join(ROOT, "tests", "fixtures")
+
+
+def load_script(filename: str) -> ModuleType:
+    """
+    Import a hyphenated CLI of scripts/ (e.g. `validate-pipeline-examples.py`) as a module.
+
+    The module is registered in `sys.modules` (once), so worker processes can unpickle its functions.
+    """
+    name = os.path.splitext(filename)[0].replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,47 @@
+"""Local server imitating the spec endpoints of the API, for the fetcher tests."""
+
+import email.utils
+import hashlib
+import time
+
+import api_mock
+
+
+async def serve_specs(routes, host='127.0.0.1', port=0, etag=True, last_modified=True, chunked=False):
+    """
+    Serve `routes` ({path: bytes}, mutable while running; a string value is a 301
+    redirect to that path) with optional ETag/Last-Modified validators.
+
+    Conditional requests that match get a 304; `stats` counts requests and 304s.
+    Returns (server, port, stats).
+    """
+    modified = {}
+
+    def handler(request):
+        body = routes.get(request.path)
+        if body is None:
+            return 404, {}, b''
+        if isinstance(body, str):
+            return 301, {'Location': body}, b''
+        tag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if modified.get(request.path, (None,))[0] != tag:
+            modified[request.path] = (tag, email.utils.formatdate(time.time(), usegmt=True))
+        stamp = modified[request.path][1]
+        response_headers = {'Content-Type': 'application/json'}
+        if etag:
+            response_headers['ETag'] = tag
+        if last_modified:
+            response_headers['Last-Modified'] = stamp
+        headers = request.headers
+        fresh = (etag and headers.get('if-none-match') == tag) or (
+            last_modified and not (etag and 'if-none-match' in headers)
+            and headers.get('if-modified-since') == stamp
+        )
+        if fresh:
+            stats['not_modified'] += 1
+            return 304, response_headers, b''
+        return 200, response_headers, body
+
+    server, port, stats = await api_mock.serve(handler, host, port, chunk_size=1000 if chunked else None)
+    stats['not_modified'] = 0
+    return server, port, stats
@@ -0,0 +1,25 @@
+"""scripts/bench-tooling.py: which differences from the baseline count as regressions."""
+
+from helpers import load_script
+
+bench = load_script("bench-tooling.py")
+
+
+def _compare(base, current, threshold=0.2, memory_threshold=None):
+    return bench.compare({"case@1x": current}, {"results": {"case@1x": base}}, threshold, memory_threshold)
+
+
+def test_short_cases_are_not_gated_on_time():
+    assert _compare({"wall_s": 0.02}, {"wall_s": 0.031}) == []
+    assert _compare({"wall_s": 0.09}, {"wall_s": 0.2}) == []
+
+
+def test_long_cases_are_gated_on_time():
+    assert _compare({"wall_s": 0.5}, {"wall_s": 0.55}) == []
+    assert _compare({"wall_s": 0.5}, {"wall_s": 0.65}) == [("case@1x", "wall_s", 0.5, 0.65)]
+
+
+def test_memory_is_gated_whatever_the_duration():
+    regressions = _compare({"wall_s": 0.02, "peak_rss_mb": 40.0}, {"wall_s": 0.02, "peak_rss_mb": 60.0},
+                           memory_threshold=0.3)
+    assert regressions == [("case@1x", "peak_rss_mb", 40.0, 60.0)]
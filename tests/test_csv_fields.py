@@ -0,0 +1,30 @@
+"""csv_fields: the csv field size limit is raised by the CLIs, never as a side effect of an import."""
+
+import csv
+import importlib
+
+import csv_fields
+
+
+def test_importing_the_readers_leaves_the_csv_limit_alone():
+    before = csv.field_size_limit()
+    try:
+        csv.field_size_limit(1000)
+        for name in ("pipeline_union", "ean_columnar", "ean_image_index"):
+            importlib.reload(importlib.import_module(name))
+        assert csv.field_size_limit() == 1000
+    finally:
+        csv.field_size_limit(before)
+
+
+def test_allow_large_fields_reads_fields_past_the_default_limit(tmp_path):
+    before = csv.field_size_limit()
+    path = tmp_path / "export.csv"
+    path.write_text("ean,description\n1," + "x" * (before + 1) + "\n", encoding="utf-8")
+    try:
+        csv_fields.allow_large_fields()
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert len(rows[1][1]) == before + 1
+    finally:
+        csv.field_size_limit(before)
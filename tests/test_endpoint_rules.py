@@ -0,0 +1,45 @@
+"""The if/elif chains of scripts/endpoint_rules.py used by the scripts agree with the rule table."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+import yaml
+
+from endpoint_rules import DEFAULT_RULES, DESCRIPTION_RULES, SUMMARY_RULES, endpoint_info, generic_tags
+from helpers import ROOT, load_script
+
+METHODS = [m.lower() for m in SUMMARY_RULES] + ["options", "head"]
+
+
+def _spec_paths():
+    with open(os.path.join(ROOT, "openapi.yaml"), encoding="utf-8") as f:
+        return list(yaml.safe_load(f)["paths"])
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_spec_paths(method):
+    for path in _spec_paths():
+        assert endpoint_info(path, method) == DEFAULT_RULES.classify(path, method), path
+        assert generic_tags(path) == DESCRIPTION_RULES.tags(path), path
+
+
+def test_synthetic_paths():
+    bench = load_script("bench-endpoint-rules.py")
+    for path, method in bench.synthetic_paths(20_000, seed=7):
+        assert endpoint_info(path, method) == DEFAULT_RULES.classify(path, method), (path, method)
+        assert generic_tags(path) == DESCRIPTION_RULES.tags(path), path
+
+
+def test_case_and_special_tokens():
+    assert endpoint_info("/WebRobot/API/Projects/ALL", "get") == {
+        "tags": ["Projects"],
+        "summary": "Ottiene tutte le risorse",
+        "description": "Restituisce la lista di tutte le risorse disponibili nel sistema.",
+    }
+    # ENDS_WITH_S is tested on the original path, substrings on the lowercased one
+    assert endpoint_info("/x/{id}", "get")["summary"] == "Ottiene una risorsa specifica"
+    assert endpoint_info("/x/things", "GET")["summary"] == "Ottiene tutte le risorse"
+    assert endpoint_info("/x/thing", "trace")["summary"] == "Operazione TRACE"
+    assert generic_tags("/Projects/x") == [] and DESCRIPTION_RULES.tags("/Projects/x") == []
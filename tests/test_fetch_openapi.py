@@ -0,0 +1,66 @@
+"""spec_fetch: conditional downloads against a local server (304, unchanged content, redirects, updates)."""
+
+import asyncio
+import json
+
+import yaml
+
+import spec_fetch
+from spec_server import serve_specs
+
+
+def _spec(version):
+    return {'openapi': '3.0.1', 'info': {'title': 'Test', 'version': version},
+            'paths': {'/api/health': {'get': {'summary': 'Salute è ok', 'responses': {'200': {'description': 'OK'}}}}}}
+
+
+async def _scenario(tmp_path):
+    body = json.dumps(_spec('1')).encode()
+    with_validators = {'/api/openapi.json': body, '/old/openapi.json': '/api/openapi.json'}
+    without_validators = {'/api/openapi.json': body}
+    server_a, port_a, stats_a = await serve_specs(with_validators)
+    server_b, port_b, _ = await serve_specs(without_validators, etag=False, last_modified=False, chunked=True)
+    try:
+        targets = [
+            spec_fetch.Target('etag', f'http://127.0.0.1:{port_a}/api/openapi.json', tmp_path / 'etag.yaml'),
+            spec_fetch.Target('redirect', f'http://127.0.0.1:{port_a}/old/openapi.json', tmp_path / 'redirect.yaml'),
+            spec_fetch.Target('plain', f'http://127.0.0.1:{port_b}/api/openapi.json', tmp_path / 'plain.yaml'),
+        ]
+        state = {}
+
+        async def run():
+            report, pool = await spec_fetch.fetch_all(targets, state)
+            return {r['target']: r['result'] for r in report}, pool
+
+        results, _ = await run()
+        assert results == {'etag': 'updated', 'redirect': 'updated', 'plain': 'updated'}
+        for target in targets:
+            assert yaml.safe_load(target.output.read_text(encoding='utf-8')) == _spec('1')
+        mtimes = {t.name: t.output.stat().st_mtime_ns for t in targets}
+
+        results, pool = await run()
+        assert results == {'etag': 'not_modified', 'redirect': 'not_modified', 'plain': 'unchanged'}
+        assert pool['reused'] > 0
+        assert {t.name: t.output.stat().st_mtime_ns for t in targets} == mtimes
+        assert stats_a['not_modified'] == 2
+
+        body = json.dumps(_spec('2')).encode()
+        with_validators['/api/openapi.json'] = body
+        without_validators['/api/openapi.json'] = body
+        results, _ = await run()
+        assert results == {'etag': 'updated', 'redirect': 'updated', 'plain': 'updated'}
+        for target in targets:
+            assert yaml.safe_load(target.output.read_text(encoding='utf-8'))['info']['version'] == '2'
+
+        missing = spec_fetch.Target('missing', f'http://127.0.0.1:{port_a}/missing', tmp_path / 'missing.yaml')
+        (entry,), _ = await spec_fetch.fetch_all([missing], state)
+        assert entry['result'] == 'error'
+        assert not missing.output.exists()
+    finally:
+        for server in (server_a, server_b):
+            server.close()
+            await server.wait_closed()
+
+
+def test_conditional_fetch(tmp_path):
+    asyncio.run(_scenario(tmp_path))
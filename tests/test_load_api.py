@@ -0,0 +1,45 @@
+"""api_load: weighted mix, percentiles and a paced run against the local mock."""
+
+import asyncio
+
+import api_load
+import api_mock
+import spec_engine
+
+
+def test_parse_mix():
+    assert api_load.parse_mix('a=3, b') == [('a', 3.0), ('b', 1.0)]
+
+
+def test_nearest_rank_percentiles():
+    assert api_load.percentiles([0.001 * i for i in range(1, 101)]) == {
+        'p50': 51.0, 'p95': 96.0, 'p99': 100.0, 'max': 100.0,
+    }
+
+
+async def _load(data, mock):
+    server, port, _ = await api_mock.serve(mock.handler())
+    try:
+        mix = api_load.parse_mix(api_load.DEFAULT_MIX)
+        requests = api_load.build_requests(data, mix, f'http://127.0.0.1:{port}{mock.base_path}',
+                                           overrides={'projectId': '7'})
+        assert all('/projects/id/7/' in r.url for r, _ in requests if r.operation_id != 'executeQuery')
+        return await api_load.run_load(requests, rps=200, duration=1.5, connections=16, seed=1)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_run_load_against_the_mock():
+    data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+    mock = api_mock.MockApi(data, delay=0.005)
+    report = asyncio.run(_load(data, mock))
+
+    total = report['total']
+    assert (total['requests'], total['errors']) == (300, 0)
+    assert total['throughput'] > 150
+    assert total['latencyMs']['p50'] >= 5, '5 ms of simulated latency'
+    counts = {name: summary['requests'] for name, summary in report['operations'].items()}
+    assert counts.get('getExecutionStatus', 0) > counts.get('executeQuery', 0) > counts.get('executeJob_1', 0) > 0
+    assert sum(mock.hits.values()) == total['requests']
+    assert report['connections']['opened'] <= 16
@@ -0,0 +1,63 @@
+"""api_mock: every operation of openapi.yaml served by the mock, routing and error statuses."""
+
+import asyncio
+import json
+
+import api_client
+import api_load
+import api_mock
+import spec_engine
+import spec_fetch
+
+
+async def _exercise(data, mock):
+    routes = {route.operation_id: route for route in mock.routes}
+    server, port, _ = await api_mock.serve(mock.handler())
+    base_url = f'http://127.0.0.1:{port}{mock.base_path}'
+    headers = api_client.auth_headers(data, 'test-org:test-key')
+    requests = api_load.build_requests(data, [(name, 1) for name in routes], base_url, headers)
+    pool = spec_fetch.ConnectionPool(max_per_host=8)
+
+    async def call(method, url, request_headers=None, body=None):
+        response = await pool.request(method, url, request_headers, body)
+        payload = b''.join([chunk async for chunk in response.iter_body()])
+        return response, payload
+
+    try:
+        failures = []
+        for request, _ in requests:
+            route = routes[request.operation_id]
+            response, payload = await call(request.method, request.url, request.headers, request.body)
+            if response.status != route.status:
+                failures.append(f'{request.operation_id}: status {response.status} instead of {route.status}')
+            elif route.schema is not None and payload:
+                problems = api_mock.conforms(data, route.schema, json.loads(payload))
+                if problems:
+                    failures.append(f"{request.operation_id}: {'; '.join(problems[:3])}")
+        assert failures == []
+
+        status_url = next(r.url for r, _ in requests if r.operation_id == 'getExecutionStatus')
+        response, _ = await call('GET', status_url.replace(mock.base_path, '', 1), headers)
+        assert response.status == 200, 'path accepted without the server prefix'
+        response, _ = await call('GET', f'http://127.0.0.1:{port}/api/webrobot/api/inesistente', headers)
+        assert response.status == 404
+        response, _ = await call('DELETE', status_url, headers)
+        assert (response.status, response.headers.get('allow')) == (405, 'GET')
+        response, _ = await call('GET', status_url)
+        assert response.status == 401, 'request without an API key'
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+
+
+def test_mock_serves_every_operation_with_conforming_responses():
+    data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+    asyncio.run(_exercise(data, api_mock.MockApi(data, require_api_key=True)))
+
+
+def test_route_table_prefers_literal_segments():
+    data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+    mock = api_mock.MockApi(data)
+    route, _ = mock.table.lookup('GET', '/webrobot/api/projects/id/98/jobs/210/executions/spark-1/status')
+    assert route is not None and route.operation_id == 'getExecutionStatus'
@@ -0,0 +1,186 @@
+"""Lint rules of scripts/pipeline_lint.py: findings on the example corpus and exact suggested rewrites."""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+
+import pytest
+import yaml
+
+from helpers import FIXTURES_DIR, ROOT, load_script
+from pipeline_lint import hoist_per_row_setup, lint
+
+UNION = {"stage": "load_union", "args": [{"format": "csv", "path": "a.csv"}, {"format": "csv", "path": "b.csv"}]}
+
+
+def _rules(findings):
+    return [f.rule for f in findings]
+
+
+# --- Corpus ------------------------------------------------------------------
+
+def _corpus():
+    validator = load_script("validate-pipeline-examples.py")
+    for path in validator._collect_files(ROOT, []):
+        data = validator._load_yaml(path)
+        validator.validate_pipeline(data)
+        yield os.path.relpath(path, ROOT), data
+
+
+def test_corpus_findings_per_rule_match_expectations():
+    with open(os.path.join(FIXTURES_DIR, "lint-expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)["files"]
+    actual = {}
+    for rel, data in _corpus():
+        counts = {}
+        for finding in lint(data):
+            counts[finding.rule] = counts.get(finding.rule, 0) + 1
+        actual[rel] = dict(sorted(counts.items()))
+    assert actual == expected
+
+
+def test_corpus_rewrites_parse():
+    for rel, data in _corpus():
+        for finding in lint(data):
+            if not finding.rewrite:
+                continue
+            rewrite = yaml.safe_load(finding.rewrite)
+            stages = (rewrite.get("python_extensions") or {}).get("stages", {}) if isinstance(rewrite, dict) else {}
+            for entry in stages.values():
+                ast.parse(entry["function"])
+
+
+# --- dedup-key -----------------------------------------------------------------
+
+def test_dedup_without_keys_after_union():
+    findings = lint({"pipeline": [UNION, {"stage": "cache"}, {"stage": "dedup"}]}, rules=["dedup-key"])
+    assert [(f.rule, f.stages) for f in findings] == [("dedup-key", (2, 2))]
+    assert findings[0].rewrite == "- stage: dedup\n  args: [url]\n"
+
+
+def test_dedup_key_prefers_an_extracted_key_column():
+    pipeline = [
+        {"stage": "extract", "args": [{"selector": "span.ean", "method": "text", "as": "ean"}]},
+        {"stage": "union_with", "args": ["offers"]},
+        {"stage": "dedup"},
+    ]
+    findings = lint({"pipeline": pipeline}, rules=["dedup-key"])
+    assert findings[0].rewrite == "- stage: dedup\n  args: [ean]\n"
+
+
+def test_dedup_with_keys_or_without_union_is_not_flagged():
+    assert lint({"pipeline": [UNION, {"stage": "dedup", "args": ["sku"]}]}, rules=["dedup-key"]) == []
+    assert lint({"pipeline": [{"stage": "wget", "args": ["https://a"]}, {"stage": "dedup"}]},
+                rules=["dedup-key"]) == []
+
+
+# --- fuse-row-transforms -------------------------------------------------------
+
+def test_fuse_row_transforms_rewrite():
+    data = {
+        "python_extensions": {"stages": {
+            "a": {"type": "row_transform", "function": "def a(row):\n    return row\n"},
+            "b": {"type": "row_transform", "function": "def b(row):\n    row['x'] = 1\n    return row\n"},
+        }},
+        "pipeline": [{"stage": "python_row_transform:a"}, {"stage": "python_row_transform:b"}],
+    }
+    (finding,) = lint(data, rules=["fuse-row-transforms"])
+    assert finding.stages == (0, 1)
+    assert finding.rewrite == (
+        "python_extensions:\n"
+        "  stages:\n"
+        "    a__b:\n"
+        "      type: row_transform\n"
+        "      function: |\n"
+        "        def a(row):\n"
+        "            return row\n"
+        "\n\n"
+        "        def b(row):\n"
+        "            row['x'] = 1\n"
+        "            return row\n"
+        "\n\n"
+        "        def a__b(row):\n"
+        "            row = a(row)\n"
+        "            row = b(row)\n"
+        "            return row\n"
+        "pipeline:\n"
+        "- stage: python_row_transform:a__b\n"
+        "  args: []\n"
+    )
+    namespace = {}
+    exec(yaml.safe_load(finding.rewrite)["python_extensions"]["stages"]["a__b"]["function"], namespace)
+    assert namespace["a__b"]({}) == {"x": 1}
+
+
+def test_fuse_row_transforms_with_args_has_no_rewrite():
+    data = {"pipeline": [{"stage": "python_row_transform:a", "args": [1]}, {"stage": "python_row_transform:b"}]}
+    (finding,) = lint(data, rules=["fuse-row-transforms"])
+    assert finding.rewrite == ""
+
+
+# --- python-per-row-setup ------------------------------------------------------
+
+def test_hoists_top_level_imports_and_patterns():
+    source = (
+        "def f(row):\n"
+        "    import json  # fast enough\n"
+        "    row['n'] = re.sub('a+', 'a', json.dumps(row), 1)\n"
+        "    return row\n"
+    )
+    found, rewritten = hoist_per_row_setup("f", source)
+    assert found == ["'import json'", "re.sub('a+', ...)"]
+    assert rewritten == (
+        "import json  # fast enough\n"
+        "import re\n"
+        "_F_RE_1 = re.compile('a+')\n"
+        "\n\n"
+        "def f(row):\n"
+        "    row['n'] = _F_RE_1.sub('a', json.dumps(row), 1)\n"
+        "    return row\n"
+    )
+
+
+@pytest.mark.parametrize("source", [
+    # Conditional fallback imports stay where they are
+    "def f(row):\n"
+    "    try:\n"
+    "        import ujson as json\n"
+    "    except ImportError:\n"
+    "        import json\n"
+    "    return json.dumps(row)\n",
+    "def f(row):\n"
+    "    if row:\n"
+    "        import json\n"
+    "        return json.dumps(row)\n"
+    "    return ''\n",
+    # The statement after the semicolon would be lost with the import
+    "def f(row):\n"
+    "    import json; n = len(row)\n"
+    "    return json.dumps(n)\n",
+])
+def test_nested_or_shared_line_imports_are_not_hoisted(source):
+    assert hoist_per_row_setup("f", source) is None
+
+
+def test_semicolon_import_keeps_the_pattern_rewrite():
+    source = "def f(row):\n    import re; n = len(row)\n    return re.match('x', str(n))\n"
+    found, rewritten = hoist_per_row_setup("f", source)
+    assert found == ["re.match('x', ...)"]
+    assert "    import re; n = len(row)\n    return _F_RE_1.match(str(n))\n" in rewritten
+    ast.parse(rewritten)
+
+
+def test_rewrite_that_does_not_compile_is_dropped():
+    found, rewritten = hoist_per_row_setup("f", "def f(row):\n    import json\n")
+    assert found == ["'import json'"]
+    assert rewritten == ""
+    data = {"python_extensions": {"stages": {"f": {"type": "row_transform", "function": "def f(row):\n    import json\n"}}},
+            "pipeline": [{"stage": "python_row_transform:f"}]}
+    (finding,) = lint(data, rules=["python-per-row-setup"])
+    assert finding.rewrite == ""
+
+
+def test_regex_calls_with_flags_are_left_alone():
+    assert hoist_per_row_setup("f", "def f(row):\n    return re.search('a', row['x'], re.I)\n") is None
@@ -0,0 +1,110 @@
+"""api_metrics: ring-buffer series and the adaptive poller against a local server imitating the API."""
+
+import asyncio
+
+import api_client
+import api_metrics
+import api_mock
+import spec_engine
+import spec_fetch
+
+LEVELS = ((0, 16), (0.1, 8))
+
+
+def test_ring_series_keeps_the_last_samples_and_bucket_means():
+    series = api_metrics.RingSeries(((0, 4), (10, 3)))
+    for t in range(50):
+        series.append(float(t), float(t))
+    assert series.points(0) == [(float(t), float(t)) for t in range(46, 50)]
+    # 10 s buckets: three complete ones plus the open one
+    assert series.points(1) == [(10.0, 14.5), (20.0, 24.5), (30.0, 34.5), (40.0, 44.5)]
+
+
+class FakeApi:
+    """Metrics endpoints: job 10 and task 100 are running, task 999 does not exist."""
+
+    def __init__(self, data):
+        self.operations = api_client.load_operations(data, api_metrics.OPERATIONS.values())
+        self.counters = {'project': 0, 'job/10': 0}
+        self.task_reads = {}
+        self.api_keys = set()
+
+    def __call__(self, request):
+        self.api_keys.add(request.headers.get('x-api-key'))
+        params = self.operations['getTaskMetrics'].match(request.path)
+        if params is not None:
+            task = params['taskId']
+            if task == '999':
+                return api_client.json_response({'code': 404, 'message': 'Task not found'}, 404)
+            reads = self.task_reads[task] = self.task_reads.get(task, 0) + 1
+            running = task == '100' and reads < 6
+            return api_client.json_response({
+                'taskId': int(task), 'recordsProcessed': reads * 100,
+                'status': 'RUNNING' if running else 'COMPLETED',
+            })
+        params = self.operations['getJobMetrics'].match(request.path)
+        if params is not None:
+            if params['jobId'] == '10':
+                self.counters['job/10'] += 1
+                aggregated = {'totalRecordsProcessed': self.counters['job/10'] * 10, 'runningCount': 1}
+            else:
+                aggregated = {'totalRecordsProcessed': 500, 'runningCount': 0}
+            return api_client.json_response({'jobId': int(params['jobId']), 'aggregated': aggregated})
+        params = self.operations['getProjectMetrics'].match(request.path)
+        if params is not None:
+            self.counters['project'] += 1
+            return api_client.json_response({
+                'projectId': int(params['projectId']),
+                'aggregated': {'totalExecutions': 2, 'runningCount': 1,
+                               'totalRecordsProcessed': self.counters['project']},
+                'jobs': [{'jobId': 10, 'executionCount': 1}, {'jobId': 11, 'executionCount': 1}],
+            })
+        return 404, {}, b''
+
+
+async def _poll(api, data, store):
+    server, port, stats = await api_mock.serve(api)
+    pool = spec_fetch.ConnectionPool(max_per_host=4)
+    poller = api_metrics.MetricsPoller(
+        data, store=store, pool=pool, concurrency=4, min_interval=0.02, max_interval=0.4,
+        base_url=f'http://127.0.0.1:{port}', api_key='test-org:test-key', discover=True, seed=1,
+    )
+    for target in ('project/1', 'task/1/10/100', 'task/1/10/101', 'task/1/10/999'):
+        kind, _, ids = target.partition('/')
+        poller.add(api_metrics.Target.parse(kind, ids))
+    try:
+        summary = {entry['target']: entry for entry in await poller.run(duration=1.5)}
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+    return summary, pool, stats
+
+
+def test_poller_adapts_intervals_and_stops_finished_targets():
+    data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+    api = FakeApi(data)
+    store = api_metrics.MetricStore(LEVELS)
+    summary, pool, stats = asyncio.run(_poll(api, data, store))
+
+    assert api.api_keys == {'test-org:test-key'}
+    assert {'job/1/10', 'job/1/11'} <= set(summary), 'jobs discovered from the project metrics'
+    running, idle = summary['job/1/10'], summary['job/1/11']
+    assert running['polls'] > 3 * idle['polls']
+    assert idle['interval'] == 0.4
+    task = summary['task/1/10/100']
+    assert task['done'] and task['status'] == 'COMPLETED' and task['polls'] == 6
+    assert summary['task/1/10/101']['polls'] == 1
+    missing = summary['task/1/10/999']
+    assert missing['done'] and missing['errors'] == 1
+
+    records = store.series('job/1/10', 'aggregated.totalRecordsProcessed')
+    raw, downsampled = records.points(0), records.points(1)
+    assert len(raw) == 16 and raw[-1][1] == api.counters['job/10'] * 10
+    assert 0 < len(downsampled) <= 9
+    assert all(a[0] < b[0] for a, b in zip(downsampled, downsampled[1:]))
+    per_series = sum(capacity for _, capacity in LEVELS) * 2 * 8
+    total_series = sum(len(series) for series in store.snapshot().values())
+    assert store.nbytes() == total_series * per_series
+
+    assert pool.reused > 10 * pool.opened and stats['connections'] <= 4
@@ -0,0 +1,51 @@
+"""scripts/rescore-matching.py: the configuration keys and columns each model needs."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from helpers import load_script
+
+rescore = load_script("rescore-matching.py")
+
+SEARCH_CSV = (
+    "EAN number,result_title,result_link,result_snippet,matching_score\n"
+    "8711000429969,Beer,https://shop/8711000429969,Heineken,0.6\n"
+    "8711000429969,Beer 8711000429969,https://shop/x,,0.8\n"
+    "12,Beer,https://shop/12,,0\n"
+)
+
+
+@pytest.fixture
+def search_csv(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text(SEARCH_CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_search_model_needs_no_description_or_brand_column(search_csv, capsys):
+    assert rescore.main([search_csv]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert (report["rows"], report["agreement"]) == (3, 1.0)
+    assert report["config"] == {"ean_field": "EAN number", "output_field": "matching_score"}
+
+
+@pytest.mark.parametrize("key", ["description_field", "brand_field", "extracted_prefix", "iextract_prefix"])
+def test_search_model_rejects_fields_model_keys(search_csv, capsys, key):
+    assert rescore.main([search_csv, "--config", f"{key}=x"]) == 1
+    assert "only applies to --model fields" in capsys.readouterr().err
+
+
+def test_fields_model_requires_description_and_brand(search_csv, capsys):
+    assert rescore.main([search_csv, "--model", "fields"]) == 1
+    assert "Item description, Brand" in capsys.readouterr().err
+
+
+def test_pipeline_keys_ignored_by_the_search_model_are_reported(search_csv, tmp_path, capsys):
+    pipeline = tmp_path / "pipeline.yaml"
+    pipeline.write_text("pipeline:\n  - stage: enrichMatchingScore\n    args: [ { brand_field: Maker } ]\n",
+                        encoding="utf-8")
+    assert rescore.main([search_csv, "--pipeline", str(pipeline)]) == 0
+    assert "pipeline keys ignored by --model search: brand_field" in capsys.readouterr().err
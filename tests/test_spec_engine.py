@@ -0,0 +1,36 @@
+"""spec_engine: the shared loading path and the count of operations the passes processed."""
+
+import spec_engine
+
+SPEC = """openapi: 3.0.1
+info: {title: Test, version: '1'}
+paths:
+  /webrobot/api/projects:
+    get: {operationId: listProjects, summary: List, description: All projects, responses: {'200': {description: OK}}}
+    post: {operationId: createProject, responses: {'200': {description: OK}}}
+  /webrobot/api/projects/{id}:
+    get: {operationId: getProject, summary: Get, responses: {'200': {description: OK}}}
+    delete: {operationId: deleteProject, summary: Delete, description: Remove, responses: {'200': {description: OK}}}
+"""
+
+
+def test_load_spec_and_read_spec_share_the_loading_path(tmp_path):
+    path = tmp_path / 'openapi.yaml'
+    path.write_text(SPEC, encoding='utf-8')
+    raw, digest, data = spec_engine.read_spec(path)
+    assert raw == SPEC.encode()
+    assert digest == spec_engine.spec_cache.digest_of(raw)
+    assert spec_engine.load_spec(path) == data
+
+
+def test_processed_counts_the_operations_the_passes_touched(tmp_path):
+    path = tmp_path / 'openapi.yaml'
+    path.write_text(SPEC, encoding='utf-8')
+    ctx = spec_engine.SpecContext(spec_engine.load_spec(path))
+    assert ctx.processed == 0
+    spec_engine.run_passes(ctx)
+    # Of the 4 operations only the 2 missing a summary or a description are enriched
+    assert ctx.processed == 2
+    assert set(ctx.changed_operations()) == {
+        ('/webrobot/api/projects', 'post'), ('/webrobot/api/projects/{id}', 'get'),
+    }
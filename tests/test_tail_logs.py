@@ -0,0 +1,106 @@
+"""api_logs: tail alignment and the incremental tailer against a local server with growing logs."""
+
+import asyncio
+import json
+
+import api_client
+import api_logs
+import api_mock
+import spec_engine
+import spec_fetch
+
+
+def test_split_new_aligns_on_the_known_tail():
+    assert api_logs.split_new(['a', 'b', 'c', 'd'], ['x', 'a', 'b']) == ['c', 'd']
+    assert api_logs.split_new(['c', 'd'], ['a', 'b']) is None, 'window without overlap'
+    # Repeated lines are told apart by the absolute position
+    assert api_logs.split_new(['hb', 'hb', 'hb'], ['hb', 'hb'], position=2, complete=True) == ['hb']
+    assert api_logs.split_new(['hb', 'hb'], ['hb', 'hb']) is None, 'ambiguous alignment'
+
+
+class GrowingLogs:
+    """Logs and statuses of executions `run`, `done`, `beat` and `burst`; anything else is a 404."""
+
+    def __init__(self, data):
+        self.operations = api_client.load_operations(data, (api_logs.LOGS_OPERATION, api_logs.STATUS_OPERATION))
+        self.logs = {'run': [], 'done': [f'done {i}' for i in range(50)], 'beat': [], 'burst': []}
+        self.status = {'run': 'RUNNING', 'done': 'COMPLETED', 'beat': 'RUNNING', 'burst': 'RUNNING'}
+        self.requests = 0
+        self.naive_bytes = 0
+
+    def __call__(self, request):
+        params = self.operations[api_logs.LOGS_OPERATION].match(request.path)
+        if params is not None and params['executionId'] in self.logs:
+            lines = self.logs[params['executionId']]
+            self.requests += 1
+            self.naive_bytes += len(json.dumps({'logs': lines}))
+            tail = int(request.query.get('tail') or 0)
+            return api_client.json_response({'logs': lines[-tail:] if tail else lines})
+        params = self.operations[api_logs.STATUS_OPERATION].match(request.path)
+        if params is not None and params['executionId'] in self.status:
+            return api_client.json_response({'executionId': params['executionId'],
+                                             'status': self.status[params['executionId']]})
+        return api_client.json_response({'code': 404, 'message': 'Execution not found'}, 404)
+
+    async def grow(self):
+        for step in range(120):
+            self.logs['run'].extend(f'run {step} riga {i}' for i in range(3))
+            if step % 4 == 0 and len(self.logs['beat']) < 25:
+                self.logs['beat'].append('heartbeat')
+            if step == 40:
+                self.logs['burst'].extend(f'burst {i}' for i in range(500))
+            await asyncio.sleep(0.01)
+        for name in self.status:
+            self.status[name] = 'COMPLETED'
+
+
+async def _tail(api, data):
+    server, port, _ = await api_mock.serve(api)
+    pool = spec_fetch.ConnectionPool(max_per_host=4)
+    tailer = api_logs.LogTailer(
+        data, pool=pool, concurrency=4, min_interval=0.01, max_interval=0.05, buffer=16,
+        min_tail=8, max_tail=64, anchor=4, base_url=f'http://127.0.0.1:{port}', seed=1,
+    )
+    for name in list(api.logs) + ['missing']:
+        tailer.add(api_logs.Execution('1', '2', name))
+    received = {name: [] for name in api.logs}
+    grower = asyncio.ensure_future(api.grow())
+    blocked_requests = None
+
+    async def consume():
+        nonlocal blocked_requests
+        async for execution, line in tailer.lines():
+            if blocked_requests is None:
+                # Stalled consumer: with the queue full the executions stop polling
+                before = api.requests
+                await asyncio.sleep(0.3)
+                blocked_requests = api.requests - before
+            if line is not None:
+                received[execution.params['executionId']].append(line)
+
+    try:
+        await asyncio.wait_for(consume(), 20)
+    finally:
+        grower.cancel()
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+    return tailer, pool, received, blocked_requests
+
+
+def test_tailer_streams_only_new_lines_with_backpressure():
+    data = spec_engine.load_spec(spec_engine.OPENAPI_FILE)
+    api = GrowingLogs(data)
+    tailer, pool, received, blocked_requests = asyncio.run(_tail(api, data))
+
+    for name, lines in api.logs.items():
+        assert received[name] == lines, f'{name}: lines missing or repeated'
+    summary = {execution.params['executionId']: execution for execution in tailer.executions.values()}
+    assert summary['done'].requests == 2
+    assert summary['burst'].widened > 0
+    assert summary['missing'].status == 'HTTP 404'
+    unthrottled = int(0.3 / tailer.min_interval) * len(api.logs)
+    assert blocked_requests * 4 < unthrottled
+    sent = sum(execution.stats['bytes'] for execution in tailer.executions.values())
+    assert sent * 3 < api.naive_bytes
+    assert pool.opened <= 4
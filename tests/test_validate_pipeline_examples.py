@@ -0,0 +1,57 @@
+"""scripts/validate-pipeline-examples.py: incremental runs over files with duplicate content."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+
+import pytest
+
+from helpers import load_script
+
+VALID = "pipeline:\n  - stage: dedup\n"
+FILES = {"a.yaml": VALID, "b.yaml": VALID, "c.yaml": "pipeline:\n  - stage: bogusStage\n", "d.yaml": VALID}
+
+validator = load_script("validate-pipeline-examples.py")
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for name, text in FILES.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    return tmp_path
+
+
+def _verdicts(capsys, *argv):
+    capsys.readouterr()
+    validator.main([str(a) for a in argv])
+    verdicts = {}
+    for line in capsys.readouterr().out.splitlines():
+        status, sep, rest = line.partition(" - ")
+        if sep:
+            verdicts[os.path.basename(rest.split(":")[0])] = status.strip() == "OK"
+    return verdicts
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_incremental_runs_with_duplicate_content(corpus, capsys, jobs):
+    cache = corpus / "cache.json"
+    expected = {"a.yaml": True, "b.yaml": True, "c.yaml": False, "d.yaml": True}
+    args = ("--incremental", "--cache-file", cache, "--jobs", jobs)
+    assert _verdicts(capsys, corpus, *args) == expected, "cold cache"
+    assert _verdicts(capsys, corpus, *args) == expected, "warm cache"
+    assert _verdicts(capsys, corpus / "c.yaml", "--incremental", "--cache-file", cache) == {"c.yaml": False}
+
+
+def test_exit_status(corpus):
+    assert validator.main([str(corpus / "a.yaml")]) == 0
+    assert validator.main([str(corpus)]) == 2
+
+
+def test_stdin_stream_reports_each_document():
+    stdin = io.StringIO(VALID + "---\npipeline:\n  - stage: bogusStage\n")
+    stdout = io.StringIO()
+    assert validator.serve("yaml", stdin, stdout) == 2
+    results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [(r["index"], r["ok"]) for r in results] == [(0, True), (1, False)]